@@ -2,12 +2,23 @@
 from typing import List, Dict, Any, Tuple
 
 # --- 銀行ローン商品 ---
+LOAN_REPAYMENT_ANNUITY: str = "annuity" # 元利均等返済(毎週の返済額が一定)
+LOAN_REPAYMENT_EQUAL_PRINCIPAL: str = "equal_principal" # 元金均等返済(毎週の返済元本が一定)
+LOAN_REPAYMENT_BULLET: str = "bullet" # 期日一括返済(満期まで利息のみ)
+DEFAULT_LOAN_REPAYMENT_METHOD: str = LOAN_REPAYMENT_ANNUITY
+LOAN_REPAYMENT_METHOD_LABELS: Dict[str, str] = {
+    LOAN_REPAYMENT_ANNUITY: "元利均等返済",
+    LOAN_REPAYMENT_EQUAL_PRINCIPAL: "元金均等返済",
+    LOAN_REPAYMENT_BULLET: "期日一括返済",
+}
+LOAN_SCHEDULE_PREVIEW_WEEKS: int = 4 # 負債状況の画面に表示する返済予定の週数
+
 BANK_LOAN_PRODUCTS: List[Dict[str, Any]] = [
-    {"bank_name": "ミライ銀行", "product_name": "事業拡大ローンS", "max_amount": 50_000_000, "interest_rate_weekly": 0.001, "repayment_weeks": 156},
-    {"bank_name": "ミライ銀行", "product_name": "短期運転資金ローン", "max_amount": 20_000_000, "interest_rate_weekly": 0.0008, "repayment_weeks": 52},
-    {"bank_name": "アオゾラ信金", "product_name": "地域応援ローン", "max_amount": 30_000_000, "interest_rate_weekly": 0.0012, "repayment_weeks": 104},
-    {"bank_name": "グローバル・バンク", "product_name": "大型設備投資ローン", "max_amount": 1_000_000_000, "interest_rate_weekly": 0.0005, "repayment_weeks": 520},
-    {"bank_name": "グローバル・バンク", "product_name": "不動産担保ローン", "max_amount": 5_000_000_000, "interest_rate_weekly": 0.0004, "repayment_weeks": 1040},
+    {"bank_name": "ミライ銀行", "product_name": "事業拡大ローンS", "max_amount": 50_000_000, "interest_rate_weekly": 0.001, "repayment_weeks": 156, "repayment_method": LOAN_REPAYMENT_ANNUITY},
+    {"bank_name": "ミライ銀行", "product_name": "短期運転資金ローン", "max_amount": 20_000_000, "interest_rate_weekly": 0.0008, "repayment_weeks": 52, "repayment_method": LOAN_REPAYMENT_BULLET},
+    {"bank_name": "アオゾラ信金", "product_name": "地域応援ローン", "max_amount": 30_000_000, "interest_rate_weekly": 0.0012, "repayment_weeks": 104, "repayment_method": LOAN_REPAYMENT_EQUAL_PRINCIPAL},
+    {"bank_name": "グローバル・バンク", "product_name": "大型設備投資ローン", "max_amount": 1_000_000_000, "interest_rate_weekly": 0.0005, "repayment_weeks": 520, "repayment_method": LOAN_REPAYMENT_EQUAL_PRINCIPAL},
+    {"bank_name": "グローバル・バンク", "product_name": "不動産担保ローン", "max_amount": 5_000_000_000, "interest_rate_weekly": 0.0004, "repayment_weeks": 1040, "repayment_method": LOAN_REPAYMENT_ANNUITY},
 ]
 
 # --- 信用格付けシステム関連 ---
@@ -15,6 +26,24 @@ CREDIT_RATING_TIERS: Dict[str, int] = {
     "AAA": 900, "AA": 800, "A": 700, "BBB": 600, "BB": 500,
     "B": 400, "CCC": 300, "CC": 200, "C": 100, "D": 0
 }
+CREDIT_SCORE_MAX: int = 1000
+CREDIT_RATING_INITIAL_SCORE: int = 600 # 最初の格付け評価(四半期末)までのスコア (BBB)
+CREDIT_RATING_HYSTERESIS: int = 25 # 格付けの範囲をこの点数だけ超えるまでは格付けを変えない
+CREDIT_RATING_MAX_NOTCHES_PER_REVIEW: int = 1 # 一度の格付け見直し(四半期)で上げ下げする最大の段階数
+CREDIT_METRIC_WEIGHTS: Dict[str, float] = { # 格付けスコアに占める各財務比率の重み(合計 1.0)
+    "leverage": 0.30, "interest_coverage": 0.25, "liquidity": 0.25, "profitability": 0.20
+}
+CREDIT_METRIC_THRESHOLDS: Dict[str, Tuple[float, float]] = { # 財務比率の (0点となる水準, 満点となる水準)
+    "leverage": (3.0, 0.5), # 純有利子負債(有利子負債 - 現金) / 年間売上高
+    "interest_coverage": (1.0, 8.0), # 利払い前利益 / 年間の利払い見込み
+    "liquidity": (0.25, 2.0), # 現金で賄える四半期分の費用の数
+    "profitability": (-0.10, 0.15), # 売上高純利益率
+}
+CREDIT_METRIC_NEUTRAL_POINT: float = CREDIT_RATING_INITIAL_SCORE / CREDIT_SCORE_MAX # 売上・費用が無く計算できない比率の点数(初期スコア相当)
+CREDIT_METRIC_LABELS: Dict[str, str] = {
+    "leverage": "純有利子負債/売上高", "interest_coverage": "インタレスト・カバレッジ",
+    "liquidity": "手元資金", "profitability": "売上高純利益率"
+}
 CREDIT_RATING_LOAN_MODIFIERS: Dict[str, Dict[str, float]] = {
     "AAA": {"interest_rate_adjustment": -0.0002, "max_loan_multiplier": 1.5},
     "AA":  {"interest_rate_adjustment": -0.0001, "max_loan_multiplier": 1.3},
@@ -36,6 +65,13 @@ BOND_CREDIT_SPREADS: Dict[str, float] = {
     "AAA": 0.000, "AA": 0.002, "A": 0.005, "BBB": 0.010,
     "BB":  0.020, "B":  0.035, "CCC": 0.050
 }
+BOND_CALLABLE_COUPON_PREMIUM: float = 0.0025 # コール条項付き社債の上乗せ利率 (年利)
+BOND_CALL_PRICE_RATIO: float = 1.02 # 期限前償還(コール)の価格 (額面に対する比率)
+BOND_CALL_PROTECTION_WEEKS: int = 52 # 発行後、期限前償還ができない週数
+
+# --- 財務履歴関連 ---
+FINANCIAL_HISTORY_WEEKLY_ROWS: int = 260 # 財務KPIを週単位で保持する週数(5年)。これより古い期間は月末・年末の値のみ残る
+FINANCIAL_HISTORY_MONTHLY_ROWS: int = 120 # 月末の値に集約した財務KPIの保持件数(10年)。年末の値は全期間保持する
 
 # --- 信用取引関連 ---
 MARGIN_ACCOUNT_OPENING_COST: int = 1_000_000
@@ -44,6 +80,10 @@ MARGIN_INTEREST_RATE_WEEKLY: float = 0.0003
 INITIAL_MARGIN_REQUIREMENT_RATIO: float = 0.5 
 MAINTENANCE_MARGIN_REQUIREMENT_RATIO: float = 0.3
 SHORT_SELLING_INTEREST_RATE_WEEKLY: float = 0.0005
+RISK_STRESS_SHOCKS: Tuple[float, ...] = (-0.10, -0.30) # リスク評価で試算する株価の一律下落率
+COST_BASIS_METHOD_FIFO: str = "fifo" # 取得原価の計算方法: 先入先出法
+COST_BASIS_METHOD_AVERAGE: str = "average" # 取得原価の計算方法: 移動平均法
+DEFAULT_COST_BASIS_METHOD: str = COST_BASIS_METHOD_AVERAGE
 
 # --- 一般株式市場関連 ---
 NUMBER_OF_LISTED_COMPANIES: int = 300
@@ -60,7 +100,21 @@ BASE_WEEKLY_STOCK_PRICE_VOLATILITY: Tuple[float, float] = (-0.03, 0.035)
 COMPANY_NAME_ELEMENTS_PREFIX: List[str] = ["日本", "東京", "グローバル", "ミライ", "パシフィック", "デジタル", "フロンティア", "ワールド", "サンライズ", "スター"]
 COMPANY_NAME_ELEMENTS_MIDDLE: List[str] = ["産業", "テクノロジー", "製薬", "食品", "銀行", "重工", "不動産", "システム", "ネットワーク", "ライフサイエンス", "マテリアル", "オート", "コミュニケーションズ"]
 COMPANY_NAME_ELEMENTS_SUFFIX: List[str] = ["株式会社", "ホールディングス", "グループ", "コーポレーション", "Inc.", "Ltd."]
-TICKER_SYMBOL_LENGTH: int = 4
+TICKER_SYMBOL_LENGTH: int = 4 # 最小桁数。銘柄数に対してコード空間が足りない場合は桁数を増やす
+TICKER_SYMBOL_ALPHABET: str = "0123456789"
+PRICE_HISTORY_WEEKS: int = 52 # 株価履歴の保持週数
+INDICATOR_SMA_WINDOWS: Tuple[int, ...] = (13, 26) # 単純移動平均の期間(週)
+INDICATOR_EMA_SPAN: int = 12 # 指数移動平均の期間(週)
+INDICATOR_VOLATILITY_WINDOW: int = 26 # ボラティリティ(週次騰落率の標準偏差)の計算期間(週)
+INDICATOR_RSI_PERIOD: int = 14 # RSIの期間(週)
+INDICATOR_HIGH_LOW_WEEKS: int = 52 # 高値・安値の期間(週)。株価履歴の保持週数が上限
+SCREENER_PAGE_SIZE: int = 20 # 銘柄一覧・スクリーナーの1ページあたりの表示件数
+SCREENER_FIELD_LABELS: Dict[str, str] = { # スクリーナーで絞り込み・並べ替えに使える項目
+    "price": "株価", "market_cap": "時価総額", "per": "PER", "pbr": "PBR",
+    "dividend_yield": "配当利回り", "momentum": "長期移動平均乖離率", "volatility": "ボラティリティ", "rsi": "RSI",
+}
+EVENT_EARNINGS: str = "earnings" # 予定表(EventCalendar)のイベント種別: 決算発表
+EVENT_DIVIDEND: str = "dividend" # 予定表(EventCalendar)のイベント種別: 配当支払い
 TARGET_ANNUAL_DIVIDEND_YIELD_RANGE: Tuple[float, float] = (0.005, 0.06)
 STOCK_NEWS_IMPACT_RANGE: Tuple[float, float] = (-0.10, 0.10) 
 STOCK_NEWS_EVENT_PROBABILITY_WEEKLY: float = 0.02 
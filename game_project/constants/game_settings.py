@@ -18,3 +18,15 @@ LUXURY_GOODS_DATA: List[Dict[str, Any]] = [
     {"id": "lux_estate_001", "name": "コートダジュール プライベートヴィラ", "category": "LUX_REAL_ESTATE", "price": 1_200_000_000, "weekly_upkeep_cost": 1_000_000, "description": "紺碧の海を望む、選ばれし者のための隠れ家。"},
     {"id": "lux_art_001", "name": "ゴッホンタ・ヌンシー作「夜明けのラーメンパーカー」", "category": "LUX_ART", "price": 150_000_000, "weekly_upkeep_cost": 10_000, "description": "印象派の巨匠が描いたとされる幻の一品。"}
 ]
+
+# --- ヘッドレス・シミュレーション設定 ---
+# systems/simulation_system.simulate() の config で上書きできる既定値
+SIMULATION_DEFAULT_CONFIG: Dict[str, Any] = {
+    "company_name": "シミュレーション株式会社",
+    "num_competitors": 3,
+    "difficulty": 3,
+    "num_listed_companies": 300,
+    "start_date": (2025, 6, 2), # (年, 月, 週)
+    "stop_on_game_over": True,
+    "profile": False, # True で profiler を有効にし、結果に計測レポートを含める
+}
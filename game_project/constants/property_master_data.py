@@ -1,5 +1,7 @@
 # constants/property_master_data.py
 
+PROPERTY_VALUE_HISTORY_WEEKS: int = 52 # 物件価値の履歴を保持する週数
+
 PROPERTIES_MASTER = [
     {
         "name": "新宿のオフィスビル",
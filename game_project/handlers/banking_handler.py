@@ -24,7 +24,8 @@ class BankingActionHandler:
                 lender_name=loan_product['bank_name'],
                 product_name=loan_product['product_name'],
                 repayment_weeks=loan_product['repayment_weeks'],
-                game_time=self.gc.game_time
+                game_time=self.gc.game_time,
+                repayment_method=loan_product['repayment_method']
             ):
                 console.hud_alert('融資が実行されました', 'success', 1.5)
                 self.gc.root_view.subviews[0].update_view()
@@ -18,7 +18,7 @@ from systems import (
     venture_system, stock_market_system, general_stock_market_system, 
     acquisition_system, ipo_system, rnd_system, personal_finance_system, 
     competitor_ai_system, hr_system, reporting_system, save_load_system,
-    map_system
+    map_system, tick_system, risk_system
 )
 
 # --- グローバル変数 ---
@@ -31,13 +31,13 @@ def display_quick_status():
     if player and game_time:
         print("\n" + "="*50)
         print(f"現在時刻: {game_time.get_date_string()}")
-        print(reporting_system.get_status_summary(player, general_stock_market_system.listed_companies_on_market))
+        print(reporting_system.get_status_summary(player, general_stock_market_system.market_registry))
         print("="*50)
 
 def show_financial_report():
     """会社の財務レポートを表示する"""
     if player:
-        print(reporting_system.generate_company_financial_report(player, general_stock_market_system.listed_companies_on_market))
+        print(reporting_system.generate_company_financial_report(player, general_stock_market_system.market_registry))
 
 def show_shop_submenu(p: Player, gt: GameTime):
     """店舗運営のサブメニュー"""
@@ -60,24 +60,25 @@ def process_weekly_events() -> Optional[str]:
     if not player or not game_time: return None
     
     print("\n--- 週を進行中... ---")
-    game_time.advance_week()
-    market_data = general_stock_market_system.listed_companies_on_market
+    result = tick_system.run_weekly_tick(player, game_time)
     
-    player.process_weekly_updates(game_time, market_data)
-    
-    if player.finance.get_cash() < 0:
+    if result == 'GAME_OVER':
         print("\n" + "!"*50)
         print("!!! ゲームオーバー !!!")
         print(f"会社の現金が ¥{player.finance.get_cash():,.0f} となり、資金が尽きたため倒産しました。")
         print("!"*50)
         return 'GAME_OVER'
+
+    # 今週発生したプレイヤーの追証に対応させる
+    for event in risk_system.get_player_margin_calls():
+        general_stock_market_system.handle_margin_call(player, event['owner_type'], event['shortfall'], general_stock_market_system.market_registry, game_time)
         
     print("--- 週の処理完了 ---")
     return None
 
 def save_game_state_wrapper(p, gt):
     """main_game_loopから呼び出すためのラッパー"""
-    save_load_system.save_game({'player': p, 'game_time': gt})
+    save_load_system.save_game(save_load_system.build_game_state(p, gt))
 
 def main_game_loop():
     """テキストベースのメインゲームループ"""
@@ -96,7 +97,7 @@ def main_game_loop():
         if player.departments.get("rnd"):
             actions.append({'title': "研究開発 (R&D)", 'func': lambda p, gt: rnd_system.show_rnd_menu(p, gt)})
         actions.append({'title': "自社IPO (株式公開)", 'func': lambda p, gt: ipo_system.show_ipo_menu(p, gt)})
-        actions.append({'title': "個人資産管理", 'func': lambda p, gt: personal_finance_system.show_personal_finance_menu(p, gt, general_stock_market_system.listed_companies_on_market)})
+        actions.append({'title': "個人資産管理", 'func': lambda p, gt: personal_finance_system.show_personal_finance_menu(p, gt, general_stock_market_system.market_registry)})
         actions.append({'title': "経営レポートを見る", 'func': lambda p, gt: show_financial_report()})
         if player.departments.get("investment"):
              actions.append({'title': "ベンチャー投資", 'func': lambda p, gt: venture_system.show_venture_investment_menu(p, gt)})
@@ -160,13 +161,7 @@ def load_game_state():
     global player, game_time
     game_state = save_load_system.load_game()
     if game_state:
-        player = game_state.get('player')
-        game_time = game_state.get('game_time')
-        general_stock_market_system.listed_companies_on_market = game_state.get('listed_companies', [])
-        competitor_ai_system.competitor_companies = game_state.get('competitors', [])
-        real_estate_system.properties_on_market = game_state.get('real_estate_market', [])
-        venture_system.available_venture_deals = game_state.get('venture_deals', [])
-        map_system.game_regions = game_state.get('game_regions', [])
+        player, game_time = save_load_system.restore_game_state(game_state)
         
         print("\nロードが完了しました。ゲームを再開します。")
         main_game_loop()
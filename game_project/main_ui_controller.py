@@ -35,7 +35,7 @@ from models.game_time import GameTime
 import constants
 from systems import (
     save_load_system, map_system, general_stock_market_system, 
-    competitor_ai_system, hr_system, venture_system, acquisition_system
+    competitor_ai_system, hr_system, venture_system, acquisition_system, tick_system, risk_system
 )
 # --- ハンドラをインポート ---
 from handlers.game_handler import GameActionHandler
@@ -166,7 +166,7 @@ class MainUIController:
         game_view.switch_content(stock_market_v)
 
     def show_stock_detail_view(self, ticker_symbol):
-        target_stock = next((s for s in general_stock_market_system.listed_companies_on_market if s.ticker_symbol == ticker_symbol), None)
+        target_stock = general_stock_market_system.market_registry.get(ticker_symbol)
         if target_stock:
             game_view = self.root_view.subviews[0]
             stock_detail_v = StockDetailView(self.investment_handler, target_stock, frame=game_view.get_content_frame(), flex='WH')
@@ -213,13 +213,11 @@ class MainUIController:
 
     def process_next_week(self):
         console.hud_alert('週を進めています...', 'success', 0.5)
-        self.game_time.advance_week()
-        
-        market_data = general_stock_market_system.listed_companies_on_market
-        self.player.process_weekly_updates(self.game_time, market_data)
-        
-        if self.game_time.is_quarter_end():
-            self.player.process_quarterly_updates(self.game_time, market_data)
+        result = tick_system.run_weekly_tick(self.player, self.game_time)
+        if result == 'GAME_OVER':
+            console.hud_alert('資金が尽きたため倒産しました…', 'error', 2)
+        elif risk_system.get_player_margin_calls():
+            console.hud_alert('追証が発生しました。ポジションを確認してください', 'error', 2)
 
         if self.root_view.subviews:
             game_view = self.root_view.subviews[0]
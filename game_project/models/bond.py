@@ -2,26 +2,51 @@
 import uuid
 from typing import Dict, Any
 
+from .game_time import GameTime
+
 class Bond:
     """
     発行された社債の情報を保持するデータクラス。
     """
-    def __init__(self, principal: float, annual_coupon_rate: float, maturity_weeks: int, issued_week: int):
+    def __init__(self, principal: float, annual_coupon_rate: float, maturity_weeks: int, issued_week: int,
+                 is_callable: bool = False, call_price_ratio: float = 1.0, call_protection_weeks: int = 0):
         self.bond_id: str = f"BOND-{str(uuid.uuid4())[:8]}"
-        self.principal: float = principal  # 借入元本 (額面)
+        self.principal: float = principal  # 借入元本 (額面残高。買入消却で減る)
         self.annual_coupon_rate: float = annual_coupon_rate  # 年間利率 (クーポンレート)
         self.maturity_weeks: int = maturity_weeks # 発行から満期までの週数
         self.issued_week: int = issued_week # 発行された週
         self.redemption_week: int = issued_week + maturity_weeks # 償還(満期返済)が行われる週
         self.is_redeemed: bool = False # 償還済みフラグ
+        self.is_callable: bool = is_callable # 期限前償還(コール)条項の有無
+        self.call_price_ratio: float = call_price_ratio # 期限前償還の価格(額面に対する比率)
+        self.first_call_week: int = issued_week + call_protection_weeks # 期限前償還ができるようになる週
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('is_callable', False)
+        self.__dict__.setdefault('call_price_ratio', 1.0)
+        self.__dict__.setdefault('first_call_week', self.issued_week)
 
     @property
     def weekly_interest_payment(self) -> float:
         """毎週支払う利息額を計算する。"""
-        # 1年は52週として計算
-        from .game_time import GameTime
-        weekly_rate = self.annual_coupon_rate / GameTime.WEEKS_PER_YEAR
-        return self.principal * weekly_rate
+        # 1年は GameTime.WEEKS_PER_YEAR 週として計算
+        return self.principal * self.annual_coupon_rate / GameTime.WEEKS_PER_YEAR
+
+    def can_call(self, current_week: int) -> bool:
+        return self.is_callable and not self.is_redeemed and current_week >= self.first_call_week
+
+    def price_ratio(self, current_week: int, market_yield: float) -> float:
+        """残りの利払いと元本を市場利回り market_yield (年率) で割り引いた、額面に対する価格。"""
+        weeks_left = self.redemption_week - current_week
+        if weeks_left <= 0:
+            return 1.0
+        weekly_coupon = self.annual_coupon_rate / GameTime.WEEKS_PER_YEAR
+        weekly_yield = market_yield / GameTime.WEEKS_PER_YEAR
+        if weekly_yield <= 0:
+            return 1.0 + weekly_coupon * weeks_left
+        discount = (1.0 + weekly_yield) ** -weeks_left
+        return weekly_coupon * (1.0 - discount) / weekly_yield + discount
 
     def to_dict(self) -> Dict[str, Any]:
         """社債の情報を辞書形式で返す。"""
@@ -33,10 +58,14 @@ class Bond:
             "maturity_weeks": self.maturity_weeks,
             "issued_week": self.issued_week,
             "redemption_week": self.redemption_week,
-            "is_redeemed": self.is_redeemed
+            "is_redeemed": self.is_redeemed,
+            "is_callable": self.is_callable,
+            "call_price_ratio": self.call_price_ratio,
+            "first_call_week": self.first_call_week
         }
 
     def __str__(self) -> str:
+        call_text = f", コール条項付き ({self.call_price_ratio:.0%})" if self.is_callable else ""
         return (f"社債 (ID: {self.bond_id[-6:]}): 額面 ¥{self.principal:,.0f}, "
                 f"年利 {self.annual_coupon_rate:.2%}, "
-                f"満期まで残り {self.redemption_week - self.issued_week}週")
+                f"満期まで残り {self.redemption_week - self.issued_week}週{call_text}")
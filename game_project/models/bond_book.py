@@ -0,0 +1,74 @@
+# models/bond_book.py
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from .bond import Bond
+
+class BondBook:
+    """
+    発行済み社債の台帳。社債を ID で引ける辞書に持ち、償還週をキーにしたヒープで満期の近い順に並べる。
+    毎週の利払い総額と額面残高の合計は発行・償還・買入消却のたびに差分で更新するため、参照は O(1)。
+    期限前償還(コール)や全額の買入消却で消えた社債のヒープ上の項目はその場では消さず、取り出したときに読み飛ばす。
+    """
+    def __init__(self):
+        self.bonds: Dict[str, Bond] = {} # 未償還の社債(ID -> 社債)
+        self._heap: List[Tuple[int, str]] = [] # (償還週, 社債ID)
+        self.weekly_coupon: float = 0.0 # 毎週の利払い総額
+        self.total_principal: float = 0.0 # 額面残高の合計
+
+    def __len__(self) -> int:
+        return len(self.bonds)
+
+    def __iter__(self):
+        return iter(self.bonds.values())
+
+    def get(self, bond_id: str) -> Optional[Bond]:
+        return self.bonds.get(bond_id)
+
+    def add(self, bond: Bond):
+        self.bonds[bond.bond_id] = bond
+        heapq.heappush(self._heap, (bond.redemption_week, bond.bond_id))
+        self.weekly_coupon += bond.weekly_interest_payment
+        self.total_principal += bond.principal
+
+    def remove(self, bond: Bond):
+        """社債を台帳から外す(償還・期限前償還・全額の買入消却)。"""
+        if self.bonds.pop(bond.bond_id, None) is None:
+            return
+        if self.bonds:
+            self.weekly_coupon -= bond.weekly_interest_payment
+            self.total_principal -= bond.principal
+        else:
+            self.weekly_coupon = 0.0 # 差分更新の誤差を持ち越さない
+            self.total_principal = 0.0
+
+    def reduce(self, bond: Bond, face_amount: float):
+        """一部の買入消却。額面残高を face_amount 減らし、残りが無くなれば台帳から外す。"""
+        if face_amount >= bond.principal:
+            self.remove(bond)
+            bond.principal = 0.0
+            return
+        self.weekly_coupon -= bond.weekly_interest_payment
+        self.total_principal -= bond.principal
+        bond.principal -= face_amount
+        self.weekly_coupon += bond.weekly_interest_payment
+        self.total_principal += bond.principal
+
+    def next_redemption_week(self) -> Optional[int]:
+        """次に償還を迎える週。未償還の社債がなければ None。"""
+        while self._heap and self._heap[0][1] not in self.bonds:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def due(self, week: int) -> List[Bond]:
+        """week 週までに償還を迎える未償還の社債を、償還週の早い順に返す(台帳からは外さない)。"""
+        due_bonds = []
+        while True:
+            next_week = self.next_redemption_week()
+            if next_week is None or next_week > week:
+                break
+            due_bonds.append(self.bonds[heapq.heappop(self._heap)[1]])
+        # 償還できなかった社債は台帳に残るため、翌週以降も取り出せるよう戻す
+        for bond in due_bonds:
+            heapq.heappush(self._heap, (bond.redemption_week, bond.bond_id))
+        return due_bonds
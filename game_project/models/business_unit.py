@@ -1,12 +1,14 @@
 # models/business_unit.py
 import random
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, TYPE_CHECKING
 import collections
 import math # 追記
 
 from .menu_item import MenuItem
 from .staff import Staff
 from .player import Player
+if TYPE_CHECKING:
+    from .effects_manager import EffectsManager
 from constants import map_master_data, ATTRACTIVENESS_WEIGHTS, ATTRACTIVENESS_BASE_EQUIPMENT_SCORE, ATTRACTIVENESS_BASE_MENU_ITEM_SCORE, ATTRACTIVENESS_STAFF_EFFICIENCY_FACTOR, ATTRACTIVENESS_RND_QUALITY_FACTOR, EQUIPMENT_UPGRADE_COST_BASE, EQUIPMENT_UPGRADE_COST_FACTOR, AVG_SPEND_PER_CUSTOMER_RAMEN_SHOP
 
 class BusinessUnit:
@@ -26,14 +28,55 @@ class BusinessUnit:
         self.finances: collections.defaultdict[str, float] = collections.defaultdict(float)
         self.finances['weekly_fixed_costs'] = base_weekly_fixed_costs
 
-        self.equipment_level: int = initial_equipment_level
+        self._equipment_level: int = initial_equipment_level
         self.menu: List[MenuItem] = []
         self.staff_list: List[Staff] = []
+
+        # 集客力の入力値の累計。メニュー・スタッフの増減時に差分だけ更新する
+        self._staff_efficiency_sum: float = 0.0
+        self._menu_cost_ratio_sum: float = 0.0
+        self._rnd_quality_bonus: float = 0.0
+        self._attractiveness_dirty: bool = True
+        # 同じ EffectsManager の version が変わるまで使い回すR&Dボーナス値
+        self._rnd_bonus_effects: Optional['EffectsManager'] = None
+        self._rnd_bonus_version: int = -1
+        self._rnd_bonus_cache: Dict[str, float] = {}
         
         self.attractiveness: float = 0.0
         self.weekly_customers: int = 0
         self.update_attractiveness()
 
+    def __setstate__(self, state):
+        # 旧形式のセーブデータ(累計値を持たない)からの読み込みに対応する
+        if 'equipment_level' in state:
+            state['_equipment_level'] = state.pop('equipment_level')
+        state.pop('_rnd_bonus_cache_key', None)
+        self.__dict__.update(state)
+        self._rnd_bonus_effects = None
+        self._rnd_bonus_version = -1
+        self._rnd_bonus_cache = {}
+        if '_staff_efficiency_sum' not in state:
+            self._staff_efficiency_sum = sum(s.efficiency_modifier for s in self.staff_list)
+            self._menu_cost_ratio_sum = sum(item.cost / item.price for item in self.menu)
+            self._rnd_quality_bonus = 0.0
+            self._attractiveness_dirty = True
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # R&Dボーナスのキャッシュは EffectsManager を参照するため保存しない
+        for name in ('_rnd_bonus_effects', '_rnd_bonus_version', '_rnd_bonus_cache'):
+            state.pop(name, None)
+        return state
+
+    @property
+    def equipment_level(self) -> int: return self._equipment_level
+    @equipment_level.setter
+    def equipment_level(self, value: int):
+        if value != self._equipment_level:
+            self._equipment_level = value
+            self._attractiveness_dirty = True
+            self.update_attractiveness()
+
     def get_next_upgrade_cost(self) -> int:
         base = EQUIPMENT_UPGRADE_COST_BASE.get(self.business_type, 500000)
         factor = EQUIPMENT_UPGRADE_COST_FACTOR.get(self.business_type, 1000000)
@@ -43,26 +86,33 @@ class BusinessUnit:
 
     def upgrade_equipment(self):
         self.equipment_level += 1
-        self.update_attractiveness()
 
     def add_menu_item(self, item: MenuItem):
         self.menu.append(item)
+        self._menu_cost_ratio_sum += item.cost / item.price
+        self._attractiveness_dirty = True
         self.update_attractiveness()
 
     def remove_menu_item(self, index: int) -> Optional[MenuItem]:
         if 0 <= index < len(self.menu):
             removed_item = self.menu.pop(index)
+            self._menu_cost_ratio_sum -= removed_item.cost / removed_item.price
+            self._attractiveness_dirty = True
             self.update_attractiveness()
             return removed_item
         return None
 
     def hire_staff(self, staff: Staff):
         self.staff_list.append(staff)
+        self._staff_efficiency_sum += staff.efficiency_modifier
+        self._attractiveness_dirty = True
         self.update_attractiveness()
 
     def fire_staff(self, index: int) -> Optional[Staff]:
         if 0 <= index < len(self.staff_list):
             fired_staff = self.staff_list.pop(index)
+            self._staff_efficiency_sum -= fired_staff.efficiency_modifier
+            self._attractiveness_dirty = True
             self.update_attractiveness()
             return fired_staff
         return None
@@ -70,11 +120,26 @@ class BusinessUnit:
     def calculate_staff_efficiency(self) -> float:
         if not self.staff_list:
             return 0.8
-        
-        total_efficiency = sum(s.efficiency_modifier for s in self.staff_list)
-        return total_efficiency / len(self.staff_list)
+        return self._staff_efficiency_sum / len(self.staff_list)
 
-    def update_attractiveness(self, rnd_quality_bonus: float = 0.0):
+    def get_menu_cost_ratio(self) -> float:
+        """メニューの平均原価率を返す。メニューが無い場合は0.3とする。"""
+        if not self.menu:
+            return 0.3
+        return self._menu_cost_ratio_sum / len(self.menu)
+
+    def update_attractiveness(self, rnd_quality_bonus: Optional[float] = None):
+        """
+        集客力を再計算する。入力値(設備・メニュー・スタッフ・R&Dボーナス)に
+        変化が無ければ何もしない。rnd_quality_bonus 省略時は前回の値を使う。
+        """
+        if rnd_quality_bonus is not None and rnd_quality_bonus != self._rnd_quality_bonus:
+            self._rnd_quality_bonus = rnd_quality_bonus
+            self._attractiveness_dirty = True
+        if not self._attractiveness_dirty:
+            return
+        self._attractiveness_dirty = False
+        rnd_quality_bonus = self._rnd_quality_bonus
         weights = ATTRACTIVENESS_WEIGHTS
         
         # 収穫逓減を考慮したスコア計算
@@ -88,10 +153,22 @@ class BusinessUnit:
                                staff_score * weights['staff_efficiency'] +
                                rnd_score * weights['rnd_quality'])
         
+    def _get_rnd_bonus(self, player: Optional[Player], bonus_type: str) -> float:
+        """R&Dボーナスを返す。EffectsManager の version が同じ間はキャッシュを使う。"""
+        if not (player and player.effects):
+            return 0.0
+        effects = player.effects
+        if effects is not self._rnd_bonus_effects or effects.version != self._rnd_bonus_version:
+            self._rnd_bonus_effects = effects
+            self._rnd_bonus_version = effects.version
+            self._rnd_bonus_cache = {}
+        bonus = self._rnd_bonus_cache.get(bonus_type)
+        if bonus is None:
+            bonus = self._rnd_bonus_cache[bonus_type] = effects.get_total_rnd_bonus(bonus_type)
+        return bonus
+
     def prepare_for_weekly_competition(self, player: Optional[Player]):
-        quality_bonus = 0.0
-        if player and player.effects:
-            quality_bonus = player.effects.get_total_rnd_bonus("ramen_shop_quality_boost")
+        quality_bonus = self._get_rnd_bonus(player, "ramen_shop_quality_boost")
         self.update_attractiveness(rnd_quality_bonus=quality_bonus)
 
     def finalize_weekly_finances(self, player: Optional[Player]):
@@ -100,11 +177,9 @@ class BusinessUnit:
         self.finances['weekly_sales'] = sales
         self.finances['cumulative_sales'] += sales
         
-        total_cost_ratio = sum(item.cost / item.price for item in self.menu) / len(self.menu) if self.menu else 0.3
+        total_cost_ratio = self.get_menu_cost_ratio()
         
-        cost_reduction_bonus = 0.0
-        if player and player.effects:
-            cost_reduction_bonus = player.effects.get_total_rnd_bonus("ramen_shop_cost_reduction")
+        cost_reduction_bonus = self._get_rnd_bonus(player, "ramen_shop_cost_reduction")
         actual_cost_ratio = total_cost_ratio * (1 - cost_reduction_bonus)
         
         variable_costs = sales * actual_cost_ratio
@@ -116,9 +191,7 @@ class BusinessUnit:
         self.finances['cumulative_staff_salaries'] += staff_salaries
 
         fixed_costs = self.finances['weekly_fixed_costs']
-        fixed_cost_reduction_bonus = 0.0
-        if player and player.effects:
-            fixed_cost_reduction_bonus = player.effects.get_total_rnd_bonus("ramen_shop_fixed_cost_reduction_percent")
+        fixed_cost_reduction_bonus = self._get_rnd_bonus(player, "ramen_shop_fixed_cost_reduction_percent")
         actual_fixed_costs = fixed_costs * (1 - fixed_cost_reduction_bonus)
         
         self.finances['weekly_total_costs'] = actual_fixed_costs + staff_salaries + variable_costs
@@ -10,6 +10,8 @@ if TYPE_CHECKING:
 
 from .portfolio import Portfolio
 from .business_unit import BusinessUnit
+from .credit_rating import TrailingTotals, compute_credit_metrics, score_credit_metrics, rate_credit_score, rating_for_score
+from .game_time import GameTime
 import constants
 
 class CompetitorCompany:
@@ -22,12 +24,22 @@ class CompetitorCompany:
         self.businesses_owned: List['BusinessUnit'] = []
         self.portfolio: Portfolio = Portfolio()
         self.loans = [] # 将来的な拡張用
+        self.recent_results: TrailingTotals = TrailingTotals(columns=2) # 直近1年の (売上, 利益)
+        self.credit_rating_score: int = constants.CREDIT_RATING_INITIAL_SCORE
+        self.credit_rating: str = rating_for_score(self.credit_rating_score)
         
         # ゲーム開始時に最初の店舗を出店する
         initial_shops = random.randint(constants.COMPETITOR_INITIAL_SHOP_COUNT_RANGE[0], constants.COMPETITOR_INITIAL_SHOP_COUNT_RANGE[1])
         for _ in range(initial_shops):
             self._expand(game_time)
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if 'recent_results' not in state: # 格付け導入前のセーブデータ
+            self.recent_results = TrailingTotals(columns=2)
+            self.credit_rating_score = constants.CREDIT_RATING_INITIAL_SCORE
+            self.credit_rating = rating_for_score(self.credit_rating_score)
+
     def _expand(self, game_time: 'GameTime'):
         """新しい店舗を出店するAIロジック"""
         from constants.map_master_data import REGIONS_MASTER
@@ -94,6 +106,27 @@ class CompetitorCompany:
                 self.portfolio.buy_stock(target_stock.ticker_symbol, target_stock.company_name, num_shares, target_stock.current_price, is_margin=False)
                 print(f"  [AI] {self.name} が {target_stock.company_name} の株を {num_shares} 株購入しました。")
 
+    def receive_dividend_income(self, ticker: str, dividend_amount: float):
+        """保有株の配当金を現金に加える。HolderIndex からの支払先として登録される。"""
+        self.cash += dividend_amount
+
+    def sell_stock(self, ticker: str, num_shares: int, price: float) -> bool:
+        """保有株を売却し、代金を現金に加える(信用買い分の借入は Portfolio 側で返済される)。"""
+        if self.portfolio.sell_stock(ticker, num_shares, price) is None:
+            return False
+        self.cash += num_shares * price
+        return True
+
+    def buy_to_cover_short(self, ticker: str, num_shares: int, price: float) -> bool:
+        """空売りを買い戻し、代金を現金から支払う。現金が足りない場合は買い戻さずに False を返す。"""
+        if self.cash < num_shares * price:
+            print(f"  [AI] {self.name} の買い戻し失敗: 資金が不足しています。")
+            return False
+        if self.portfolio.buy_to_cover(ticker, num_shares) is None:
+            return False
+        self.cash -= num_shares * price
+        return True
+
     def take_weekly_action(self, game_time: 'GameTime', player: 'Player', market_data: List['ListedCompany'], competitors: List['CompetitorCompany']):
         """週ごとのAIの行動を決定・実行する"""
         if random.random() > self.action_prob:
@@ -113,9 +146,24 @@ class CompetitorCompany:
             
         return None
 
+    def record_weekly_results(self, sales: float, profit: float):
+        """店舗の週次決算(売上・利益)を直近1年の集計に加える。"""
+        self.recent_results.push([sales, profit])
+
+    def update_credit_rating(self) -> bool:
+        """プレイヤーと同じ格付けモデルでスコアと格付けを更新する。格付けが変わった場合は True を返す。"""
+        revenue, profit = self.recent_results.annualized()
+        annual_interest = self.portfolio.margin_loan * constants.MARGIN_INTEREST_RATE_WEEKLY * GameTime.WEEKS_PER_YEAR
+        expenses = max(0.0, float(revenue - profit)) # 店舗の週次決算の費用(売上 - 利益)
+        metrics = compute_credit_metrics(float(revenue), float(profit), expenses, annual_interest, self.cash, self.portfolio.margin_loan)
+        self.credit_rating_score = score_credit_metrics(metrics)
+        old_rating = self.credit_rating
+        self.credit_rating = rate_credit_score(self.credit_rating_score, old_rating)
+        return self.credit_rating != old_rating
+
     def process_interest_payments(self):
         """ローン金利の支払い(将来的な拡張用)"""
         pass
 
     def __str__(self) -> str:
-        return f"{self.name} (キャッシュ: ¥{self.cash:,.0f}, 店舗数: {len(self.businesses_owned)})"
+        return f"{self.name} (キャッシュ: ¥{self.cash:,.0f}, 店舗数: {len(self.businesses_owned)}, 格付け: {self.credit_rating})"
@@ -1,5 +1,4 @@
 # models/corporate_finance.py
-import collections
 import uuid
 from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 
@@ -11,58 +10,140 @@ if TYPE_CHECKING:
     from .portfolio import Portfolio
 
 from .loan import Loan
+from .loan_book import LoanBook
 from .bond import Bond
+from .bond_book import BondBook
+from .general_ledger import GeneralLedger, ACCOUNT_CASH, ACCOUNT_REVENUE, ACCOUNT_EXPENSE, ACCOUNT_EXTERNAL
+from .financial_history import FinancialHistory
 from .game_time import GameTime
 import constants
 
 class CorporateFinance:
-    """会社の財務、ローン、社債を管理するクラス。"""
+    """
+    会社の財務、ローン、社債を管理するクラス。
+    現金・売上・費用は全て仕訳帳(GeneralLedger)への記帳として記録し、残高や損益は仕訳帳から求める。
+    """
     def __init__(self, initial_cash: float):
-        self.finances: collections.defaultdict[str, float] = collections.defaultdict(float)
-        self.finances['cash'] = initial_cash
+        self.ledger: GeneralLedger = GeneralLedger()
+        if initial_cash > 0:
+            self.ledger.post(ACCOUNT_CASH, ACCOUNT_EXTERNAL, 'capital', initial_cash)
+        self.loan_book: LoanBook = LoanBook()
         self.active_loans: List[Loan] = []
-        self.outstanding_bonds: List[Bond] = []
-        self.financial_history: List[Dict[str, Any]] = []
+        self.bond_book: BondBook = BondBook()
+        self.history: FinancialHistory = FinancialHistory()
         self.estimated_recent_annual_revenue: float = 0.0
         self.estimated_recent_annual_net_profit: float = 0.0
+        self._annuals_key: Optional[Tuple[int, int]] = None # 推定年間値を計算した (週, 履歴の版)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        legacy_history = self.__dict__.pop('financial_history', [])
+        if 'ledger' not in state: # finances 辞書で管理していた頃のセーブデータ
+            self.ledger = self._ledger_from_legacy_finances(state.pop('finances', {}), legacy_history)
+            self.__dict__.pop('finances', None)
+        if 'loan_book' not in state: # 借入台帳の導入前のセーブデータ。返済計画がなかったため期日一括返済として登録する
+            self.loan_book = LoanBook()
+            for loan in self.active_loans:
+                remaining = loan.__dict__.pop('remaining_principal', 0.0)
+                weeks_repaid = loan.__dict__.pop('weeks_repaid', 0)
+                maturity_week = max(loan.issued_week + loan.total_weeks, self.ledger.current_week + 1)
+                loan.book = self.loan_book
+                loan.slot = self.loan_book.open(remaining, loan.weekly_rate, maturity_week, constants.LOAN_REPAYMENT_BULLET, weeks_repaid)
+        if 'bond_book' not in state: # 社債をリストで持っていた頃のセーブデータ
+            self.bond_book = BondBook()
+            for bond in self.__dict__.pop('outstanding_bonds', []):
+                if not bond.is_redeemed:
+                    self.bond_book.add(bond)
+        if 'history' not in state: # 四半期ごとのスナップショットをリストで持っていた頃のセーブデータ
+            self.history = FinancialHistory()
+            for snapshot in legacy_history:
+                self.history.record(snapshot.get("week", 0), snapshot.get("year", 0), snapshot.get("month", 0), snapshot)
+        self._annuals_key = None
+
+    def _ledger_from_legacy_finances(self, finances: Dict[str, float], legacy_history: List[Dict[str, Any]]) -> GeneralLedger:
+        """旧形式の累計値を、区分ごとの期首残高の仕訳として仕訳帳に移す。"""
+        ledger = GeneralLedger()
+        if legacy_history:
+            ledger.set_week(legacy_history[-1].get("week", 0))
+        revenue_left = finances.get('total_sales', 0.0)
+        expense_left = finances.get('total_costs', 0.0)
+        for key, value in finances.items():
+            if not value or not key.startswith('cumulative_'):
+                continue
+            if key.endswith('_revenue'):
+                ledger.post(ACCOUNT_EXTERNAL, ACCOUNT_REVENUE, key[len('cumulative_'):-len('_revenue')], value)
+                revenue_left -= value
+            elif key.endswith('_cost'):
+                ledger.post(ACCOUNT_EXPENSE, ACCOUNT_EXTERNAL, key[len('cumulative_'):-len('_cost')], value)
+                expense_left -= value
+        if revenue_left:
+            ledger.post(ACCOUNT_EXTERNAL, ACCOUNT_REVENUE, 'opening_balance', revenue_left)
+        if expense_left:
+            ledger.post(ACCOUNT_EXPENSE, ACCOUNT_EXTERNAL, 'opening_balance', expense_left)
+        cash = finances.get('cash', 0.0)
+        if cash:
+            ledger.post(ACCOUNT_CASH, ACCOUNT_EXTERNAL, 'opening_balance', cash)
+        return ledger
+
+    def begin_week(self, week: int):
+        """週次処理の開始時に呼ばれ、以後の仕訳を week 週目として記帳する。"""
+        self.ledger.set_week(week)
 
     def get_cash(self) -> float:
-        return self.finances.get('cash', 0.0)
+        return self.ledger.balance(ACCOUNT_CASH)
+
+    def get_total_sales(self) -> float:
+        return self.ledger.balance(ACCOUNT_REVENUE)
 
-    def deposit(self, amount: float):
+    def get_total_costs(self) -> float:
+        return self.ledger.balance(ACCOUNT_EXPENSE)
+
+    def get_summary(self) -> Dict[str, float]:
+        """現金・累計売上・累計費用・純利益をまとめて返す。"""
+        return {"cash": self.get_cash(), "total_sales": self.get_total_sales(),
+                "total_costs": self.get_total_costs(), "net_profit": self.get_net_profit()}
+
+    def deposit(self, amount: float, category: str = 'deposit'):
+        """損益に含めない入金(借入・社債・個人資産からの入金・株式の売却代金など)。"""
         if amount > 0:
-            self.finances['cash'] += amount
+            self.ledger.post(ACCOUNT_CASH, ACCOUNT_EXTERNAL, category, amount)
 
     def record_expense(self, amount: float, category: str = 'misc'):
         if amount > 0:
-            self.finances['cash'] -= amount
-            self.finances['total_costs'] += amount
-            key = f'cumulative_{category}_cost'
-            self.finances[key] = self.finances.get(key, 0.0) + amount
+            self.ledger.post(ACCOUNT_EXPENSE, ACCOUNT_CASH, category, amount)
     
     def add_revenue(self, amount: float, category: str = 'misc'):
         if amount > 0:
-            self.finances['cash'] += amount
-            self.finances['total_sales'] += amount
-            key = f'cumulative_{category}_revenue'
-            self.finances[key] = self.finances.get(key, 0.0) + amount
+            self.ledger.post(ACCOUNT_CASH, ACCOUNT_REVENUE, category, amount)
+
+    def reduce_expense(self, amount: float, category: str = 'misc'):
+        """費用の減額(シナジーによるコスト削減など)。減額分の現金が戻る。"""
+        if amount > 0:
+            self.ledger.post(ACCOUNT_CASH, ACCOUNT_EXPENSE, category, amount)
 
     def add_subsidiary_profit(self, profit: float):
-        self.finances['cash'] += profit
         if profit > 0:
-            self.finances['total_sales'] += profit
-        else:
-            self.finances['total_costs'] += abs(profit)
-        self.finances['cumulative_subsidiary_income'] = self.finances.get('cumulative_subsidiary_income', 0.0) + profit
+            self.ledger.post(ACCOUNT_CASH, ACCOUNT_REVENUE, 'subsidiary_income', profit)
+        elif profit < 0:
+            self.ledger.post(ACCOUNT_EXPENSE, ACCOUNT_CASH, 'subsidiary_income', -profit)
+
+    def get_category_total(self, category: str, is_revenue: bool) -> float:
+        """区分ごとの累計の売上(is_revenue=True)または費用を返す。"""
+        return self.ledger.category_total(ACCOUNT_REVENUE if is_revenue else ACCOUNT_EXPENSE, category)
 
     def get_net_profit(self) -> float:
-        return self.finances.get('total_sales', 0.0) - self.finances.get('total_costs', 0.0)
+        return self.get_total_sales() - self.get_total_costs()
 
     def get_total_bank_loan(self) -> float:
-        return sum(loan.remaining_principal for loan in self.active_loans)
+        return self.loan_book.total_remaining()
+
+    @property
+    def outstanding_bonds(self) -> List[Bond]:
+        """未償還の社債の一覧(表示用)。"""
+        return list(self.bond_book)
 
     def get_total_bonds_payable(self) -> float:
-        return sum(bond.principal for bond in self.outstanding_bonds if not bond.is_redeemed)
+        return self.bond_book.total_principal
 
     def process_company_cashflow(self, operations: 'Operations', hr: 'HumanResources', player_salary: float):
         """会社の週次キャッシュフローを計算・処理する統合メソッド"""
@@ -89,14 +170,15 @@ class CorporateFinance:
             else:
                 print(f"  警告: 会社資金不足のため、本部家賃 ¥{operations.hq_weekly_rent:,.0f}が支払えませんでした。")
         
-        self.process_weekly_loan_interest()
+        self.process_weekly_loan_payments()
         self.process_weekly_bond_interest()
 
-    def take_loan(self, amount: float, weekly_rate: float, lender_name: str, product_name: str, repayment_weeks: int, game_time: 'GameTime') -> bool:
-        new_loan = Loan(principal=amount, weekly_rate=weekly_rate, total_weeks=repayment_weeks, issued_week=game_time.total_weeks_elapsed, lender_name=lender_name, product_name=product_name)
+    def take_loan(self, amount: float, weekly_rate: float, lender_name: str, product_name: str, repayment_weeks: int, game_time: 'GameTime',
+                  repayment_method: str = constants.DEFAULT_LOAN_REPAYMENT_METHOD) -> bool:
+        new_loan = Loan(self.loan_book, principal=amount, weekly_rate=weekly_rate, total_weeks=repayment_weeks, issued_week=game_time.total_weeks_elapsed, lender_name=lender_name, product_name=product_name, repayment_method=repayment_method)
         self.active_loans.append(new_loan)
-        self.deposit(amount)
-        print(f"  {lender_name}の「{product_name}」から ¥{amount:,.0f} を借入しました。")
+        self.deposit(amount, 'loan_proceeds')
+        print(f"  {lender_name}の「{product_name}」から ¥{amount:,.0f} を借入しました。({constants.LOAN_REPAYMENT_METHOD_LABELS[repayment_method]}, {repayment_weeks}週)")
         return True
 
     def repay_loan(self, loan_id_to_repay: str, amount_to_repay: float) -> bool:
@@ -110,36 +192,56 @@ class CorporateFinance:
             print("返済資金が不足しています。")
             return False
         
-        self.record_expense(repaid_amount, 'loan_repayment')
-        loan_to_repay.remaining_principal -= repaid_amount
+        self.ledger.post(ACCOUNT_EXTERNAL, ACCOUNT_CASH, 'loan_repayment', repaid_amount) # 元本の返済は費用ではない
         print(f"  ローン(ID: ...{loan_to_repay.loan_id[-6:]})の一部として ¥{repaid_amount:,.0f} を返済しました。")
         
-        if loan_to_repay.remaining_principal <= 0:
+        if self.loan_book.repay(loan_to_repay.slot, repaid_amount):
             print(f"  ローン(ID: ...{loan_to_repay.loan_id[-6:]})は完済されました。")
             self.active_loans.remove(loan_to_repay)
         
         return True
 
-    def process_weekly_loan_interest(self):
-        total_interest = sum(loan.calculate_interest() for loan in self.active_loans)
-        if total_interest > 0:
-             if self.get_cash() >= total_interest:
-                self.record_expense(total_interest, 'loan_interest')
-             else:
-                print(f"  警告: 会社資金不足のため、ローン利息 ¥{total_interest:,.2f}の支払いができませんでした。")
+    def process_weekly_loan_payments(self):
+        """全ローンの今週の利息と約定返済元本をまとめて支払い、満期に完済したローンを終了する。"""
+        week = self.ledger.current_week
+        interest, principal = self.loan_book.scheduled_payments(week)
+        total_interest = float(interest.sum())
+        total_principal = float(principal.sum())
+        if total_interest <= 0 and total_principal <= 0:
+            return
+        if self.get_cash() >= total_interest + total_principal:
+            self.record_expense(total_interest, 'loan_interest')
+            if total_principal > 0:
+                self.ledger.post(ACCOUNT_EXTERNAL, ACCOUNT_CASH, 'loan_principal', total_principal)
+            retired = set(self.loan_book.settle(week, principal))
+            if retired:
+                for loan in self.active_loans:
+                    if loan.slot in retired:
+                        print(f"  ローン(ID: ...{loan.loan_id[-6:]})の返済が完了しました。")
+                self.active_loans = [loan for loan in self.active_loans if loan.slot not in retired]
+        elif self.get_cash() >= total_interest:
+            self.record_expense(total_interest, 'loan_interest')
+            self.loan_book.settle(week, principal, paid=False)
+            print(f"  警告: 会社資金不足のため、ローンの約定返済元本 ¥{total_principal:,.0f}の支払いができませんでした。")
+        else:
+            print(f"  警告: 会社資金不足のため、ローン利息 ¥{total_interest:,.2f}の支払いができませんでした。")
 
-    def issue_bond(self, principal: float, annual_coupon_rate: float, maturity_years: int, game_time: 'GameTime') -> bool:
+    def issue_bond(self, principal: float, annual_coupon_rate: float, maturity_years: int, game_time: 'GameTime', is_callable: bool = False) -> bool:
         maturity_weeks = maturity_years * GameTime.WEEKS_PER_YEAR
-        new_bond = Bond(principal=principal, annual_coupon_rate=annual_coupon_rate, maturity_weeks=maturity_weeks, issued_week=game_time.total_weeks_elapsed)
-        self.outstanding_bonds.append(new_bond)
-        self.deposit(principal)
+        if is_callable:
+            new_bond = Bond(principal=principal, annual_coupon_rate=annual_coupon_rate, maturity_weeks=maturity_weeks, issued_week=game_time.total_weeks_elapsed,
+                            is_callable=True, call_price_ratio=constants.BOND_CALL_PRICE_RATIO, call_protection_weeks=constants.BOND_CALL_PROTECTION_WEEKS)
+        else:
+            new_bond = Bond(principal=principal, annual_coupon_rate=annual_coupon_rate, maturity_weeks=maturity_weeks, issued_week=game_time.total_weeks_elapsed)
+        self.bond_book.add(new_bond)
+        self.deposit(principal, 'bond_proceeds')
         print(f"\n[資金調達] 新規社債を発行し、¥{principal:,.0f} を調達しました。")
-        print(f"  (年利: {annual_coupon_rate:.2%}, {maturity_years}年債)")
+        print(f"  (年利: {annual_coupon_rate:.2%}, {maturity_years}年債{', コール条項付き' if is_callable else ''})")
         return True
 
     def process_weekly_bond_interest(self):
-        if not self.outstanding_bonds: return
-        total_interest = sum(bond.weekly_interest_payment for bond in self.outstanding_bonds if not bond.is_redeemed)
+        if not self.bond_book: return
+        total_interest = self.bond_book.weekly_coupon
         if total_interest > 0:
             if self.get_cash() >= total_interest:
                 self.record_expense(total_interest, 'bond_interest')
@@ -148,43 +250,94 @@ class CorporateFinance:
 
 
     def process_bond_maturities(self, game_time: 'GameTime'):
-        matured_bonds = [bond for bond in self.outstanding_bonds if bond.redemption_week <= game_time.total_weeks_elapsed and not bond.is_redeemed]
-        for bond in matured_bonds:
+        for bond in self.bond_book.due(game_time.total_weeks_elapsed):
             print(f"\n[財務イベント] 社債 (ID: ...{bond.bond_id[-6:]}) が満期を迎えました。元本 ¥{bond.principal:,.0f} の償還が必要です。")
             if self.get_cash() >= bond.principal:
-                self.record_expense(bond.principal, 'bond_redemption')
-                bond.is_redeemed = True
+                self._redeem_bond(bond, bond.principal, 1.0, 'bond_redemption')
                 print(f"  社債の元本 ¥{bond.principal:,.0f} を償還しました。")
             else:
                 print(f"!!! 重大警告: 会社資金不足のため、満期を迎えた社債の元本 ¥{bond.principal:,.0f} を償還できません! デフォルトとなります。 !!!")
-        self.outstanding_bonds = [bond for bond in self.outstanding_bonds if not bond.is_redeemed]
+
+    def _redeem_bond(self, bond: Bond, face_amount: float, price_ratio: float, category: str):
+        """
+        社債の額面 face_amount を、額面の price_ratio 倍の価格で償還する。
+        額面分は負債の返済として、額面との差額は費用(プレミアム)または収益(割安な買入れ)として記帳する。
+        """
+        price = face_amount * price_ratio
+        if price_ratio >= 1.0:
+            self.ledger.post(ACCOUNT_EXTERNAL, ACCOUNT_CASH, category, face_amount)
+            self.record_expense(price - face_amount, category + '_premium')
+        else:
+            self.ledger.post(ACCOUNT_EXTERNAL, ACCOUNT_CASH, category, price)
+            self.ledger.post(ACCOUNT_EXTERNAL, ACCOUNT_REVENUE, category + '_gain', face_amount - price)
+        if face_amount >= bond.principal:
+            self.bond_book.remove(bond)
+            bond.is_redeemed = True
+        else:
+            self.bond_book.reduce(bond, face_amount)
+
+    def call_bond(self, bond_id: str, game_time: 'GameTime') -> bool:
+        """コール条項に基づき、社債の全額をコール価格で期限前償還する。"""
+        bond = self.bond_book.get(bond_id)
+        if bond is None:
+            print("エラー: 指定されたIDの社債が見つかりません。")
+            return False
+        if not bond.can_call(game_time.total_weeks_elapsed):
+            print("この社債は現在、期限前償還できません。")
+            return False
+        face_amount = bond.principal
+        price = face_amount * bond.call_price_ratio
+        if self.get_cash() < price:
+            print("償還資金が不足しています。")
+            return False
+        self._redeem_bond(bond, face_amount, bond.call_price_ratio, 'bond_call')
+        print(f"  社債(ID: ...{bond.bond_id[-6:]})を ¥{price:,.0f} で期限前償還しました。")
+        return True
+
+    def buy_back_bond(self, bond_id: str, face_amount: float, price_ratio: float) -> bool:
+        """社債を市場から額面の price_ratio 倍の価格で買い入れ、消却する。face_amount は買い入れる額面。"""
+        bond = self.bond_book.get(bond_id)
+        if bond is None:
+            print("エラー: 指定されたIDの社債が見つかりません。")
+            return False
+        face_amount = min(face_amount, bond.principal)
+        price = face_amount * price_ratio
+        if face_amount <= 0:
+            return False
+        if self.get_cash() < price:
+            print("買入資金が不足しています。")
+            return False
+        self._redeem_bond(bond, face_amount, price_ratio, 'bond_buyback')
+        print(f"  社債(ID: ...{bond.bond_id[-6:]})の額面 ¥{face_amount:,.0f} を ¥{price:,.0f} で買入消却しました。")
+        return True
 
     def record_financial_snapshot(self, game_time: 'GameTime', player: 'Player'):
-        snapshot = {"week": game_time.total_weeks_elapsed, "year": game_time.current_year, "month": game_time.current_month, "total_sales": self.finances['total_sales'], "total_costs": self.finances['total_costs'], "net_profit": self.get_net_profit(), "cash": self.get_cash(), "total_debt": player.get_total_debt()}
-        self.financial_history.append(snapshot)
-        if len(self.financial_history) > 52 * 5: self.financial_history.pop(0)
+        """今週末時点の財務KPIを履歴に記録し、直近1年の推定値を更新する。週次処理で毎週呼ばれる。"""
+        snapshot = {"total_sales": self.get_total_sales(), "total_costs": self.get_total_costs(), "net_profit": self.get_net_profit(), "cash": self.get_cash(), "total_debt": player.get_total_debt()}
+        self.history.record(game_time.total_weeks_elapsed, game_time.current_year, game_time.current_month, snapshot)
+        self.get_estimated_annuals(game_time)
 
     def get_estimated_annuals(self, game_time: 'GameTime') -> Tuple[float, float]:
-        if not self.financial_history:
+        """直近1年の推定売上と推定純利益。同じ週・同じ履歴に対しては計算済みの値を返す。"""
+        key = (game_time.total_weeks_elapsed, self.history.version)
+        if self._annuals_key == key:
+            return self.estimated_recent_annual_revenue, self.estimated_recent_annual_net_profit
+        self._annuals_key = key
+        current_snapshot = self.history.latest()
+        if current_snapshot is None:
             self.estimated_recent_annual_revenue = 0.0
             self.estimated_recent_annual_net_profit = 0.0
             return 0.0, 0.0
         one_year_ago_week = game_time.total_weeks_elapsed - GameTime.WEEKS_PER_YEAR
-        one_year_ago_snapshot = None
-        for snapshot in reversed(self.financial_history):
-            if snapshot["week"] <= one_year_ago_week:
-                one_year_ago_snapshot = snapshot
-                break
+        one_year_ago_snapshot = self.history.at(one_year_ago_week)
         if one_year_ago_snapshot:
-            current_snapshot = self.financial_history[-1]
             revenue = current_snapshot["total_sales"] - one_year_ago_snapshot["total_sales"]
             profit = current_snapshot["net_profit"] - one_year_ago_snapshot["net_profit"]
             self.estimated_recent_annual_revenue = max(0, revenue)
             self.estimated_recent_annual_net_profit = profit
             return self.estimated_recent_annual_revenue, self.estimated_recent_annual_net_profit
         elif game_time.total_weeks_elapsed > 0:
-            first_snapshot = self.financial_history[0]
-            current_snapshot = self.financial_history[-1]
+            first_snapshot = self.history.first()
             weeks_operated = current_snapshot["week"] - first_snapshot.get("week", 0)
             if weeks_operated > 0:
                 period_sales = current_snapshot["total_sales"] - first_snapshot.get("total_sales", 0.0)
@@ -197,6 +350,16 @@ class CorporateFinance:
         self.estimated_recent_annual_revenue = 0.0
         self.estimated_recent_annual_net_profit = 0.0
         return 0.0, 0.0
+
+    def get_recent_annual_expenses(self, game_time: 'GameTime') -> float:
+        """直近1年に台帳へ計上した費用。記帳が1年に満たない場合は週平均から1年分に換算する。"""
+        first_week = self.ledger.first_week
+        end_week = game_time.total_weeks_elapsed
+        if first_week is None or end_week < first_week:
+            return 0.0
+        start_week = max(first_week, end_week - GameTime.WEEKS_PER_YEAR + 1)
+        weeks = end_week - start_week + 1
+        return self.ledger.period_total(ACCOUNT_EXPENSE, start_week, end_week) * GameTime.WEEKS_PER_YEAR / weeks
         
     def buy_stock_on_cash(self, portfolio: 'Portfolio', ticker: str, company_name: str, num_shares: int, price: float) -> bool:
         total_cost = num_shares * price
@@ -220,26 +383,26 @@ class CorporateFinance:
         return True
 
     def sell_stock(self, portfolio: 'Portfolio', ticker: str, num_shares_to_sell: int, price: float) -> bool:
-        avg_buy_price = portfolio.sell_stock(ticker, num_shares_to_sell)
-        if avg_buy_price is None: return False
+        realized_before = portfolio.get_realized_gain(ticker)
+        cost_per_share = portfolio.sell_stock(ticker, num_shares_to_sell, price)
+        if cost_per_share is None: return False
         
         proceeds = num_shares_to_sell * price
-        profit_loss = (price - avg_buy_price) * num_shares_to_sell
+        profit_loss = portfolio.get_realized_gain(ticker) - realized_before # 売却したロットの取得原価に基づく実現損益
         
-        self.deposit(proceeds) # 売却代金を現金に加算
+        self.deposit(proceeds, 'stock_sale') # 売却代金を現金に加算
         
-        if profit_loss >= 0:
-            # 利益分は売上、コスト分は費用から差し引くことで純利益を正しく計上
-            cost_of_goods_sold = proceeds - profit_loss
-            self.finances['total_sales'] += profit_loss
-        else:
+        if profit_loss > 0:
+            # 売却益は売上として計上(現金は売却代金として入金済み)
+            self.ledger.post(ACCOUNT_EXTERNAL, ACCOUNT_REVENUE, 'stock_sale_gain', profit_loss)
+        elif profit_loss < 0:
             # 損失は費用として計上
-            self.finances['total_costs'] += abs(profit_loss)
+            self.ledger.post(ACCOUNT_EXPENSE, ACCOUNT_EXTERNAL, 'stock_sale_loss', -profit_loss)
         return True
 
     def short_sell_stock(self, portfolio: 'Portfolio', ticker: str, company_name: str, num_shares: int, price: float, game_time: 'GameTime') -> bool:
         proceeds = num_shares * price
-        self.deposit(proceeds)
+        self.deposit(proceeds, 'short_sale')
         portfolio.short_sell(ticker, company_name, num_shares, price, game_time)
         return True
 
@@ -0,0 +1,111 @@
+# models/credit_rating.py
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .game_time import GameTime
+import constants
+
+# (格付け, 下限スコア) を格付けの高い順に並べたもの
+_TIERS: List[Tuple[str, int]] = sorted(constants.CREDIT_RATING_TIERS.items(), key=lambda item: -item[1])
+
+def compute_credit_metrics(annual_revenue: float, annual_net_profit: float, annual_expenses: float,
+                           annual_interest: float, cash: float, total_debt: float) -> Dict[str, float]:
+    """
+    格付けに使う財務比率を計算する。
+    - leverage: 純有利子負債(有利子負債 - 現金) / 年間売上高 (低いほど良い)
+    - interest_coverage: 利払い前利益 / 年間の利払い見込み (高いほど良い)
+    - liquidity: 現金で賄える四半期分の費用の数 (高いほど良い)
+    - profitability: 売上高純利益率 (高いほど良い)
+    売上・利払い・費用が 0 で比率を計算できない場合は、判断材料がないものとして NaN (中立の評価) とする。
+    ただし売上が無いのに純有利子負債や赤字がある場合は、最も悪い側の無限大を使う。
+    """
+    net_debt = max(0.0, total_debt - cash)
+    if annual_revenue > 0:
+        leverage = net_debt / annual_revenue
+        profitability = annual_net_profit / annual_revenue
+    else:
+        leverage = math.inf if net_debt > 0 else math.nan
+        profitability = -math.inf if annual_net_profit < 0 else math.nan
+    if annual_interest > 0:
+        interest_coverage = (annual_net_profit + annual_interest) / annual_interest
+    else:
+        # 利払いが無くても、利益が出ていなければ返済余力があるとは言えない
+        interest_coverage = math.inf if annual_net_profit > 0 else math.nan
+    quarterly_costs = max(0.0, annual_expenses) / 4
+    if quarterly_costs > 0:
+        liquidity = cash / quarterly_costs
+    else:
+        liquidity = math.nan if cash >= 0 else -math.inf
+    return {"leverage": leverage, "interest_coverage": interest_coverage,
+            "liquidity": liquidity, "profitability": profitability}
+
+def score_credit_metrics(metrics: Dict[str, float]) -> int:
+    """
+    財務比率を信用スコア (0 - CREDIT_SCORE_MAX) に換算する。
+    各比率を「悪い水準」で 0、「良い水準」で 1 となるよう直線で点数化し、重み付きで合計する。
+    計算できなかった比率 (NaN) は CREDIT_METRIC_NEUTRAL_POINT 点とする。
+    """
+    total = 0.0
+    for name, weight in constants.CREDIT_METRIC_WEIGHTS.items():
+        bad, good = constants.CREDIT_METRIC_THRESHOLDS[name]
+        value = metrics[name]
+        if math.isnan(value):
+            point = constants.CREDIT_METRIC_NEUTRAL_POINT
+        elif math.isinf(value):
+            point = 1.0 if (value > 0) == (good > bad) else 0.0
+        else:
+            point = min(1.0, max(0.0, (value - bad) / (good - bad)))
+        total += weight * point
+    return int(round(total * constants.CREDIT_SCORE_MAX))
+
+def rating_for_score(score: int) -> str:
+    for rating, min_score in _TIERS:
+        if score >= min_score:
+            return rating
+    return _TIERS[-1][0]
+
+def rate_credit_score(score: int, current_rating: str) -> str:
+    """
+    スコアから格付けを決める。格付けの境界付近で毎四半期上下しないよう、
+    現在の格付けの範囲を上下に CREDIT_RATING_HYSTERESIS 点広げた範囲内にある間は格付けを据え置く。
+    一度の見直しで動かす段階は CREDIT_RATING_MAX_NOTCHES_PER_REVIEW までとし、それ以上の差は次の四半期以降に持ち越す。
+    """
+    if current_rating not in constants.CREDIT_RATING_TIERS:
+        return rating_for_score(score)
+    ratings = [rating for rating, _ in _TIERS]
+    index = ratings.index(current_rating)
+    lower = _TIERS[index][1] - constants.CREDIT_RATING_HYSTERESIS
+    upper = _TIERS[index - 1][1] + constants.CREDIT_RATING_HYSTERESIS if index > 0 else math.inf
+    if lower <= score < upper:
+        return current_rating
+    target = ratings.index(rating_for_score(score))
+    step = constants.CREDIT_RATING_MAX_NOTCHES_PER_REVIEW
+    return ratings[min(index + step, max(index - step, target))]
+
+class TrailingTotals:
+    """
+    直近 weeks 週の週次の値(売上・利益など)の合計。
+    週ごとの値をリングバッファに持ち、新しい週を足して期間外に出た週を引くことで、合計を差分で更新する。
+    """
+    def __init__(self, columns: int, weeks: int = GameTime.WEEKS_PER_YEAR):
+        self.buffer = np.zeros((weeks, columns), dtype=np.float64)
+        self.sums = np.zeros(columns, dtype=np.float64)
+        self.count: int = 0 # これまでに記録した週数
+
+    def push(self, values: List[float]):
+        row = self.count % len(self.buffer)
+        new = np.asarray(values, dtype=np.float64)
+        self.sums += new - self.buffer[row]
+        self.buffer[row] = new
+        self.count += 1
+        if row == len(self.buffer) - 1:
+            self.sums = self.buffer.sum(axis=0) # 一巡ごとに合計を取り直し、差分更新の誤差をためない
+
+    def annualized(self) -> np.ndarray:
+        """合計を1年分に換算した値。記録が1年に満たない場合は週平均から推定する。"""
+        weeks = min(self.count, len(self.buffer))
+        if weeks == 0:
+            return np.zeros_like(self.sums)
+        return self.sums * (GameTime.WEEKS_PER_YEAR / weeks)
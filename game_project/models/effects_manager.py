@@ -1,7 +1,10 @@
 # models/effects_manager.py
 # 省略なしの完全なコードです。
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .corporate_finance import CorporateFinance
 
 class EffectsManager:
     """
@@ -11,6 +14,38 @@ class EffectsManager:
         self.completed_rnd_projects: List[str] = []
         self.active_rnd_bonuses: Dict[str, Dict[str, Any]] = {}
         self.active_synergies: Dict[str, Dict[str, Any]] = {}
+        # 効果タイプごとのR&Dボーナス合計値。active_rnd_bonuses の変更時に更新する
+        self._rnd_bonus_totals: Dict[str, float] = {}
+        self.version: int = 0 # 効果が変わるたびに増える。店舗側のキャッシュ判定に使う
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if '_rnd_bonus_totals' not in state:
+            self.version = 0
+            self._rebuild_rnd_bonus_totals()
+
+    def _rebuild_rnd_bonus_totals(self):
+        """active_rnd_bonuses からボーナス合計表を作り直す。"""
+        totals: Dict[str, float] = {}
+        for bonus_data in self.active_rnd_bonuses.values():
+            bonus_type = bonus_data.get("type")
+            if bonus_type is not None:
+                totals[bonus_type] = totals.get(bonus_type, 0.0) + bonus_data.get("value", 0.0)
+        self._rnd_bonus_totals = totals
+        self.version += 1
+
+    def start_rnd_project(self, project_id: str, project_data: Dict[str, Any]):
+        """進行中のR&Dプロジェクトを登録する。"""
+        self.active_rnd_bonuses[project_id] = project_data
+        if project_data.get("type") is not None:
+            self._rebuild_rnd_bonus_totals()
+
+    def complete_rnd_project(self, project_id: str, bonus_effects_data: List[Dict[str, Any]]):
+        """進行中のR&Dプロジェクトを完了させ、ボーナス効果を有効化する。"""
+        self.add_completed_rnd_project(project_id, bonus_effects_data)
+        if project_id in self.active_rnd_bonuses:
+            del self.active_rnd_bonuses[project_id]
+            self._rebuild_rnd_bonus_totals()
 
     def add_completed_rnd_project(self, project_id: str, bonus_effects_data: List[Dict[str, Any]]):
         """完了したR&Dプロジェクトを追加し、ボーナス効果を有効化する。"""
@@ -21,6 +56,7 @@ class EffectsManager:
                 effect_id = f"{project_id}_{effect_data['type']}"
                 self.active_rnd_bonuses[effect_id] = effect_data.copy()
                 print(f"  [R&D] 新しい効果が有効になりました: {effect_data.get('description', effect_id)}")
+            self._rebuild_rnd_bonus_totals()
 
     def add_synergy(self, synergy_id: str, effect_data: Dict[str, Any]):
         """新しいM&Aシナジー効果を追加する。"""
@@ -30,13 +66,9 @@ class EffectsManager:
 
     def get_total_rnd_bonus(self, bonus_effect_type_key: str) -> float:
         """指定されたタイプの有効なR&Dボーナスの合計値を取得する。"""
-        total_bonus_value = 0.0
-        for _bonus_id, bonus_data in self.active_rnd_bonuses.items():
-            if bonus_data.get("type") == bonus_effect_type_key:
-                total_bonus_value += bonus_data.get("value", 0.0)
-        return total_bonus_value
+        return self._rnd_bonus_totals.get(bonus_effect_type_key, 0.0)
         
-    def process_weekly_updates(self, company_finances: Dict[str, float], total_variable_costs: float):
+    def process_weekly_updates(self, finance: 'CorporateFinance', total_variable_costs: float):
         """週次で全ての効果を処理し、期限切れのものを削除する。"""
         
         # M&Aシナジー効果の適用と更新
@@ -60,12 +92,8 @@ class EffectsManager:
                 
                 effect["remaining_weeks"] -= 1
 
-            if total_material_cost_reduction > 0:
-                company_finances['cash'] += total_material_cost_reduction
-                company_finances['total_costs'] -= total_material_cost_reduction
-            if total_fixed_cost_reduction > 0:
-                company_finances['cash'] += total_fixed_cost_reduction
-                company_finances['total_costs'] -= total_fixed_cost_reduction
+            finance.reduce_expense(total_material_cost_reduction, 'synergy_material_cost_reduction')
+            finance.reduce_expense(total_fixed_cost_reduction, 'synergy_fixed_cost_reduction')
 
             for sid in synergies_to_remove:
                 if sid in self.active_synergies:
@@ -85,3 +113,5 @@ class EffectsManager:
             for bid in rnd_bonuses_to_remove:
                 if bid in self.active_rnd_bonuses:
                     del self.active_rnd_bonuses[bid]
+            if rnd_bonuses_to_remove:
+                self._rebuild_rnd_bonus_totals()
@@ -0,0 +1,58 @@
+# models/event_calendar.py
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# (イベント種別, キー) の組。同じ組の予定は1件だけ保持する
+EventKey = Tuple[str, Hashable]
+
+class EventCalendar:
+    """
+    絶対週(total_weeks_elapsed)をキーにした予定表。
+    決算・配当、ローンの返済、社債の償還、ストックオプションの権利確定などの「N週目に起きること」を登録しておき、
+    pop_due(week) でその週までに期日を迎えた予定だけを取り出す。毎週すべての対象を調べる必要がなくなる。
+    """
+    def __init__(self):
+        self._buckets: Dict[int, Dict[EventKey, Any]] = {} # 週 -> {(種別, キー): ペイロード}
+        self._scheduled: Dict[EventKey, int] = {} # (種別, キー) -> 予定週
+        self._cursor: Optional[int] = None # 次に取り出す週。これより前の週への登録はこの週に回す
+
+    def schedule(self, week: int, kind: str, key: Hashable, payload: Any = None):
+        """week 週目に予定を登録する。同じ (kind, key) の予定が既にあれば置き換える。"""
+        self.cancel(kind, key)
+        if self._cursor is not None and week < self._cursor:
+            week = self._cursor # 過ぎた週の予定は次の取り出しで処理する
+        event_key = (kind, key)
+        self._buckets.setdefault(week, {})[event_key] = payload
+        self._scheduled[event_key] = week
+
+    def cancel(self, kind: str, key: Hashable) -> bool:
+        """予定を取り消す。取り消した場合は True を返す。"""
+        event_key = (kind, key)
+        week = self._scheduled.pop(event_key, None)
+        if week is None:
+            return False
+        bucket = self._buckets[week]
+        del bucket[event_key]
+        if not bucket:
+            del self._buckets[week]
+        return True
+
+    def get_scheduled_week(self, kind: str, key: Hashable) -> Optional[int]:
+        return self._scheduled.get((kind, key))
+
+    def pop_due(self, week: int) -> List[Tuple[str, Hashable, Any]]:
+        """week 週目までに期日を迎えた予定を、週の古い順に (種別, キー, ペイロード) のリストで取り出す。"""
+        if self._cursor is None:
+            self._cursor = min(self._buckets) if self._buckets else week
+        due = []
+        if self._buckets:
+            for w in range(self._cursor, week + 1):
+                bucket = self._buckets.pop(w, None)
+                if bucket:
+                    for event_key, payload in bucket.items():
+                        del self._scheduled[event_key]
+                        due.append((event_key[0], event_key[1], payload))
+        self._cursor = max(self._cursor, week + 1)
+        return due
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
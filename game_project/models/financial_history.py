@@ -0,0 +1,131 @@
+# models/financial_history.py
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import constants
+
+# 記録する財務KPI。売上・費用・純利益は累計値、現金・有利子負債は週末時点の残高
+KPI_FIELDS: Tuple[str, ...] = ("total_sales", "total_costs", "net_profit", "cash", "total_debt")
+
+class _SeriesTier:
+    """
+    1つの解像度(週次・月次・年次)の系列。週の昇順に (週, 集約キー, KPI) を配列で持つ。
+    同じ集約キーの記録が続いた場合は最後の行を上書きするため、各行は集約期間の最後の記録(期末値)になる。
+    max_rows を超えた古い行は先頭位置をずらして捨て、たまった分だけまとめて詰める。
+    """
+    __slots__ = ("weeks", "keys", "values", "head", "size", "max_rows")
+
+    def __init__(self, max_rows: Optional[int], capacity: int = 64):
+        self.weeks = np.zeros(capacity, dtype=np.int64)
+        self.keys = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, len(KPI_FIELDS)), dtype=np.float64)
+        self.head: int = 0
+        self.size: int = 0
+        self.max_rows: Optional[int] = max_rows
+
+    def __len__(self) -> int:
+        return self.size - self.head
+
+    def append(self, week: int, key: int, values: np.ndarray):
+        if self.size > self.head and self.keys[self.size - 1] == key:
+            i = self.size - 1
+        else:
+            if self.size == len(self.weeks):
+                self._compact_or_grow()
+            i = self.size
+            self.size += 1
+        self.weeks[i] = week
+        self.keys[i] = key
+        self.values[i] = values
+        if self.max_rows is not None and len(self) > self.max_rows:
+            self.head = self.size - self.max_rows
+
+    def _compact_or_grow(self):
+        count = len(self)
+        if self.head > 0 and count * 2 <= len(self.weeks):
+            # 捨てた行の分だけ前に詰める
+            for name in ("weeks", "keys", "values"):
+                array = getattr(self, name)
+                array[:count] = array[self.head:self.size]
+        else:
+            for name in ("weeks", "keys", "values"):
+                array = getattr(self, name)
+                grown = np.zeros((len(array) * 2,) + array.shape[1:], dtype=array.dtype)
+                grown[:count] = array[self.head:self.size]
+                setattr(self, name, grown)
+        self.head = 0
+        self.size = count
+
+    def first_week(self) -> Optional[int]:
+        return int(self.weeks[self.head]) if len(self) else None
+
+    def find(self, week: int) -> Optional[int]:
+        """week 以前で最も新しい行の位置。なければ None。"""
+        i = int(np.searchsorted(self.weeks[self.head:self.size], week, side='right')) - 1
+        return self.head + i if i >= 0 else None
+
+    def row(self, i: int) -> Dict[str, float]:
+        snapshot = {"week": int(self.weeks[i])}
+        snapshot.update(zip(KPI_FIELDS, self.values[i].tolist()))
+        return snapshot
+
+class FinancialHistory:
+    """
+    会社の財務KPIの週次の時系列。
+    直近 FINANCIAL_HISTORY_WEEKLY_ROWS 週は週単位、それより古い期間は月末・年末の値に集約して保持するため、
+    長く遊んでも記録量は一定の範囲に収まる。任意の週の値は、その週を含む最も細かい解像度の系列を
+    二分探索して求め、累計値の差で任意の期間の売上・利益が分かる。
+    """
+    def __init__(self):
+        self.weekly = _SeriesTier(constants.FINANCIAL_HISTORY_WEEKLY_ROWS)
+        self.monthly = _SeriesTier(constants.FINANCIAL_HISTORY_MONTHLY_ROWS)
+        self.yearly = _SeriesTier(None)
+        self.origin: Optional[Dict[str, float]] = None # 最初の記録(集約で消えないよう別に持つ)
+        self.version: int = 0 # 記録のたびに増える(集計結果のキャッシュ用)
+
+    def __len__(self) -> int:
+        return len(self.weekly)
+
+    def record(self, week: int, year: int, month: int, kpis: Dict[str, float]):
+        """week 週末時点のKPIを記録する。同じ週を再度記録した場合は上書きする。"""
+        values = np.array([kpis.get(field, 0.0) for field in KPI_FIELDS], dtype=np.float64)
+        self.weekly.append(week, week, values)
+        self.monthly.append(week, year * 12 + month, values)
+        self.yearly.append(week, year, values)
+        if self.origin is None:
+            self.origin = self.weekly.row(self.weekly.size - 1)
+        self.version += 1
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        if not len(self.weekly):
+            return None
+        return self.weekly.row(self.weekly.size - 1)
+
+    def first(self) -> Optional[Dict[str, float]]:
+        return self.origin
+
+    def at(self, week: int) -> Optional[Dict[str, float]]:
+        """week 週以前で最も新しい記録。週次の保持期間より古い週は月次・年次の期末値から探す。"""
+        for tier in (self.weekly, self.monthly, self.yearly):
+            first_week = tier.first_week()
+            if first_week is not None and week >= first_week:
+                return tier.row(tier.find(week))
+        if self.origin is not None and week >= self.origin["week"]:
+            return self.origin
+        return None
+
+    def change(self, field: str, start_week: int, end_week: int) -> Optional[float]:
+        """start_week 週時点から end_week 週時点までの field の増減。どちらかの記録がなければ None。"""
+        start = self.at(start_week)
+        end = self.at(end_week)
+        if start is None or end is None:
+            return None
+        return end[field] - start[field]
+
+    def series(self, field: str, resolution: str = "weekly") -> Tuple[List[int], List[float]]:
+        """グラフ表示用に、指定した解像度('weekly' / 'monthly' / 'yearly')の (週のリスト, 値のリスト) を返す。"""
+        tier = getattr(self, resolution)
+        column = KPI_FIELDS.index(field)
+        return (tier.weeks[tier.head:tier.size].tolist(),
+                tier.values[tier.head:tier.size, column].tolist())
@@ -0,0 +1,165 @@
+# models/general_ledger.py
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# 勘定科目。借方 - 貸方 を残高として持つ(収益・外部勘定は貸方が正)
+ACCOUNT_CASH: int = 0 # 現金
+ACCOUNT_REVENUE: int = 1 # 収益(売上高)
+ACCOUNT_EXPENSE: int = 2 # 費用
+ACCOUNT_EXTERNAL: int = 3 # 損益に含めない相手勘定(借入・社債・増資・株式の売買代金など)
+ACCOUNT_NAMES = ("cash", "revenue", "expense", "external")
+_CREDIT_NORMAL = np.array([1.0, -1.0, 1.0, -1.0]) # 残高を通常の符号に直す係数
+
+class GeneralLedger:
+    """
+    会社の仕訳帳。仕訳(週, 借方科目, 貸方科目, 区分, 金額)を型付きの配列に追記するだけの複式簿記の台帳。
+    区分名は初回に番号を割り当て(インターン)、以後は番号で記録するため、記帳時に文字列を組み立てない。
+    科目ごとの残高と区分ごとの累計を記帳のたびに更新し、さらに週ごとの累計(累積和)を持つため、
+    残高・任意の期間の損益は O(1) で求められる。期間を指定した区分別の内訳は、週で並んだ仕訳を二分探索して集計する。
+    """
+    def __init__(self, capacity: int = 256):
+        capacity = max(1, capacity)
+        self.size: int = 0
+        self.current_week: int = 0 # 記帳する仕訳の週。週次処理の開始時に進める
+        self.weeks = np.zeros(capacity, dtype=np.int32)
+        self.debits = np.zeros(capacity, dtype=np.int8)
+        self.credits = np.zeros(capacity, dtype=np.int8)
+        self.categories = np.zeros(capacity, dtype=np.int32)
+        self.amounts = np.zeros(capacity, dtype=np.float64)
+        self.category_names: List[str] = []
+        self._category_ids: Dict[str, int] = {}
+        self._balances = np.zeros(len(ACCOUNT_NAMES), dtype=np.float64)
+        self._category_totals = np.zeros((8, len(ACCOUNT_NAMES)), dtype=np.float64) # 区分 x 科目 の累計
+        self._first_week: int = 0 # _week_totals の先頭行の週
+        self._last_week: int = -1 # _week_totals に書き込み済みの最後の週
+        self._week_totals = np.zeros((64, len(ACCOUNT_NAMES)), dtype=np.float64) # 週末時点の科目別累計
+
+    def __getstate__(self):
+        # 未使用の容量は保存しない
+        state = self.__dict__.copy()
+        for name in ("weeks", "debits", "credits", "categories", "amounts"):
+            state[name] = state[name][:self.size].copy()
+        state["_category_totals"] = self._category_totals[:len(self.category_names)].copy()
+        state["_week_totals"] = self._week_totals[:max(0, self._last_week - self._first_week + 1)].copy()
+        return state
+
+    def __len__(self) -> int:
+        return self.size
+
+    # --- 記帳 ---
+    def set_week(self, week: int):
+        """以後の仕訳を week 週目として記帳する。週は戻らない。"""
+        if week > self.current_week:
+            self.current_week = week
+
+    def category_id(self, category: str) -> int:
+        """区分名の番号を返す。初めての区分には新しい番号を割り当てる。"""
+        cid = self._category_ids.get(category)
+        if cid is None:
+            cid = len(self.category_names)
+            self._category_ids[category] = cid
+            self.category_names.append(category)
+            if cid >= len(self._category_totals):
+                self._category_totals = self._grow_rows(self._category_totals, cid + 1)
+        return cid
+
+    @staticmethod
+    def _grow_rows(array: np.ndarray, min_rows: int) -> np.ndarray:
+        grown = np.zeros((max(min_rows, len(array) * 2, 1),) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def post(self, debit: int, credit: int, category: str, amount: float):
+        """仕訳を1件追記する(借方 debit に amount、貸方 credit に amount)。"""
+        if self.size == len(self.amounts):
+            for name in ("weeks", "debits", "credits", "categories", "amounts"):
+                setattr(self, name, self._grow_rows(getattr(self, name), self.size + 1))
+        week = self.current_week
+        cid = self.category_id(category)
+        i = self.size
+        self.weeks[i] = week
+        self.debits[i] = debit
+        self.credits[i] = credit
+        self.categories[i] = cid
+        self.amounts[i] = amount
+        self.size = i + 1
+
+        self._balances[debit] += amount
+        self._balances[credit] -= amount
+        totals = self._category_totals[cid]
+        totals[debit] += amount
+        totals[credit] -= amount
+        row = self._week_row(week)
+        row[debit] += amount
+        row[credit] -= amount
+
+    def _week_row(self, week: int) -> np.ndarray:
+        """week 週末時点の累計の行を返す。間の週は直前の累計で埋める。"""
+        if self._last_week < 0:
+            if len(self._week_totals) == 0:
+                self._week_totals = self._grow_rows(self._week_totals, 1)
+            self._first_week = week
+            self._last_week = week
+            self._week_totals[0] = 0.0
+            return self._week_totals[0]
+        last = self._last_week - self._first_week
+        if week > self._last_week:
+            index = week - self._first_week
+            if index >= len(self._week_totals):
+                self._week_totals = self._grow_rows(self._week_totals, index + 1)
+            self._week_totals[last + 1:index + 1] = self._week_totals[last]
+            self._last_week = week
+            return self._week_totals[index]
+        return self._week_totals[last]
+
+    # --- 照会 ---
+    @property
+    def first_week(self) -> Optional[int]:
+        """最初に記帳した週。まだ記帳が無ければ None。"""
+        return self._first_week if self._last_week >= 0 else None
+
+    def balance(self, account: int) -> float:
+        """科目の現在の残高(通常の符号)。"""
+        return float(self._balances[account] * _CREDIT_NORMAL[account])
+
+    def balance_at(self, account: int, week: int) -> float:
+        """week 週末時点の科目の残高。"""
+        if self._last_week < 0 or week < self._first_week:
+            return 0.0
+        index = min(week, self._last_week) - self._first_week
+        return float(self._week_totals[index, account] * _CREDIT_NORMAL[account])
+
+    def period_total(self, account: int, start_week: int, end_week: int) -> float:
+        """start_week 週から end_week 週まで(両端を含む)の科目の増減。"""
+        return self.balance_at(account, end_week) - self.balance_at(account, start_week - 1)
+
+    def profit_and_loss(self, start_week: int, end_week: int) -> Dict[str, float]:
+        """期間の損益(売上高・費用・純利益)。"""
+        revenue = self.period_total(ACCOUNT_REVENUE, start_week, end_week)
+        expense = self.period_total(ACCOUNT_EXPENSE, start_week, end_week)
+        return {"revenue": revenue, "expense": expense, "net_profit": revenue - expense}
+
+    def category_total(self, account: int, category: str) -> float:
+        """区分の累計(通常の符号)。"""
+        cid = self._category_ids.get(category)
+        if cid is None:
+            return 0.0
+        return float(self._category_totals[cid, account] * _CREDIT_NORMAL[account])
+
+    def category_breakdown(self, account: int, start_week: Optional[int] = None,
+                           end_week: Optional[int] = None) -> Dict[str, float]:
+        """科目の区分別の内訳。期間を省略した場合は累計を返す。"""
+        n_categories = len(self.category_names)
+        if start_week is None and end_week is None:
+            values = self._category_totals[:n_categories, account] * _CREDIT_NORMAL[account]
+        else:
+            weeks = self.weeks[:self.size]
+            lo = 0 if start_week is None else int(np.searchsorted(weeks, start_week, side='left'))
+            hi = self.size if end_week is None else int(np.searchsorted(weeks, end_week, side='right'))
+            categories = self.categories[lo:hi]
+            amounts = self.amounts[lo:hi]
+            signed = (np.where(self.debits[lo:hi] == account, amounts, 0.0)
+                      - np.where(self.credits[lo:hi] == account, amounts, 0.0))
+            values = np.bincount(categories, weights=signed, minlength=n_categories) * _CREDIT_NORMAL[account]
+        return {name: float(value) for name, value in zip(self.category_names, values) if value != 0.0}
@@ -0,0 +1,74 @@
+# models/holder_index.py
+from typing import Callable, Dict, Iterable, List, Mapping, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .portfolio import Portfolio
+
+# 配当の受取先。(ティッカー, 配当総額) を受け取り、口座の持ち主の現金に反映する
+DividendPayee = Callable[[str, float], None]
+
+class HolderIndex:
+    """
+    ティッカー → その銘柄を保有しているポートフォリオ の索引。
+    プレイヤーの会社・個人ポートフォリオと各競合他社のポートフォリオを登録しておき、
+    配当日は保有者のいる銘柄・保有者だけに配当を支払う。受取先はポートフォリオ自体をキーに、支払いのたびに呼び出し側から渡す。
+    索引は Portfolio の売買(buy_stock / sell_stock など)のたびに Portfolio 側から更新される。
+    索引は各ポートフォリオの保有銘柄から作り直せるため保存しない(MarketRegistry・Portfolio の __getstate__ で除く)。
+    """
+    def __init__(self):
+        self._holders: Dict[str, Dict['Portfolio', None]] = {} # 挿入順を保つ集合として dict を使う
+        self._registered: Dict['Portfolio', None] = {} # 登録済みのポートフォリオ
+
+    def register(self, portfolio: 'Portfolio'):
+        """ポートフォリオを配当の受取口座として登録し、現在の保有銘柄を索引に加える。"""
+        self._registered[portfolio] = None
+        portfolio.attach_holder_index(self)
+        for ticker in portfolio.general_stock_portfolio:
+            self._holders.setdefault(ticker, {})[portfolio] = None
+
+    def unregister(self, portfolio: 'Portfolio'):
+        self._registered.pop(portfolio, None)
+        for ticker in list(portfolio.general_stock_portfolio):
+            self._discard(ticker, portfolio)
+
+    def is_registered(self, portfolio: 'Portfolio') -> bool:
+        return portfolio in self._registered
+
+    def update(self, portfolio: 'Portfolio', ticker: str):
+        """ポートフォリオの ticker の保有状況が変わったときに呼ばれる。"""
+        if portfolio not in self._registered:
+            return
+        if ticker in portfolio.general_stock_portfolio:
+            self._holders.setdefault(ticker, {})[portfolio] = None
+        else:
+            self._discard(ticker, portfolio)
+
+    def _discard(self, ticker: str, portfolio: 'Portfolio'):
+        holders = self._holders.get(ticker)
+        if holders is not None:
+            holders.pop(portfolio, None)
+            if not holders:
+                del self._holders[ticker]
+
+    def get_holders(self, ticker: str) -> List['Portfolio']:
+        return list(self._holders.get(ticker, ()))
+
+    def distribute_dividends(self, payouts: Iterable[Tuple[str, float]], payees: Mapping['Portfolio', DividendPayee]) -> float:
+        """
+        (ティッカー, 1株あたり配当) の一覧に従って保有者へ配当を支払い、支払総額を返す。
+        payees はポートフォリオ -> 受取先 の対応で、支払いのたびに呼び出し側が現在の持ち主から作る。
+        """
+        total_paid = 0.0
+        for ticker, dividend_per_share in payouts:
+            holders = self._holders.get(ticker)
+            if not holders or dividend_per_share <= 0:
+                continue
+            for portfolio in list(holders):
+                payee = payees.get(portfolio)
+                if payee is None:
+                    continue
+                amount = portfolio.receive_dividend(ticker, dividend_per_share)
+                if amount > 0:
+                    payee(ticker, amount)
+                    total_paid += amount
+        return total_paid
@@ -6,7 +6,7 @@ from typing import Optional, TYPE_CHECKING, List
 if TYPE_CHECKING:
     from .player import Player
     from .game_time import GameTime
-    from .listed_company import ListedCompany
+    from .market_registry import MarketRegistry
 
 import constants
 
@@ -53,8 +53,7 @@ class IPOManager:
             print(f"IPO準備失敗: 引受手数料(¥{fee:,.0f})を支払う資金がありません。")
             return False
 
-        player.finance.finances['cash'] -= fee
-        player.finance.finances['total_costs'] += fee
+        player.finance.record_expense(fee, 'ipo_underwriter_fee')
         
         self.is_in_preparation = True
         self.preparation_weeks_remaining = constants.IPO_PROCESS_WEEKS
@@ -68,7 +67,7 @@ class IPOManager:
         print(f"上場までの準備期間は {self.preparation_weeks_remaining}週です。")
         return True
 
-    def process_ipo_events(self, player: 'Player', game_time: 'GameTime', market_list: List['ListedCompany']):
+    def process_ipo_events(self, player: 'Player', game_time: 'GameTime', market_list: 'MarketRegistry'):
         """IPOプロセスの週次更新を行う。"""
         if not self.is_in_preparation:
             return
@@ -80,7 +79,7 @@ class IPOManager:
         if self.preparation_weeks_remaining <= 0:
             self.finalize_ipo(player, market_list, game_time)
 
-    def finalize_ipo(self, player: 'Player', market_list: List['ListedCompany'], game_time: 'GameTime'):
+    def finalize_ipo(self, player: 'Player', market_list: 'MarketRegistry', game_time: 'GameTime'):
         """IPOプロセスの最終処理を行う。"""
         print("\n--- IPO公開日 ---")
         
@@ -91,9 +90,10 @@ class IPOManager:
         else:
             print("IPO成功!あなたの会社は株式市場に上場しました。")
             self.is_company_public = True
-            # ティッカーシンボルを決定
-            # ... (ティッカーシンボル生成ロジック)
-            # self.company_ticker_symbol = new_ticker
+            # ティッカーシンボルを決定(市場のティッカー払い出しから確保する)
+            if self.company_ticker_symbol is None:
+                self.company_ticker_symbol = market_list.ticker_allocator.reserve()
+                print(f"ティッカーシンボル: {self.company_ticker_symbol}")
             
             # (資金調達などの処理)
             pass
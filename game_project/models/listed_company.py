@@ -6,86 +6,218 @@ import string
 from typing import List, Dict, Any, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    import numpy as np
     from .player import Player
     from .game_time import GameTime
 
+from .market_engine import MarketEngine
 import constants
 
+if TYPE_CHECKING:
+    from .event_calendar import EventCalendar
+
 class ListedCompany:
     """
     一般市場に上場している企業を表すクラス。
+    株価などの数値データは MarketEngine の1行として保持し、このクラスはそのビューとなる。
+    社名・セクター・企業概要・主要株主・業績予想は、from_engine_row で生成した場合は
+    metadata_seed から初回参照時に生成する(同じシードからは常に同じ内容になる)。
     """
     def __init__(self, ticker_symbol: str, company_name: str, sector: str,
                  initial_market_cap: float, initial_price: float,
                  shares_outstanding: int, founded_year: int,
                  initial_pbr_multiplier: float,
                  description: str, major_shareholders: List[Dict[str, Any]],
-                 earnings_forecast: Dict[str, float]):
+                 earnings_forecast: Dict[str, float],
+                 engine: Optional[MarketEngine] = None):
         
-        self.company_name: str = company_name
+        self.metadata_seed: Optional[int] = None
+        self._company_name: Optional[str] = company_name
         self.ticker_symbol: str = ticker_symbol
-        self.sector: str = sector
+        self._sector: Optional[str] = sector
         self.founded_year: int = founded_year
         
         # ▼▼▼ 新しい属性を追加 ▼▼▼
-        self.description: str = description
-        self.major_shareholders: List[Dict[str, Any]] = major_shareholders
+        self._description: Optional[str] = description
+        self._major_shareholders: Optional[List[Dict[str, Any]]] = major_shareholders
         self.quarterly_results_history: List[Dict[str, Any]] = []
-        self.earnings_forecast: Dict[str, float] = earnings_forecast
+        self._earnings_forecast: Optional[Dict[str, float]] = earnings_forecast
         # ▲▲▲ 追加ここまで ▲▲▲
         
-        self.current_price: float = initial_price
-        self.market_cap: float = initial_market_cap
-        self.shares_outstanding: int = shares_outstanding
-        
         if initial_pbr_multiplier > 0:
-            self.net_assets: float = self.market_cap / initial_pbr_multiplier
+            net_assets = initial_market_cap / initial_pbr_multiplier
         else:
-            self.net_assets: float = self.market_cap
-            
-        self.earnings_per_share_ttm: float = 0.0
-        self.p_e_ratio: float = float('inf')
-        self.update_financial_ratios()
+            net_assets = initial_market_cap
+
+        # 市場エンジンが渡されない場合は、この銘柄専用のエンジンを持つ
+        self._engine: MarketEngine = engine if engine is not None else MarketEngine(capacity=1)
+        self._row: int = self._engine.add_row(initial_price, shares_outstanding, net_assets)
         
         self.next_earnings_announcement_week: int = random.randint(1, 13)
-        self.last_quarterly_dividend_per_share: float = 0.0
-        
-        self.historical_prices: List[float] = [self.current_price]
-        
-        self.is_subsidiary: bool = False
+
+    @classmethod
+    def from_engine_row(cls, ticker_symbol: str, engine: MarketEngine, row: int, founded_year: int,
+                        metadata_seed: int, next_earnings_announcement_week: int) -> 'ListedCompany':
+        """
+        MarketEngine に追加済みの行から企業を作る(市場の一括生成用)。
+        説明用の属性は生成せず、metadata_seed だけを持たせる。
+        """
+        company = cls.__new__(cls)
+        company.metadata_seed = metadata_seed
+        company._company_name = None
+        company.ticker_symbol = ticker_symbol
+        company._sector = None
+        company.founded_year = founded_year
+        company._description = None
+        company._major_shareholders = None
+        company.quarterly_results_history = []
+        company._earnings_forecast = None
+        company._engine = engine
+        company._row = row
+        company.next_earnings_announcement_week = next_earnings_announcement_week
+        return company
+
+    def __setstate__(self, state):
+        # 説明用の属性を遅延生成に対応させる前のセーブデータ
+        for name in ('company_name', 'sector', 'description', 'major_shareholders', 'earnings_forecast'):
+            if name in state:
+                state['_' + name] = state.pop(name)
+        state.setdefault('metadata_seed', None)
+        # 配当を MarketEngine の列で持つ前のセーブデータ
+        dividend = state.pop('last_quarterly_dividend_per_share', None)
+        self.__dict__.update(state)
+        if dividend is not None:
+            self.last_quarterly_dividend_per_share = dividend
+
+    # --- 説明用の属性(初回参照時に生成) ---
+    def _generate_identity(self):
+        """社名とセクターを metadata_seed から生成する。"""
+        rng = random.Random(self.metadata_seed)
+        parts = []
+        if rng.random() < 0.7: parts.append(rng.choice(constants.COMPANY_NAME_ELEMENTS_PREFIX))
+        parts.append(rng.choice(constants.COMPANY_NAME_ELEMENTS_MIDDLE))
+        if rng.random() < 0.8: parts.append(rng.choice(constants.COMPANY_NAME_ELEMENTS_SUFFIX))
+        if self._company_name is None:
+            self._company_name = "".join(parts)
+        if self._sector is None:
+            self._sector = rng.choice(constants.STOCK_SECTORS)
+
+    def _generate_details(self):
+        """企業概要・主要株主・業績予想を metadata_seed から生成する。"""
+        rng = random.Random((self.metadata_seed or 0) ^ 0x5F3759DF) # 社名とは別系列の乱数を使う
+        description = rng.choice(constants.COMPANY_DESCRIPTION_TEMPLATES).format(
+            sector=self.sector, founded_year=self.founded_year
+        )
+
+        num_shareholders = rng.randint(3, 5)
+        shareholders = rng.sample(constants.MAJOR_SHAREHOLDER_NAMES, num_shareholders)
+        major_shareholders = []
+        remaining_stake = 25.0 + rng.uniform(-5.0, 5.0)
+        for j, sh_name in enumerate(shareholders):
+            if j == len(shareholders) - 1:
+                stake = remaining_stake
+            else:
+                stake = rng.uniform(3.0, 7.0)
+
+            if remaining_stake - stake < 0:
+                stake = remaining_stake
+
+            major_shareholders.append({"name": sh_name, "stake": round(stake, 2)})
+            remaining_stake -= stake
+
+        earnings_forecast = {
+            "sales_growth": round(rng.uniform(-0.02, 0.10), 3),
+            "profit_growth": round(rng.uniform(-0.05, 0.15), 3)
+        }
+        if self._description is None: self._description = description
+        if self._major_shareholders is None: self._major_shareholders = major_shareholders
+        if self._earnings_forecast is None: self._earnings_forecast = earnings_forecast
+
+    @property
+    def company_name(self) -> str:
+        if self._company_name is None: self._generate_identity()
+        return self._company_name
+    @company_name.setter
+    def company_name(self, value: str): self._company_name = value
+    @property
+    def sector(self) -> str:
+        if self._sector is None: self._generate_identity()
+        return self._sector
+    @sector.setter
+    def sector(self, value: str): self._sector = value
+    @property
+    def description(self) -> str:
+        if self._description is None: self._generate_details()
+        return self._description
+    @description.setter
+    def description(self, value: str): self._description = value
+    @property
+    def major_shareholders(self) -> List[Dict[str, Any]]:
+        if self._major_shareholders is None: self._generate_details()
+        return self._major_shareholders
+    @major_shareholders.setter
+    def major_shareholders(self, value: List[Dict[str, Any]]): self._major_shareholders = value
+    @property
+    def earnings_forecast(self) -> Dict[str, float]:
+        if self._earnings_forecast is None: self._generate_details()
+        return self._earnings_forecast
+    @earnings_forecast.setter
+    def earnings_forecast(self, value: Dict[str, float]): self._earnings_forecast = value
+
+    # --- MarketEngine の行へのビュー ---
+    @property
+    def engine(self) -> MarketEngine: return self._engine
+    @property
+    def engine_row(self) -> int: return self._row
+    @property
+    def current_price(self) -> float: return float(self._engine.price[self._row])
+    @current_price.setter
+    def current_price(self, value: float): self._engine.set_price(self._row, value)
+    @property
+    def shares_outstanding(self) -> int: return int(self._engine.shares_outstanding[self._row])
+    @shares_outstanding.setter
+    def shares_outstanding(self, value: int): self._engine.shares_outstanding[self._row] = value
+    @property
+    def net_assets(self) -> float: return float(self._engine.net_assets[self._row])
+    @net_assets.setter
+    def net_assets(self, value: float): self._engine.net_assets[self._row] = value
+    @property
+    def earnings_per_share_ttm(self) -> float: return float(self._engine.eps_ttm[self._row])
+    @earnings_per_share_ttm.setter
+    def earnings_per_share_ttm(self, value: float): self._engine.eps_ttm[self._row] = value
+    @property
+    def market_cap(self) -> float: return float(self._engine.market_cap[self._row])
+    @property
+    def p_e_ratio(self) -> float: return float(self._engine.pe_ratio[self._row])
+    @property
+    def is_subsidiary(self) -> bool: return bool(self._engine.is_subsidiary[self._row])
+    @is_subsidiary.setter
+    def is_subsidiary(self, value: bool): self._engine.is_subsidiary[self._row] = value
+    @property
+    def last_quarterly_dividend_per_share(self) -> float: return float(self._engine.dividend_per_share[self._row])
+    @last_quarterly_dividend_per_share.setter
+    def last_quarterly_dividend_per_share(self, value: float): self._engine.dividend_per_share[self._row] = value
+    @property
+    def historical_prices(self) -> 'np.ndarray': return self._engine.get_price_history(self._row)
+
+    def get_indicators(self) -> Dict[str, float]:
+        """テクニカル指標(移動平均・ボラティリティ・RSI・52週高値/安値など)を返す。MarketEngine で毎週まとめて更新される。"""
+        return self._engine.get_indicators(self._row)
+
+    def get_price_history_window(self, weeks: int) -> 'np.ndarray':
+        """直近 weeks 週分の株価履歴をチャート描画用のビューで返す。"""
+        return self._engine.get_price_history(self._row, weeks)
 
     def update_stock_price(self, economic_phase: str):
-        """週次の株価変動を計算し、株価と関連指標を更新する。"""
-        base_volatility_min, base_volatility_max = constants.BASE_WEEKLY_STOCK_PRICE_VOLATILITY
-        price_change_rate = random.uniform(base_volatility_min, base_volatility_max)
-        
-        econ_impact_min, econ_impact_max = constants.STOCK_MARKET_ECONOMIC_IMPACT_WEEKLY.get(economic_phase, (0.0,0.0))
-        price_change_rate += random.uniform(econ_impact_min, econ_impact_max)
-        
-        if random.random() < constants.STOCK_NEWS_EVENT_PROBABILITY_WEEKLY:
-            news_impact = random.uniform(constants.STOCK_NEWS_IMPACT_RANGE[0], constants.STOCK_NEWS_IMPACT_RANGE[1])
-            price_change_rate += news_impact
-        
-        new_price = self.current_price * (1 + price_change_rate)
-        self.current_price = max(1.0, round(new_price, 2))
-        
-        self.historical_prices.append(self.current_price)
-        if len(self.historical_prices) > 52:
-            self.historical_prices.pop(0)
-        
-        self.update_financial_ratios()
+        """
+        この銘柄単独で株価変動を計算し、株価と財務指標を更新する。株価履歴・テクニカル指標は進めない。
+        市場全体の週次更新は MarketEngine.advance_week で一括して行う。
+        """
+        self._engine.advance_row(self._row, economic_phase)
 
     def update_financial_ratios(self):
         """現在の株価に基づいて財務指標を更新する。"""
-        if self.shares_outstanding > 0:
-            self.market_cap = self.current_price * self.shares_outstanding
-            if self.earnings_per_share_ttm > 0:
-                self.p_e_ratio = self.current_price / self.earnings_per_share_ttm
-            else:
-                self.p_e_ratio = float('inf')
-        else:
-            self.market_cap = 0
-            self.p_e_ratio = float('inf')
+        self._engine.update_ratios(self._row)
             
     def get_book_value_per_share(self) -> float:
         """1株あたり純資産 (BPS) を計算する。"""
@@ -108,6 +240,11 @@ class ListedCompany:
             return annual_dividend / self.current_price
         return 0.0
 
+    def schedule_events(self, calendar: 'EventCalendar'):
+        """次回の決算発表と、その前週の配当支払いを予定表に登録する。"""
+        calendar.schedule(self.next_earnings_announcement_week, constants.EVENT_EARNINGS, self.ticker_symbol, self)
+        calendar.schedule(self.next_earnings_announcement_week - 1, constants.EVENT_DIVIDEND, self.ticker_symbol, self)
+
     def process_earnings_announcement(self, game_time: 'GameTime'):
         """四半期決算発表を処理する。"""
         if self.next_earnings_announcement_week <= game_time.total_weeks_elapsed:
@@ -133,8 +270,11 @@ class ListedCompany:
             self.update_financial_ratios()
             print(f"  [決算発表] {self.company_name} ({self.ticker_symbol}) が決算を発表しました。")
 
-    def process_dividend_payment(self, player: 'Player', game_time: 'GameTime'):
-        """四半期ごとの配当支払いを処理する。"""
+    def process_dividend_payment(self, game_time: 'GameTime') -> Optional[float]:
+        """
+        四半期ごとの配当を決定する。支払週であれば1株あたり配当を返し、それ以外は None を返す。
+        保有者への支払いは MarketRegistry.holders(HolderIndex)がまとめて行う。
+        """
         if (self.next_earnings_announcement_week - 1) == game_time.total_weeks_elapsed: 
             if self.earnings_per_share_ttm > 0:
                 payout_ratio = random.uniform(0.2, 0.5)
@@ -142,8 +282,8 @@ class ListedCompany:
                 self.last_quarterly_dividend_per_share = round(annual_dividend / 4, 2)
             else:
                 self.last_quarterly_dividend_per_share = 0.0
-
-            player.receive_dividend(self.ticker_symbol, self.last_quarterly_dividend_per_share)
+            return self.last_quarterly_dividend_per_share
+        return None
 
     def get_weekly_profit_as_subsidiary(self) -> float:
         """子会社としての週次利益(推定)を返す。"""
@@ -2,26 +2,66 @@
 # 省略なしの完全なコードです。
 
 import uuid
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+import numpy as np
+
+import constants
+
+if TYPE_CHECKING:
+    from .loan_book import LoanBook
 
 class Loan:
     """
-    個別のローン契約の情報を保持するデータクラス。
+    個別のローン契約の情報を保持するクラス。
+    元本残高・返済済み週数は借入台帳(LoanBook)の配列に持ち、契約ごとの枠番号(slot)で参照する。
     """
-    def __init__(self, principal: float, weekly_rate: float, total_weeks: int, issued_week: int, lender_name: str, product_name: str):
+    def __init__(self, book: 'LoanBook', principal: float, weekly_rate: float, total_weeks: int, issued_week: int,
+                 lender_name: str, product_name: str, repayment_method: str = constants.DEFAULT_LOAN_REPAYMENT_METHOD):
         self.loan_id: str = f"LOAN-{str(uuid.uuid4())[:8]}"
         self.principal_borrowed: float = principal  # 当初借入元本
-        self.remaining_principal: float = principal # 元本残高
         self.weekly_rate: float = weekly_rate # 週利
         self.total_weeks: int = total_weeks # 総返済週数
-        self.weeks_repaid: int = 0 # これまで返済した週数
         self.issued_week: int = issued_week # 借入時の総経過週数
         self.lender_name: str = lender_name # 貸し手銀行名
         self.product_name: str = product_name # ローン商品名
+        self.book: Optional['LoanBook'] = book
+        self.slot: int = book.open(principal, weekly_rate, issued_week + total_weeks, repayment_method)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('book', None) # 台帳の導入前のセーブデータは CorporateFinance が台帳に登録し直す
+
+    @property
+    def remaining_principal(self) -> float:
+        """元本残高"""
+        return float(self.book.remaining[self.slot])
+
+    @property
+    def weeks_repaid(self) -> int:
+        """これまで返済した週数"""
+        return int(self.book.weeks_repaid[self.slot])
+
+    @property
+    def maturity_week(self) -> int:
+        """最終返済週"""
+        return int(self.book.maturity[self.slot])
+
+    @property
+    def repayment_method(self) -> str:
+        return self.book.method_of(self.slot)
 
     def calculate_interest(self) -> float:
         """このローンの週次の支払利息を計算する。"""
         return self.remaining_principal * self.weekly_rate
 
+    def get_schedule(self, current_week: int) -> Dict[str, Any]:
+        """来週以降、約定どおり返済した場合の返済予定表と合計を返す。"""
+        schedule = self.book.project(self.slot, current_week + 1)
+        schedule["total_interest"] = float(np.sum(schedule["interest"]))
+        schedule["total_payment"] = schedule["total_interest"] + float(np.sum(schedule["principal"]))
+        return schedule
+
     def __str__(self) -> str:
         """ローン情報を分かりやすく文字列で返す。"""
         return (f"ID: ...{self.loan_id[-6:]} | {self.lender_name}「{self.product_name}」 "
@@ -0,0 +1,171 @@
+# models/loan_book.py
+import heapq
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+import constants
+
+# 返済方式の番号(配列に持つ値)
+_METHODS: Tuple[str, ...] = (constants.LOAN_REPAYMENT_ANNUITY, constants.LOAN_REPAYMENT_EQUAL_PRINCIPAL,
+                             constants.LOAN_REPAYMENT_BULLET)
+_ANNUITY, _EQUAL_PRINCIPAL, _BULLET = range(len(_METHODS))
+_PAID_OFF_EPSILON: float = 0.005 # これ以下の元本残高は完済とみなす
+
+class LoanBook:
+    """
+    借入契約の台帳。元本残高・週利・満期週・返済方式を契約ごとの配列に持ち、
+    毎週の利息と約定返済元本を全契約まとめて配列演算で求める。
+    約定返済額は「元本残高・残り週数」から毎週計算し直すため、繰上返済や返済の延滞があっても満期に完済する返済計画が保たれる。
+    満期を迎える契約は満期週ごとの暦に登録しておき、その週に来た契約だけを確認して終了させる。
+    """
+    def __init__(self, capacity: int = 8):
+        capacity = max(1, capacity)
+        self.size: int = 0 # 使用したことのある枠の数
+        self.remaining = np.zeros(capacity, dtype=np.float64) # 元本残高
+        self.rates = np.zeros(capacity, dtype=np.float64) # 週利
+        self.maturity = np.zeros(capacity, dtype=np.int64) # 最終返済週
+        self.methods = np.zeros(capacity, dtype=np.int8)
+        self.weeks_repaid = np.zeros(capacity, dtype=np.int32)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.due_week = np.zeros(capacity, dtype=np.int64) # 暦に登録されている週(延滞中は満期週より後になる)
+        self._free: List[int] = [] # 完済して再利用できる枠
+        self._calendar: Dict[int, List[int]] = {} # 満期週 -> 枠
+        self._calendar_weeks: List[int] = [] # 暦に登録されている満期週(ヒープ)
+
+    def __len__(self) -> int:
+        return int(self.active[:self.size].sum())
+
+    # --- 契約の登録と終了 ---
+    def open(self, principal: float, weekly_rate: float, maturity_week: int, method: str, weeks_repaid: int = 0) -> int:
+        """契約を登録し、枠の番号を返す。maturity_week は最終返済を行う週。"""
+        if method not in _METHODS:
+            raise ValueError(f"Unknown repayment method: {method}")
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self.size == len(self.remaining):
+                self._grow()
+            slot = self.size
+            self.size += 1
+        self.remaining[slot] = principal
+        self.rates[slot] = weekly_rate
+        self.maturity[slot] = maturity_week
+        self.methods[slot] = _METHODS.index(method)
+        self.weeks_repaid[slot] = weeks_repaid
+        self.active[slot] = True
+        self._schedule(slot, maturity_week)
+        return slot
+
+    def _grow(self):
+        for name in ("remaining", "rates", "maturity", "methods", "weeks_repaid", "active", "due_week"):
+            old = getattr(self, name)
+            new = np.zeros(len(old) * 2, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _schedule(self, slot: int, week: int):
+        slots = self._calendar.get(week)
+        if slots is None:
+            self._calendar[week] = slots = []
+            heapq.heappush(self._calendar_weeks, week)
+        slots.append(slot)
+        self.due_week[slot] = week
+
+    def _retire(self, slot: int):
+        self.remaining[slot] = 0.0
+        self.active[slot] = False
+        self._free.append(slot)
+
+    def repay(self, slot: int, amount: float) -> bool:
+        """元本の繰上返済。完済した場合は契約を終了して True を返す。"""
+        self.remaining[slot] = max(0.0, self.remaining[slot] - amount)
+        if self.remaining[slot] > _PAID_OFF_EPSILON:
+            return False
+        slots = self._calendar.get(int(self.due_week[slot]), [])
+        if slot in slots:
+            slots.remove(slot)
+        self._retire(slot)
+        return True
+
+    # --- 週次の返済 ---
+    @staticmethod
+    def _principal_due(remaining: np.ndarray, rates: np.ndarray, methods: np.ndarray, weeks_left: np.ndarray) -> np.ndarray:
+        """残り weeks_left 週で完済する返済計画の、今週の約定返済元本。"""
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            level = np.where(rates > 0, remaining * rates / (1.0 - np.power(1.0 + rates, -weeks_left)), remaining / weeks_left)
+        annuity = level - remaining * rates
+        principal = np.where(methods == _ANNUITY, annuity,
+                             np.where(methods == _EQUAL_PRINCIPAL, remaining / weeks_left, 0.0))
+        # 最終週(延滞中を含む)は残高の全額
+        return np.where(weeks_left <= 1, remaining, np.clip(principal, 0.0, remaining))
+
+    def scheduled_payments(self, week: int) -> Tuple[np.ndarray, np.ndarray]:
+        """week 週の契約ごとの (利息, 約定返済元本)。終了した枠は 0。"""
+        n = self.size
+        active = self.active[:n]
+        remaining = np.where(active, self.remaining[:n], 0.0)
+        weeks_left = np.maximum(1, self.maturity[:n] - week + 1).astype(np.float64)
+        interest = remaining * self.rates[:n]
+        principal = self._principal_due(remaining, self.rates[:n], self.methods[:n], weeks_left)
+        return interest, np.where(active, principal, 0.0)
+
+    def settle(self, week: int, principal: np.ndarray, paid: bool = True) -> List[int]:
+        """
+        scheduled_payments で求めた約定返済元本の支払いを反映し、満期を迎えて完済した枠の番号を返す。
+        元本を支払えなかった週は paid=False で呼ぶ。残高が残った(延滞している)満期の契約は翌週の暦に移す。
+        """
+        if paid:
+            n = len(principal)
+            active = self.active[:n]
+            self.remaining[:n] = np.where(active, np.maximum(0.0, self.remaining[:n] - principal), self.remaining[:n])
+            self.weeks_repaid[:n] += active
+        retired = []
+        while self._calendar_weeks and self._calendar_weeks[0] <= week:
+            due_week = heapq.heappop(self._calendar_weeks)
+            for slot in self._calendar.pop(due_week, []):
+                if not self.active[slot] or self.due_week[slot] != due_week:
+                    continue # 終了済み・別の週へ移した枠の古い項目は読み飛ばし、同じ枠を二重に終了させない
+                if self.remaining[slot] <= _PAID_OFF_EPSILON:
+                    self._retire(slot)
+                    retired.append(slot)
+                else:
+                    self._schedule(slot, week + 1)
+        return retired
+
+    # --- 照会 ---
+    def total_remaining(self) -> float:
+        return float(self.remaining[:self.size][self.active[:self.size]].sum())
+
+    def weekly_interest(self) -> float:
+        """今週の元本残高に対する利息の合計。"""
+        active = self.active[:self.size]
+        return float(np.dot(self.remaining[:self.size][active], self.rates[:self.size][active]))
+
+    def method_of(self, slot: int) -> str:
+        return _METHODS[self.methods[slot]]
+
+    def project(self, slot: int, week: int) -> Dict[str, np.ndarray]:
+        """
+        week 週以降、約定どおり返済した場合の返済予定表。
+        週・利息・返済元本・返済後の残高の配列を辞書で返す。
+        """
+        weeks = np.arange(week, max(week, int(self.maturity[slot])) + 1, dtype=np.int64)
+        n = len(weeks)
+        elapsed = np.arange(1, n + 1, dtype=np.float64)
+        remaining = float(self.remaining[slot])
+        rate = float(self.rates[slot])
+        method = self.methods[slot]
+        if method == _ANNUITY and rate > 0:
+            # 毎週の返済額が一定の場合の t 週後の残高: P(1+r)^t - A((1+r)^t - 1)/r
+            payment = remaining * rate / (1.0 - (1.0 + rate) ** -n)
+            growth = (1.0 + rate) ** elapsed
+            balance = remaining * growth - payment * (growth - 1.0) / rate
+        elif method == _BULLET:
+            balance = np.full(n, remaining)
+        else:
+            balance = remaining - remaining / n * elapsed
+        balance[-1] = 0.0
+        balance = np.maximum(balance, 0.0)
+        before = np.concatenate(([remaining], balance[:-1]))
+        return {"week": weeks, "interest": before * rate, "principal": before - balance, "balance": balance}
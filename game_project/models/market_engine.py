@@ -0,0 +1,181 @@
+# models/market_engine.py
+import random
+from typing import Dict, Optional
+
+import numpy as np
+
+from .price_history import PriceHistoryMatrix
+from .market_indicators import MarketIndicators
+import constants
+
+class MarketEngine:
+    """
+    一般市場の全銘柄の数値データ(株価・発行済株式数・EPS・純資産など)を
+    列指向のNumPy配列で保持し、週次の株価変動を全銘柄まとめて計算するクラス。
+    ListedCompany は、このエンジンの1行を参照する薄いビューとして振る舞う。
+    """
+    version: int = 0 # 株価が変わるたびに増える。ポートフォリオ評価額のキャッシュ判定に使う
+
+    def __init__(self, capacity: int = 0, seed: Optional[int] = None, history_weeks: Optional[int] = None):
+        self.size: int = 0
+        capacity = max(1, capacity)
+
+        # 乱数は random モジュールのシードから派生させ、ゲーム全体の再現性を保つ
+        if seed is None:
+            seed = random.getrandbits(32)
+        self._rng = np.random.RandomState(seed)
+
+        self.price = np.zeros(capacity, dtype=np.float64)
+        self.shares_outstanding = np.zeros(capacity, dtype=np.int64)
+        self.eps_ttm = np.zeros(capacity, dtype=np.float64)
+        self.net_assets = np.zeros(capacity, dtype=np.float64)
+        self.market_cap = np.zeros(capacity, dtype=np.float64)
+        self.pe_ratio = np.full(capacity, np.inf, dtype=np.float64)
+        self.phase_drift = np.zeros(capacity, dtype=np.float64) # 直近週の経済フェーズ由来の変動率
+        self.is_subsidiary = np.zeros(capacity, dtype=bool)
+        self.dividend_per_share = np.zeros(capacity, dtype=np.float64) # 直近の四半期配当(1株あたり)
+
+        # 株価履歴: (保持週数 x 銘柄数) のリングバッファ
+        if history_weeks is None:
+            history_weeks = constants.PRICE_HISTORY_WEEKS
+        self.history = PriceHistoryMatrix(depth=history_weeks, capacity=capacity)
+        self.indicators = MarketIndicators(history_weeks, capacity)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if 'dividend_per_share' not in state:
+            self.dividend_per_share = np.zeros(len(self.price), dtype=np.float64)
+        if 'indicators' not in state: # テクニカル指標がない古いセーブデータは株価履歴から作り直す
+            self.indicators = MarketIndicators(self.history.depth, len(self.price))
+            self.indicators.rebuild(self.history, self.size)
+
+    # --- 行の追加・容量管理 ---
+    def _grow(self, min_capacity: int):
+        """配列の容量を倍々で拡張する。"""
+        new_capacity = max(min_capacity, len(self.price) * 2)
+        for name in ("price", "shares_outstanding", "eps_ttm", "net_assets", "market_cap",
+                     "pe_ratio", "phase_drift", "is_subsidiary", "dividend_per_share"):
+            old = getattr(self, name)
+            fill = np.inf if name == "pe_ratio" else 0
+            new = np.full(new_capacity, fill, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+        self.history.resize(new_capacity)
+        self.indicators.resize(new_capacity)
+
+    def add_row(self, price: float, shares_outstanding: int, net_assets: float) -> int:
+        """新しい銘柄の行を追加し、その行番号を返す。"""
+        if self.size >= len(self.price):
+            self._grow(self.size + 1)
+        row = self.size
+        self.size += 1
+        self.price[row] = price
+        self.version += 1
+        self.shares_outstanding[row] = shares_outstanding
+        self.net_assets[row] = net_assets
+        self.eps_ttm[row] = 0.0
+        self.dividend_per_share[row] = 0.0
+        self.history.start_row(row, price)
+        self.indicators.start_rows(slice(row, row + 1), self.price[row:row + 1])
+        self.update_ratios(row)
+        return row
+
+    def add_rows(self, prices: np.ndarray, shares_outstanding: np.ndarray, net_assets: np.ndarray) -> int:
+        """複数の銘柄の行をまとめて追加し、先頭の行番号を返す(市場の一括生成用)。"""
+        count = len(prices)
+        if self.size + count > len(self.price):
+            self._grow(self.size + count)
+        start = self.size
+        sl = slice(start, start + count)
+        self.size += count
+        self.price[sl] = prices
+        self.version += 1
+        self.shares_outstanding[sl] = shares_outstanding
+        self.net_assets[sl] = net_assets
+        self.eps_ttm[sl] = 0.0
+        self.dividend_per_share[sl] = 0.0
+        self.history.start_rows(sl, self.price[sl])
+        self.indicators.start_rows(sl, self.price[sl])
+        self.update_ratios()
+        return start
+
+    def set_price(self, row: int, price: float):
+        """1銘柄の株価を直接書き換える。"""
+        self.price[row] = price
+        self.version += 1
+
+    # --- 指標計算 ---
+    def update_ratios(self, row: Optional[int] = None):
+        """時価総額とPERを再計算する。row省略時は全銘柄を一括で計算する。"""
+        if row is not None:
+            sl = slice(row, row + 1)
+        else:
+            sl = slice(0, self.size)
+        price = self.price[sl]
+        shares = self.shares_outstanding[sl]
+        eps = self.eps_ttm[sl]
+        has_shares = shares > 0
+        self.market_cap[sl] = np.where(has_shares, price * shares, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pe = np.where(has_shares & (eps > 0), price / np.where(eps > 0, eps, 1.0), np.inf)
+        self.pe_ratio[sl] = pe
+
+    # --- 週次更新 ---
+    def advance_week(self, economic_phase: str, active_mask: Optional[np.ndarray] = None):
+        """全銘柄の株価を一度の乱数生成でまとめて更新する。"""
+        n = self.size
+        if n == 0:
+            return
+        rng = self._rng
+
+        base_min, base_max = constants.BASE_WEEKLY_STOCK_PRICE_VOLATILITY
+        change_rate = rng.uniform(base_min, base_max, n)
+
+        econ_min, econ_max = constants.STOCK_MARKET_ECONOMIC_IMPACT_WEEKLY.get(economic_phase, (0.0, 0.0))
+        drift = rng.uniform(econ_min, econ_max, n)
+        change_rate += drift
+
+        has_news = rng.random_sample(n) < constants.STOCK_NEWS_EVENT_PROBABILITY_WEEKLY
+        news_min, news_max = constants.STOCK_NEWS_IMPACT_RANGE
+        change_rate += np.where(has_news, rng.uniform(news_min, news_max, n), 0.0)
+
+        price = self.price[:n]
+        new_price = np.maximum(1.0, np.round(price * (1 + change_rate), 2))
+        if active_mask is not None:
+            new_price = np.where(active_mask[:n], new_price, price)
+            drift = np.where(active_mask[:n], drift, 0.0)
+        self.price[:n] = new_price
+        self.version += 1
+        self.phase_drift[:n] = drift
+
+        self.indicators.update(new_price, self.history.window_all(n))
+        self.history.push(new_price)
+        self.update_ratios()
+
+    def advance_row(self, row: int, economic_phase: str):
+        """
+        1銘柄だけ株価と財務指標を更新する(個別更新用)。乱数もこの銘柄の分だけ引く。
+        株価履歴・テクニカル指標は全銘柄で同じ週を共有しているため、ここでは進めない(次の advance_week で反映される)。
+        """
+        rng = self._rng
+        base_min, base_max = constants.BASE_WEEKLY_STOCK_PRICE_VOLATILITY
+        change_rate = rng.uniform(base_min, base_max)
+        econ_min, econ_max = constants.STOCK_MARKET_ECONOMIC_IMPACT_WEEKLY.get(economic_phase, (0.0, 0.0))
+        drift = rng.uniform(econ_min, econ_max)
+        change_rate += drift
+        if rng.random_sample() < constants.STOCK_NEWS_EVENT_PROBABILITY_WEEKLY:
+            news_min, news_max = constants.STOCK_NEWS_IMPACT_RANGE
+            change_rate += rng.uniform(news_min, news_max)
+        self.price[row] = max(1.0, round(float(self.price[row]) * (1 + change_rate), 2))
+        self.phase_drift[row] = drift
+        self.version += 1
+        self.update_ratios(row)
+
+    # --- 履歴 ---
+    def get_indicators(self, row: int) -> Dict[str, float]:
+        """指定行のテクニカル指標を返す。"""
+        return self.indicators.snapshot(row)
+
+    def get_price_history(self, row: int, weeks: Optional[int] = None) -> np.ndarray:
+        """指定行の直近の株価履歴を古い順に並べたビュー(コピーなし)で返す。"""
+        return self.history.window(row, weeks)
@@ -0,0 +1,173 @@
+# models/market_indicators.py
+from typing import Dict, Union
+
+import numpy as np
+
+import constants
+
+Rows = Union[slice, np.ndarray]
+
+class MarketIndicators:
+    """
+    全銘柄のテクニカル指標(SMA/EMA、ボラティリティ、ドローダウン、RSI、52週高値・安値)を
+    銘柄ごとの配列で保持し、週次の株価更新のたびに全銘柄まとめて差分更新するクラス。
+    移動平均やボラティリティは期間の合計値を持ち、新しい週の値を足して期間外に出た週の値を引くだけで更新する。
+    期間外に出る値は株価履歴(PriceHistoryMatrix)から読むため、各期間は株価履歴の保持週数以内に制限される。
+    """
+    _ARRAYS = ("_sma_sum_short", "_sma_sum_long", "ema", "_ret_sum", "_ret_sq_sum",
+               "_avg_gain", "_avg_loss", "peak", "max_drawdown", "high", "low")
+
+    def __init__(self, history_weeks: int, capacity: int = 1):
+        short_window, long_window = constants.INDICATOR_SMA_WINDOWS
+        self.sma_windows = (min(short_window, history_weeks), min(long_window, history_weeks))
+        self.ema_alpha: float = 2.0 / (constants.INDICATOR_EMA_SPAN + 1)
+        self.volatility_window: int = max(2, min(constants.INDICATOR_VOLATILITY_WINDOW, history_weeks - 1))
+        self.rsi_period: int = constants.INDICATOR_RSI_PERIOD
+        self.high_low_weeks: int = min(constants.INDICATOR_HIGH_LOW_WEEKS, history_weeks)
+        capacity = max(1, capacity)
+        for name in self._ARRAYS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+        self._observed = np.zeros(capacity, dtype=np.int64) # 指標に反映済みの週数
+        self.price = np.zeros(capacity, dtype=np.float64) # 直近に反映した株価
+
+    def resize(self, capacity: int):
+        if capacity <= len(self.price):
+            return
+        for name in self._ARRAYS + ("_observed", "price"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def start_rows(self, rows: Rows, prices: np.ndarray):
+        """新規銘柄の指標を、今週の株価1件から初期化する。"""
+        self._sma_sum_short[rows] = prices
+        self._sma_sum_long[rows] = prices
+        self.ema[rows] = prices
+        self.peak[rows] = prices
+        self.high[rows] = prices
+        self.low[rows] = prices
+        self.price[rows] = prices
+        for name in ("_ret_sum", "_ret_sq_sum", "_avg_gain", "_avg_loss", "max_drawdown"):
+            getattr(self, name)[rows] = 0.0
+        self._observed[rows] = 1
+
+    def update(self, prices: np.ndarray, recent: np.ndarray):
+        """
+        1週分の株価 prices (先頭 n 銘柄) を反映する。
+        recent はこの週より前の直近の株価履歴(週 x 銘柄、古い順)で、株価履歴に push する前に渡す。
+        """
+        n = len(prices)
+        if n == 0:
+            return
+        observed = self._observed[:n] + 1
+        active = observed >= 2 # 今週初期化した銘柄は更新しない
+        prev = self.price[:n]
+
+        def leaving(weeks_back: int, enough: np.ndarray) -> np.ndarray:
+            # weeks_back 週前の株価。その週が期間外に出る銘柄のみ、それ以外は 0
+            if weeks_back > len(recent):
+                return np.zeros(n)
+            return np.where(enough & active, recent[-weeks_back, :n], 0.0)
+
+        short_window, long_window = self.sma_windows
+        self._sma_sum_short[:n] += np.where(active, prices, 0.0) - leaving(short_window, observed > short_window)
+        self._sma_sum_long[:n] += np.where(active, prices, 0.0) - leaving(long_window, observed > long_window)
+
+        self.ema[:n] = np.where(active, self.ema[:n] + self.ema_alpha * (prices - self.ema[:n]), self.ema[:n])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.where(active, prices / np.where(prev > 0, prev, 1.0) - 1.0, 0.0)
+            window = self.volatility_window
+            old_enough = active & (observed > window + 1)
+            if window + 1 <= len(recent):
+                old_prev = recent[-window - 1, :n]
+                old_change = np.where(old_enough, recent[-window, :n] / np.where(old_prev > 0, old_prev, 1.0) - 1.0, 0.0)
+            else:
+                old_change = np.zeros(n)
+        self._ret_sum[:n] += change - old_change
+        self._ret_sq_sum[:n] += change * change - old_change * old_change
+
+        # RSI: 最初の period 週は単純平均、その後はワイルダーの平滑化
+        diff = np.where(active, prices - prev, 0.0)
+        steps = np.maximum(1, np.minimum(observed - 1, self.rsi_period))
+        self._avg_gain[:n] += np.where(active, (np.maximum(diff, 0.0) - self._avg_gain[:n]) / steps, 0.0)
+        self._avg_loss[:n] += np.where(active, (np.maximum(-diff, 0.0) - self._avg_loss[:n]) / steps, 0.0)
+
+        self.peak[:n] = np.where(active, np.maximum(self.peak[:n], prices), self.peak[:n])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = np.where(self.peak[:n] > 0, prices / self.peak[:n] - 1.0, 0.0)
+        self.max_drawdown[:n] = np.where(active, np.minimum(self.max_drawdown[:n], drawdown), self.max_drawdown[:n])
+
+        # 高値・安値: 新しい株価と比べ、期間外に出た値が高値(安値)だった銘柄だけ期間内を再計算する
+        weeks = self.high_low_weeks
+        dropped = active & (observed > weeks)
+        old_value = recent[-weeks, :n] if weeks <= len(recent) else np.zeros(n)
+        rescan = np.flatnonzero(dropped & ((old_value >= self.high[:n]) | (old_value <= self.low[:n])))
+        self.high[:n] = np.where(active, np.maximum(self.high[:n], prices), self.high[:n])
+        self.low[:n] = np.where(active, np.minimum(self.low[:n], prices), self.low[:n])
+        if len(rescan):
+            block = np.vstack((recent[len(recent) - weeks + 1:, rescan], prices[rescan]))
+            self.high[rescan] = block.max(axis=0)
+            self.low[rescan] = block.min(axis=0)
+
+        self.price[:n] = np.where(active, prices, prev)
+        self._observed[:n] = np.where(active, observed, self._observed[:n])
+
+    def rebuild(self, history, size: int):
+        """株価履歴(PriceHistoryMatrix)から指標を作り直す(古いセーブデータの読み込み時など)。"""
+        self.resize(size)
+        self._observed[:] = 0
+        if size == 0:
+            return
+        full = np.array(history.window_all(size))
+        count = len(full)
+        age = history.weeks_observed(size) - 1
+        start = np.maximum(0, count - 1 - age) # 各銘柄の履歴が始まる位置
+        for t in range(count):
+            starting = np.flatnonzero(start == t)
+            if t > 0:
+                self.update(full[t], full[:t])
+            if len(starting):
+                self.start_rows(starting, full[t, starting])
+
+    # --- 指標の取得 (rows は行番号のスライスまたは配列) ---
+    def sma(self, rows: Rows, long: bool = False) -> np.ndarray:
+        window = self.sma_windows[1 if long else 0]
+        total = self._sma_sum_long[rows] if long else self._sma_sum_short[rows]
+        return total / np.maximum(1, np.minimum(self._observed[rows], window))
+
+    def volatility(self, rows: Rows) -> np.ndarray:
+        """週次騰落率の標準偏差を年率換算した値。"""
+        count = np.minimum(self._observed[rows] - 1, self.volatility_window).astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variance = (self._ret_sq_sum[rows] - self._ret_sum[rows] ** 2 / count) / (count - 1)
+        return np.where(count >= 2, np.sqrt(np.maximum(variance, 0.0) * 52), 0.0)
+
+    def drawdown(self, rows: Rows) -> np.ndarray:
+        """上場来高値からの下落率(0 以下)。"""
+        peak = self.peak[rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(peak > 0, self.price[rows] / peak - 1.0, 0.0)
+
+    def rsi(self, rows: Rows) -> np.ndarray:
+        gain = self._avg_gain[rows]
+        loss = self._avg_loss[rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            value = 100.0 - 100.0 / (1.0 + gain / loss)
+        return np.where(loss > 0, value, np.where(gain > 0, 100.0, 50.0))
+
+    def snapshot(self, row: int) -> Dict[str, float]:
+        """1銘柄の指標を辞書で返す(詳細画面用)。"""
+        rows = slice(row, row + 1)
+        return {
+            "sma_short": float(self.sma(rows)[0]),
+            "sma_long": float(self.sma(rows, long=True)[0]),
+            "ema": float(self.ema[row]),
+            "volatility": float(self.volatility(rows)[0]),
+            "drawdown": float(self.drawdown(rows)[0]),
+            "max_drawdown": float(self.max_drawdown[row]),
+            "rsi": float(self.rsi(rows)[0]),
+            "high": float(self.high[row]),
+            "low": float(self.low[row]),
+        }
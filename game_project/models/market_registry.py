@@ -0,0 +1,122 @@
+# models/market_registry.py
+from typing import Dict, Iterable, Iterator, List, Optional, TYPE_CHECKING
+
+from .event_calendar import EventCalendar
+from .holder_index import HolderIndex
+from .ticker_allocator import TickerAllocator
+import constants
+
+if TYPE_CHECKING:
+    from .listed_company import ListedCompany
+    from .market_engine import MarketEngine
+
+class MarketRegistry:
+    """
+    一般市場に上場している企業の一覧を保持するクラス。
+    上場順のリストに加えて ティッカー → 企業 の索引を持ち、銘柄の検索を O(1) で行う。
+    上場(IPO)・上場廃止の際は add / remove を通して索引と決算・配当の予定表(calendar)、
+    ティッカーの払い出し(ticker_allocator)を同期する。
+    子会社化された銘柄は上場を維持したまま、MarketEngine 側のフラグで株価更新から外れる。
+    """
+    version: int = 0 # 上場・上場廃止のたびに増える。スクリーナーの索引の再構築判定に使う
+
+    def __init__(self, companies: Optional[Iterable['ListedCompany']] = None, engine: Optional['MarketEngine'] = None,
+                 ticker_allocator: Optional[TickerAllocator] = None):
+        companies = list(companies or [])
+        self._companies: List['ListedCompany'] = []
+        self._by_ticker: Dict[str, 'ListedCompany'] = {}
+        self.engine: Optional['MarketEngine'] = engine
+        self.calendar: EventCalendar = EventCalendar()
+        self.holders: HolderIndex = HolderIndex() # ティッカー -> 保有ポートフォリオ(配当の支払先)
+        self.ticker_allocator: TickerAllocator = ticker_allocator or self._default_ticker_allocator(len(companies))
+        for company in companies:
+            self.add(company)
+
+    # --- 上場・上場廃止 ---
+    def add(self, company: 'ListedCompany'):
+        """企業を市場に上場させる(IPO・初期生成時)。"""
+        ticker = company.ticker_symbol
+        if ticker in self._by_ticker:
+            raise ValueError(f"Ticker '{ticker}' is already listed.")
+        self._companies.append(company)
+        self._by_ticker[ticker] = company
+        if self.engine is None:
+            self.engine = company.engine
+        self.ticker_allocator.claim(ticker)
+        company.schedule_events(self.calendar)
+        self.version += 1
+
+    def remove(self, ticker: str) -> Optional['ListedCompany']:
+        """企業を上場廃止にし、索引から取り除く。"""
+        company = self._by_ticker.pop(ticker, None)
+        if company is not None:
+            self._companies.remove(company)
+            self.calendar.cancel(constants.EVENT_EARNINGS, ticker)
+            self.calendar.cancel(constants.EVENT_DIVIDEND, ticker)
+            self.ticker_allocator.release(ticker)
+            self.version += 1
+        return company
+
+    @staticmethod
+    def _default_ticker_allocator(num_companies: int) -> TickerAllocator:
+        length = TickerAllocator.length_for(num_companies, constants.TICKER_SYMBOL_ALPHABET, constants.TICKER_SYMBOL_LENGTH)
+        return TickerAllocator(constants.TICKER_SYMBOL_ALPHABET, length)
+
+    # --- 検索 ---
+    def get(self, ticker: Optional[str]) -> Optional['ListedCompany']:
+        """ティッカーシンボルから企業を返す。見つからない場合は None。"""
+        if not ticker:
+            return None
+        return self._by_ticker.get(ticker)
+
+    def get_price(self, ticker: str) -> Optional[float]:
+        company = self._by_ticker.get(ticker)
+        return company.current_price if company is not None else None
+
+    def tickers(self) -> List[str]:
+        return list(self._by_ticker.keys())
+
+    # --- シーケンスとしての振る舞い(従来の list と互換) ---
+    def __contains__(self, ticker) -> bool:
+        return ticker in self._by_ticker
+
+    def __iter__(self) -> Iterator['ListedCompany']:
+        return iter(self._companies)
+
+    def __len__(self) -> int:
+        return len(self._companies)
+
+    def __getitem__(self, index):
+        return self._companies[index]
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # 索引は上場順リストから再構築できる
+        self._by_ticker = {c.ticker_symbol: c for c in self._companies}
+        if 'calendar' not in state:
+            self.calendar = EventCalendar()
+            for company in self._companies:
+                company.schedule_events(self.calendar)
+        self.holders = HolderIndex() # 保有者索引は保存せず、ロード後の最初の配当処理で登録し直す
+        if 'ticker_allocator' not in state:
+            self.ticker_allocator = self._default_ticker_allocator(len(self._companies))
+            for company in self._companies:
+                self.ticker_allocator.claim(company.ticker_symbol)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_by_ticker']
+        state.pop('holders', None)
+        return state
+
+
+def lookup_company(market_data, ticker: Optional[str]) -> Optional['ListedCompany']:
+    """
+    market_data から銘柄を検索する。MarketRegistry であれば索引を使い、
+    それ以外(競合他社のリストなど)は従来どおり線形検索する。
+    """
+    if market_data is None or not ticker:
+        return None
+    if isinstance(market_data, MarketRegistry):
+        return market_data.get(ticker)
+    return next((c for c in market_data if getattr(c, 'ticker_symbol', None) == ticker), None)
@@ -0,0 +1,140 @@
+# models/market_screener.py
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+import constants
+
+if TYPE_CHECKING:
+    from .listed_company import ListedCompany
+    from .market_registry import MarketRegistry
+
+# (下限, 上限)。None の側は制限なし
+FieldRange = Tuple[Optional[float], Optional[float]]
+
+class MarketScreener:
+    """
+    上場銘柄を指標で絞り込み・並べ替えて、ページ単位で返すクラス。
+    指標の列(株価・時価総額・PER・PBR・配当利回り・モメンタムなど)は MarketEngine の配列から一括で作り、
+    並べ替えの順序(argsort)は項目ごとにキャッシュする。どちらも株価が更新されるまで(週に1回)再計算しない。
+    セクターは銘柄ごとに変わらないため、上場・上場廃止があったときだけ作り直す。
+    """
+    def __init__(self, registry: 'MarketRegistry'):
+        self.registry = registry
+        self._listing_key: Optional[int] = None
+        self._price_key: Optional[Tuple[int, int]] = None
+        self._companies: List['ListedCompany'] = []
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._positions: Dict[int, int] = {}
+        self._sector_codes: Optional[np.ndarray] = None
+        self._sector_names: List[str] = []
+        self._columns: Dict[str, np.ndarray] = {}
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+
+    # --- 索引の更新 ---
+    def refresh(self):
+        """上場銘柄や株価が変わっていれば、列と並べ替え順を作り直す。"""
+        registry = self.registry
+        if self._listing_key != registry.version:
+            self._companies = list(registry)
+            self._rows = np.array([c.engine_row for c in self._companies], dtype=np.int64)
+            self._positions = {row: i for i, row in enumerate(self._rows.tolist())} # 行番号 -> 一覧上の位置
+            self._sector_codes = None
+            self._listing_key = registry.version
+            self._price_key = None
+        engine = registry.engine
+        price_key = (engine.version if engine is not None else 0, registry.version)
+        if self._price_key != price_key:
+            self._columns = self._build_columns() if engine is not None else {}
+            self._orders = {}
+            self._price_key = price_key
+
+    def _build_columns(self) -> Dict[str, np.ndarray]:
+        engine = self.registry.engine
+        rows = self._rows
+        price = engine.price[rows]
+        shares = engine.shares_outstanding[rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bps = np.where(shares > 0, engine.net_assets[rows] / np.where(shares > 0, shares, 1), 0.0)
+            pbr = np.where(bps > 0, price / bps, np.inf)
+            dividend_yield = np.where(price > 0, engine.dividend_per_share[rows] * 4 / price, 0.0)
+            sma_long = engine.indicators.sma(rows, long=True)
+            momentum = np.where(sma_long > 0, price / sma_long - 1.0, 0.0)
+        return {
+            "price": price,
+            "market_cap": engine.market_cap[rows],
+            "per": engine.pe_ratio[rows],
+            "pbr": pbr,
+            "dividend_yield": dividend_yield,
+            "momentum": momentum,
+            "volatility": engine.indicators.volatility(rows),
+            "rsi": engine.indicators.rsi(rows),
+        }
+
+    def _sectors(self) -> np.ndarray:
+        """銘柄ごとのセクター番号。セクターで絞り込むときに初めて作る。"""
+        if self._sector_codes is None:
+            names = [c.sector for c in self._companies]
+            self._sector_names = sorted(set(names))
+            index = {name: i for i, name in enumerate(self._sector_names)}
+            self._sector_codes = np.array([index[name] for name in names], dtype=np.int64)
+        return self._sector_codes
+
+    def _order(self, sort_by: str, descending: bool) -> np.ndarray:
+        """sort_by の並べ替え順。値がない銘柄(PERが無限大など)は常に末尾に置く。"""
+        key = (sort_by, descending)
+        order = self._orders.get(key)
+        if order is None:
+            values = self._columns[sort_by]
+            values = np.where(np.isfinite(values), values, np.nan)
+            order = np.argsort(-values if descending else values, kind='stable')
+            self._orders[key] = order
+        return order
+
+    # --- 検索 ---
+    def get_sectors(self) -> List[Tuple[str, int]]:
+        """(セクター名, 銘柄数) の一覧を返す。"""
+        self.refresh()
+        counts = np.bincount(self._sectors(), minlength=len(self._sector_names))
+        return [(name, int(count)) for name, count in zip(self._sector_names, counts)]
+
+    def query(self, sector: Optional[str] = None, ranges: Optional[Dict[str, FieldRange]] = None,
+              sort_by: str = "market_cap", descending: bool = True,
+              offset: int = 0, limit: int = constants.SCREENER_PAGE_SIZE) -> Tuple[List['ListedCompany'], int]:
+        """
+        条件に合う銘柄を sort_by の順に並べ、offset 件目から limit 件を返す。戻り値は (銘柄のリスト, 該当件数)。
+        ranges は {項目: (下限, 上限)}。項目は constants.SCREENER_FIELD_LABELS のキー。
+        """
+        if sort_by not in constants.SCREENER_FIELD_LABELS:
+            raise ValueError(f"Unknown screener field: {sort_by}")
+        self.refresh()
+        if not self._companies or not self._columns:
+            return [], 0
+
+        mask = None
+        if sector is not None:
+            self._sectors()
+            if sector not in self._sector_names:
+                return [], 0
+            mask = self._sector_codes == self._sector_names.index(sector)
+        for field, (low, high) in (ranges or {}).items():
+            if field not in self._columns:
+                raise ValueError(f"Unknown screener field: {field}")
+            values = self._columns[field]
+            field_mask = np.isfinite(values)
+            if low is not None:
+                field_mask &= values >= low
+            if high is not None:
+                field_mask &= values <= high
+            mask = field_mask if mask is None else mask & field_mask
+
+        order = self._order(sort_by, descending)
+        if mask is not None:
+            order = order[mask[order]]
+        page = order[max(0, offset):max(0, offset) + limit]
+        return [self._companies[i] for i in page], len(order)
+
+    def get_value(self, company: 'ListedCompany', field: str) -> float:
+        """銘柄の項目値を返す(一覧表示用)。"""
+        self.refresh()
+        return float(self._columns[field][self._positions[company.engine_row]])
@@ -50,6 +50,10 @@ class PersonalAssets:
         dividend_amount = self.portfolio.receive_dividend(ticker, dividend_per_share)
         
         # 2. 計算された額を自分の現金に加算する
+        self.receive_dividend_income(ticker, dividend_amount)
+
+    def receive_dividend_income(self, ticker: str, dividend_amount: float):
+        """計算済みの配当金を個人の現金に加える。HolderIndex からの支払先として登録される。"""
         if dividend_amount > 0:
             self.money += int(dividend_amount)
             print(f"  [個人] {ticker}から配当金 ¥{dividend_amount:,.0f} を受け取りました。")
@@ -143,8 +147,8 @@ class PersonalAssets:
         return True
 
     def sell_stock(self, ticker: str, num_shares_to_sell: int, price: float) -> bool:
-        avg_buy_price = self.portfolio.sell_stock(ticker, num_shares_to_sell)
-        if avg_buy_price is None: return False
+        cost_per_share = self.portfolio.sell_stock(ticker, num_shares_to_sell, price) # 実現損益はポートフォリオに記録される
+        if cost_per_share is None: return False
         
         proceeds = num_shares_to_sell * price
         self.money += int(proceeds)
@@ -17,8 +17,10 @@ from .operations import Operations
 from .ipo_manager import IPOManager
 from .corporate_development import CorporateDevelopment
 from .effects_manager import EffectsManager
+from .credit_rating import compute_credit_metrics, score_credit_metrics, rate_credit_score, rating_for_score
 from .game_time import GameTime 
 import constants 
+import profiler
 
 class Player:
     def __init__(self, company_name: str, initial_personal_money: int, initial_company_money: int):
@@ -31,15 +33,20 @@ class Player:
         self.ipo = IPOManager()
         self.personal_assets = PersonalAssets(initial_money=initial_personal_money)
         self.company_portfolio = Portfolio()
-        self.credit_rating_score: int = 600
-        self.credit_rating: str = "BBB"
+        self.credit_rating_score: int = constants.CREDIT_RATING_INITIAL_SCORE
+        self.credit_rating: str = rating_for_score(self.credit_rating_score)
+        self.credit_metrics: Dict[str, float] = {} # 直近の格付け評価に使った財務比率
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('credit_metrics', {})
     
     @property
     def player_weekly_salary(self) -> float: return self.personal_assets.weekly_salary
     @player_weekly_salary.setter
     def player_weekly_salary(self, value: float): self.personal_assets.set_salary(value)
     @property
-    def company_finances(self): return self.finance.finances
+    def company_finances(self): return self.finance.get_summary()
     @property
     def employed_cxos(self): return self.hr.employed_cxos
     @property
@@ -82,13 +89,25 @@ class Player:
         company_dividend = self.company_portfolio.receive_dividend(ticker, dividend_per_share)
         self.finance.add_revenue(company_dividend, 'dividend_income')
         self.personal_assets.receive_dividend(ticker, dividend_per_share)
+
+    def receive_company_dividend_income(self, ticker: str, dividend_amount: float):
+        """会社ポートフォリオの配当金(計算済み)を営業外収益として計上する。HolderIndex からの支払先。"""
+        self.finance.add_revenue(dividend_amount, 'dividend_income')
     
     def process_weekly_updates(self, game_time: 'GameTime', market_data: List['ListedCompany']):
-        self.ops.finalize_all_finances(self)
-        self.finance.process_company_cashflow(operations=self.ops, hr=self.hr, player_salary=self.player_weekly_salary)
-        self.personal_assets.receive_salary()
-        self.personal_assets.process_weekly_updates(game_time, market_data)
-        company_vc_events = self.company_portfolio.update_active_venture_investments(game_time)
+        self.process_weekly_finances(game_time, market_data)
+        self.process_weekly_effects()
+
+    def process_weekly_finances(self, game_time: 'GameTime', market_data: List['ListedCompany']):
+        with profiler.section("operations_finalize"):
+            self.ops.finalize_all_finances(self)
+        with profiler.section("cashflow"):
+            self.finance.process_company_cashflow(operations=self.ops, hr=self.hr, player_salary=self.player_weekly_salary)
+        with profiler.section("personal_assets"):
+            self.personal_assets.receive_salary()
+            self.personal_assets.process_weekly_updates(game_time, market_data)
+        with profiler.section("vc_updates"):
+            company_vc_events = self.company_portfolio.update_active_venture_investments(game_time)
         for event in company_vc_events:
             if event["type"] == "cash":
                 amount = event["amount"]
@@ -102,15 +121,38 @@ class Player:
         if company_portfolio_costs > 0: self.finance.record_expense(company_portfolio_costs, 'portfolio_costs')
         subsidiary_profit = self.corp_dev.get_total_weekly_subsidiary_profit()
         if subsidiary_profit != 0: self.finance.add_subsidiary_profit(subsidiary_profit)
-        self.effects.process_weekly_updates(self.finance.finances, self.ops.get_total_weekly_variable_costs())
+        self.finance.process_bond_maturities(game_time)
         if self.ipo.is_in_preparation: self.ipo.process_ipo_events(self, game_time, market_data)
 
+    def process_weekly_effects(self):
+        self.effects.process_weekly_updates(self.finance, self.ops.get_total_weekly_variable_costs())
+
     def process_quarterly_updates(self, game_time: 'GameTime', market_data: List['ListedCompany']):
         print("\n--- 四半期末処理: 財務・格付け更新 ---")
-        self.finance.record_financial_snapshot(game_time, self)
         self.update_credit_rating(game_time, market_data)
 
-    def update_credit_rating(self, game_time: 'GameTime', market_data: Optional[List[Any]] = None): pass
+    def get_company_debt(self) -> float:
+        """会社の有利子負債(銀行借入・社債・会社の信用買いの借入)。個人の借入は含めない。"""
+        return self.finance.get_total_bank_loan() + self.finance.get_total_bonds_payable() + self.company_portfolio.margin_loan
+
+    def update_credit_rating(self, game_time: 'GameTime', market_data: Optional[List[Any]] = None):
+        """
+        直近1年の推定売上・利益(週次処理で更新済みの値)と台帳に計上した費用、借入台帳・社債台帳が保持する残高・利払い総額から
+        財務比率を求め、信用スコアと格付けを更新する。
+        """
+        revenue, profit = self.finance.get_estimated_annuals(game_time)
+        weekly_interest = (self.finance.loan_book.weekly_interest() + self.finance.bond_book.weekly_coupon
+                           + self.company_portfolio.margin_loan * constants.MARGIN_INTEREST_RATE_WEEKLY)
+        expenses = self.finance.get_recent_annual_expenses(game_time)
+        self.credit_metrics = compute_credit_metrics(revenue, profit, expenses, weekly_interest * GameTime.WEEKS_PER_YEAR,
+                                                     self.finance.get_cash(), self.get_company_debt())
+        self.credit_rating_score = score_credit_metrics(self.credit_metrics)
+        old_rating = self.credit_rating
+        self.credit_rating = rate_credit_score(self.credit_rating_score, old_rating)
+        if self.credit_rating != old_rating:
+            print(f"  [格付け] 信用格付けが {old_rating} から {self.credit_rating} に変更されました。(スコア: {self.credit_rating_score})")
+        else:
+            print(f"  [格付け] 信用格付けは {self.credit_rating} で据え置きです。(スコア: {self.credit_rating_score})")
     
     def check_margin_call(self, owner_type: str, market_data: List[Any]) -> Tuple[bool, float]:
         if owner_type == "company": return self.company_portfolio.check_margin_call(market_data, self.finance.get_cash())
@@ -183,7 +225,7 @@ class Player:
     def deposit_from_personal_to_company(self, amount: int) -> bool:
         success, withdrawn_amount = self.personal_assets.withdraw(amount)
         if success:
-            self.finance.deposit(withdrawn_amount)
+            self.finance.deposit(withdrawn_amount, 'owner_deposit')
             print(f"個人資産から会社へ ¥{withdrawn_amount:,.0f} を入金しました。")
             return True
         return False
@@ -4,18 +4,34 @@ import uuid
 import random
 from typing import List, Dict, Any, TYPE_CHECKING, Optional, Tuple
 
+import numpy as np
+
 if TYPE_CHECKING:
     from .game_time import GameTime
     from .corporate_finance import CorporateFinance
+    from .holder_index import HolderIndex
 
 from .game_time import GameTime
+from .market_registry import MarketRegistry, lookup_company
+from .tax_lots import PositionLots
 import constants
 
 class Portfolio:
     """
     株式、ベンチャー投資など、全ての投資ポートフォリオを管理するクラス。
-    このクラスは資産の数量と平均取得価額のみを管理し、現金操作は行わない。
+    このクラスは資産の数量と取得価額(銘柄ごとの取得ロット台帳)のみを管理し、現金操作は行わない。
     """
+    _holder_index: Optional['HolderIndex'] = None # 配当の支払先を管理する保有者索引(登録時に設定される)
+    # 一般株式の評価額キャッシュ。売買のたびに _holdings_version が増え、株価の更新は MarketEngine.version で判定する
+    _holdings_version: int = 0
+    _cost_basis: Optional[float] = None # 取得原価の合計(株数 x 平均取得単価)。None の場合は次回参照時に計算する
+    # 各キャッシュは計算に使った MarketRegistry 自体と、保有状況・上場銘柄(registry.version)の版を添えて持つ。
+    # ロードなどで市場が作り直された場合は registry が別オブジェクトになるため、id() ではなく is で比較する
+    _valuation_key: Optional[Tuple[Any, Tuple[int, int, int]]] = None
+    _valuation_value: float = 0.0
+    _position_arrays: Optional[Tuple[Any, Tuple[int, int], Any, Any, List[Tuple[Any, int]], float]] = None
+    _margin_arrays: Optional[Tuple[Any, ...]] = None
+
     def __init__(self):
         self.active_venture_investments: Dict[str, Dict[str, Any]] = {}
         self.owned_stocks: List[Dict[str, Any]] = [] 
@@ -23,12 +39,164 @@ class Portfolio:
         self.margin_loan: float = 0.0
         self.short_positions: Dict[str, Dict[str, Any]] = {}
         self.has_margin_account: bool = False
+        self.tax_lots: Dict[str, PositionLots] = {} # 銘柄ごとの取得ロット台帳
+        self.realized_gains: Dict[str, float] = {} # 銘柄ごとの実現損益の累計
+        self.cost_basis_method: str = constants.DEFAULT_COST_BASIS_METHOD
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # 取得ロット台帳がない古いセーブデータは、初回参照時に平均取得単価から台帳を作る
+        self.__dict__.setdefault('tax_lots', {})
+        self.__dict__.setdefault('realized_gains', {})
+        self.__dict__.setdefault('cost_basis_method', constants.DEFAULT_COST_BASIS_METHOD)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # 評価額キャッシュは MarketEngine の行番号などに依存するため保存しない。保有者索引もロード後に登録し直す
+        for name in ('_valuation_key', '_valuation_value', '_position_arrays', '_margin_arrays', '_holder_index'):
+            state.pop(name, None)
+        return state
+
+    def _holdings_changed(self, ticker: str, old_cost: float):
+        """売買で保有株数・取得原価が変わったときに、取得原価の合計とキャッシュの世代を更新する。"""
+        self._holdings_version += 1
+        if self._cost_basis is not None:
+            lots = self.tax_lots.get(ticker)
+            self._cost_basis += (lots.total_cost if lots is not None else 0.0) - old_cost
+
+    def _get_position_lots(self, ticker: str) -> PositionLots:
+        """ticker の取得ロット台帳を返す。台帳がない保有銘柄(古いセーブデータ)は平均取得単価のロット1つから作る。"""
+        lots = self.tax_lots.get(ticker)
+        if lots is None:
+            lots = PositionLots(self.cost_basis_method)
+            holding = self.general_stock_portfolio.get(ticker)
+            if holding:
+                avg_price = holding.get("average_buy_price", 0.0)
+                lots.add(holding.get("margin_shares", 0), avg_price, is_margin=True)
+                lots.add(holding.get("cash_shares", 0), avg_price, is_margin=False)
+            self.tax_lots[ticker] = lots
+        return lots
+
+    def set_cost_basis_method(self, method: str):
+        """取得原価の計算方法(先入先出法・移動平均法)を切り替える。一般株式を保有していない時のみ変更できる。"""
+        if method not in (constants.COST_BASIS_METHOD_FIFO, constants.COST_BASIS_METHOD_AVERAGE):
+            raise ValueError(f"Unknown cost basis method: {method}")
+        if self.general_stock_portfolio:
+            raise ValueError("Cost basis method can only be changed while no stocks are held.")
+        self.cost_basis_method = method
+
+    def get_position_cost(self, ticker: str) -> float:
+        """ticker の保有株の取得原価を返す。"""
+        if ticker not in self.general_stock_portfolio:
+            return 0.0
+        return self._get_position_lots(ticker).total_cost
+
+    def get_total_cost_basis(self) -> float:
+        """一般株式の取得原価の合計を返す。売買のたびに差分で更新される。"""
+        if self._cost_basis is None:
+            self._cost_basis = sum(self._get_position_lots(ticker).total_cost for ticker in self.general_stock_portfolio)
+        return self._cost_basis
+
+    def get_unrealized_gain(self, market_data: Optional[List[Any]], ticker: Optional[str] = None) -> float:
+        """一般株式の含み損益(評価額 - 取得原価)を返す。ticker を指定した場合はその銘柄のみ。"""
+        if ticker is None:
+            return self.get_total_general_stock_value(market_data) - self.get_total_cost_basis()
+        holding = self.general_stock_portfolio.get(ticker)
+        company = lookup_company(market_data, ticker) if holding else None
+        if company is None:
+            return 0.0
+        shares = holding.get("cash_shares", 0) + holding.get("margin_shares", 0)
+        return shares * company.current_price - self.get_position_cost(ticker)
+
+    def get_realized_gain(self, ticker: Optional[str] = None) -> float:
+        """売却で確定した損益の累計を返す。ticker を指定した場合はその銘柄のみ。"""
+        if ticker is not None:
+            return self.realized_gains.get(ticker, 0.0)
+        return sum(self.realized_gains.values())
+
+    def preview_margin_repayment(self, ticker: str, num_shares: int) -> float:
+        """ticker を num_shares 株売却した場合の信用買いの返済額を返す(実際には売却しない)。"""
+        if ticker not in self.general_stock_portfolio:
+            return 0.0
+        margin_cost, _ = self._get_position_lots(ticker).preview_sale(num_shares)
+        return min(self.margin_loan, margin_cost * (1 - constants.INITIAL_MARGIN_REQUIREMENT_RATIO))
+
+    def _get_position_arrays(self, registry: MarketRegistry) -> Tuple[Any, Any, List[Tuple[Any, int]], float]:
+        """
+        保有銘柄の MarketEngine 行番号と株数の配列、registry のエンジン外の銘柄と株数の一覧、
+        および市場にない銘柄の取得原価ベースの評価額を返す。
+        エンジン外の銘柄の株価はキャッシュの版では変化を検知できないため、評価のたびにその時点の株価で計算する。
+        """
+        key = (self._holdings_version, registry.version)
+        cached = self._position_arrays
+        if cached is not None and cached[0] is registry and cached[1] == key:
+            return cached[2:]
+        rows, shares = [], []
+        off_engine: List[Tuple[Any, int]] = []
+        unlisted_value = 0.0
+        for ticker, holding_info in self.general_stock_portfolio.items():
+            total_shares = holding_info.get("cash_shares", 0) + holding_info.get("margin_shares", 0)
+            company = registry.get(ticker)
+            if company is not None and company.engine is registry.engine:
+                rows.append(company.engine_row)
+                shares.append(total_shares)
+            elif company is not None:
+                off_engine.append((company, total_shares))
+            else:
+                unlisted_value += total_shares * holding_info.get("average_buy_price", 0.0)
+        self._position_arrays = (registry, key, np.array(rows, dtype=np.int64), np.array(shares, dtype=np.float64),
+                                 off_engine, unlisted_value)
+        return self._position_arrays[2:]
+
+    def get_margin_position_arrays(self, registry: MarketRegistry) -> Tuple[Any, Any, Any, Any, float]:
+        """
+        信用取引の評価に使う配列を返す(保有状況が変わるまでキャッシュする)。
+        (信用買い銘柄の行番号, 信用買い株数, 空売り銘柄の行番号, 空売り株数, 空売りの売建代金合計)
+        市場で見つからない銘柄は check_margin_call と同じく評価額に含めない(売建代金のみ含める)。
+        """
+        key = (self._holdings_version, registry.version)
+        cached = self._margin_arrays
+        if cached is not None and cached[0] is registry and cached[1] == key:
+            return cached[2:]
+        long_rows, long_shares = [], []
+        for ticker, data in self.general_stock_portfolio.items():
+            if data.get('margin_shares', 0) > 0:
+                company = registry.get(ticker)
+                if company is not None:
+                    long_rows.append(company.engine_row)
+                    long_shares.append(data['margin_shares'])
+        short_rows, short_shares = [], []
+        short_proceeds = 0.0
+        for ticker, data in self.short_positions.items():
+            company = registry.get(ticker)
+            if company is not None:
+                short_rows.append(company.engine_row)
+                short_shares.append(data['shares'])
+            short_proceeds += data['shares'] * data['sell_price']
+        self._margin_arrays = (registry, key,
+                               np.array(long_rows, dtype=np.int64), np.array(long_shares, dtype=np.float64),
+                               np.array(short_rows, dtype=np.int64), np.array(short_shares, dtype=np.float64),
+                               short_proceeds)
+        return self._margin_arrays[2:]
 
     def get_total_general_stock_value(self, market_data: Optional[List[Any]]) -> float:
+        if isinstance(market_data, MarketRegistry) and market_data.engine is not None:
+            # 同じ週(株価が変わっていない)・同じ保有状況であればキャッシュを返す。エンジン外の銘柄は毎回評価する
+            engine = market_data.engine
+            rows, shares, off_engine, unlisted_value = self._get_position_arrays(market_data)
+            key = (self._holdings_version, market_data.version, engine.version)
+            cached = self._valuation_key
+            if cached is None or cached[0] is not market_data or cached[1] != key:
+                value = float(np.dot(shares, engine.price[rows])) if len(rows) else 0.0
+                self._valuation_value = value + unlisted_value
+                self._valuation_key = (market_data, key)
+            off_engine_value = sum(num_shares * company.current_price for company, num_shares in off_engine)
+            return self._valuation_value + off_engine_value
+
         total_value = 0.0
         if market_data and self.general_stock_portfolio:
             for ticker, holding_info in self.general_stock_portfolio.items():
-                market_company_data = next((c for c in market_data if hasattr(c, 'ticker_symbol') and c.ticker_symbol == ticker), None)
+                market_company_data = lookup_company(market_data, ticker)
                 total_shares_for_ticker = holding_info.get("cash_shares",0) + holding_info.get("margin_shares",0)
                 
                 if market_company_data and hasattr(market_company_data, 'current_price'):
@@ -50,7 +218,7 @@ class Portfolio:
         margin_long_value = 0.0
         for ticker, data in self.general_stock_portfolio.items():
             if data.get('margin_shares', 0) > 0:
-                market_company = next((c for c in market_data if hasattr(c, 'ticker_symbol') and c.ticker_symbol == ticker), None)
+                market_company = lookup_company(market_data, ticker)
                 if market_company and hasattr(market_company, 'current_price'):
                     margin_long_value += data['margin_shares'] * market_company.current_price
         
@@ -59,7 +227,7 @@ class Portfolio:
         short_position_current_value = 0.0
         short_position_initial_proceeds = 0.0
         for ticker, data in self.short_positions.items():
-            market_company = next((c for c in market_data if hasattr(c, 'ticker_symbol') and c.ticker_symbol == ticker), None)
+            market_company = lookup_company(market_data, ticker)
             if market_company and hasattr(market_company, 'current_price'):
                 short_position_current_value += data['shares'] * market_company.current_price
             
@@ -77,26 +245,32 @@ class Portfolio:
             
         return False, 0.0
 
+    def attach_holder_index(self, holder_index: 'HolderIndex'):
+        self._holder_index = holder_index
+
+    def _notify_holding_changed(self, ticker: str):
+        if self._holder_index is not None:
+            self._holder_index.update(self, ticker)
+
     def _update_portfolio_buy(self, ticker: str, company_name: str, num_shares: int, price: float, is_margin: bool):
         """株式購入時のポートフォリオ更新(内部処理)"""
         if ticker not in self.general_stock_portfolio:
             self.general_stock_portfolio[ticker] = {
                 "company_name": company_name, "cash_shares": 0, "margin_shares": 0, "average_buy_price": 0.0
             }
+            self._notify_holding_changed(ticker)
         
         portfolio_item = self.general_stock_portfolio[ticker]
-        current_total_shares = portfolio_item["cash_shares"] + portfolio_item["margin_shares"]
-        current_avg_price = portfolio_item["average_buy_price"]
-        
-        new_total_shares = current_total_shares + num_shares
-        if new_total_shares > 0:
-            new_avg_price = ((current_total_shares * current_avg_price) + (num_shares * price)) / new_total_shares
-            portfolio_item['average_buy_price'] = round(new_avg_price, 2)
+        lots = self._get_position_lots(ticker)
+        old_cost = lots.total_cost
+        lots.add(num_shares, price, is_margin)
+        portfolio_item['average_buy_price'] = lots.average_cost()
 
         if is_margin:
             portfolio_item['margin_shares'] += num_shares
         else:
             portfolio_item['cash_shares'] += num_shares
+        self._holdings_changed(ticker, old_cost)
 
     def buy_stock(self, ticker: str, company_name: str, num_shares: int, price: float, is_margin: bool):
         """株式を購入し、ポートフォリオに追加する。現金操作は行わない。"""
@@ -105,8 +279,11 @@ class Portfolio:
             loan_amount = (num_shares * price) * (1 - constants.INITIAL_MARGIN_REQUIREMENT_RATIO)
             self.margin_loan += loan_amount
 
-    def sell_stock(self, ticker: str, num_shares_to_sell: int) -> Optional[float]:
-        """株式を売却し、ポートフォリオから削除する。損益計算のために平均取得単価を返す。"""
+    def sell_stock(self, ticker: str, num_shares_to_sell: int, price: Optional[float] = None) -> Optional[float]:
+        """
+        株式を売却し、ポートフォリオから削除する。売却したロットの1株あたり取得原価を返す。
+        price を指定した場合は、売却代金と取得原価の差を実現損益として記録する。
+        """
         if ticker not in self.general_stock_portfolio: return None
             
         portfolio_item = self.general_stock_portfolio[ticker]
@@ -116,14 +293,21 @@ class Portfolio:
         
         if num_shares_to_sell > total_shares: return None
 
-        avg_price = portfolio_item['average_buy_price']
-        
+        lots = self._get_position_lots(ticker)
+        old_cost = lots.total_cost
+        margin_cost, cash_cost = lots.sell(num_shares_to_sell)
+        cost_per_share = (margin_cost + cash_cost) / num_shares_to_sell if num_shares_to_sell > 0 else 0.0
+        if price is not None:
+            gain = num_shares_to_sell * price - (margin_cost + cash_cost)
+            self.realized_gains[ticker] = self.realized_gains.get(ticker, 0.0) + gain
+
         margin_shares_sold = min(num_shares_to_sell, margin_shares)
         if margin_shares_sold > 0:
-            loan_ratio = (1 - constants.INITIAL_MARGIN_REQUIREMENT_RATIO)
-            avg_loan_per_margin_share = avg_price * loan_ratio if margin_shares > 0 else 0
-            loan_repayment_amount = min(self.margin_loan, avg_loan_per_margin_share * margin_shares_sold)
+            # 借入額は購入代金に比例するため、売却した信用ロットの取得原価から返済額が決まる
+            loan_repayment_amount = min(self.margin_loan, margin_cost * (1 - constants.INITIAL_MARGIN_REQUIREMENT_RATIO))
             self.margin_loan -= loan_repayment_amount
+            if self.margin_loan < 0.01:
+                self.margin_loan = 0.0 # 浮動小数点の端数を残さない
             portfolio_item['margin_shares'] -= margin_shares_sold
 
         cash_shares_sold = num_shares_to_sell - margin_shares_sold
@@ -132,8 +316,13 @@ class Portfolio:
             
         if portfolio_item['cash_shares'] + portfolio_item['margin_shares'] == 0:
             del self.general_stock_portfolio[ticker]
+            del self.tax_lots[ticker]
+            self._notify_holding_changed(ticker)
+        else:
+            portfolio_item['average_buy_price'] = lots.average_cost()
+        self._holdings_changed(ticker, old_cost)
         
-        return avg_price 
+        return cost_per_share
 
     def short_sell(self, ticker: str, company_name: str, num_shares: int, price: float, game_time: 'GameTime'):
         """空売りを行い、ポジションを持つ。現金操作は行わない。"""
@@ -142,6 +331,7 @@ class Portfolio:
             "company_name": company_name, "shares": num_shares,
             "sell_price": price, "borrowed_week": game_time.total_weeks_elapsed
         }
+        self._holdings_version += 1
 
     def buy_to_cover(self, ticker: str, num_shares_to_cover: int) -> Optional[float]:
         """空売りポジションを買い戻す。損益計算のために売建単価を返す。"""
@@ -155,6 +345,7 @@ class Portfolio:
         position['shares'] -= num_shares_to_cover
         if position['shares'] <= 0:
             del self.short_positions[ticker]
+        self._holdings_version += 1
         
         return original_sell_price
 
@@ -0,0 +1,131 @@
+# models/price_history.py
+from array import array
+from typing import Iterator, Optional
+
+import numpy as np
+
+class PriceHistory:
+    """
+    株価や物件価値などの時系列を固定長で保持するリングバッファ (array('d')ベース)。
+    各値をバッファの2か所に書き込む二重化方式により、push は O(1)、
+    直近 n 件の取り出しはコピーなしの連続した memoryview になる。
+    """
+    def __init__(self, depth: int = 52, initial_value: Optional[float] = None):
+        if depth <= 0:
+            raise ValueError("depth must be positive.")
+        self.depth: int = depth
+        self._buffer = array('d', bytes(8 * 2 * depth))
+        self._head: int = 0 # 次に書き込むスロット
+        self._count: int = 0
+        if initial_value is not None:
+            self.push(initial_value)
+
+    def push(self, value: float):
+        """値を1件追加する。容量を超えた場合は最も古い値が上書きされる。"""
+        slot = self._head
+        self._buffer[slot] = value
+        self._buffer[slot + self.depth] = value
+        self._head = (slot + 1) % self.depth
+        if self._count < self.depth:
+            self._count += 1
+
+    def window(self, n: Optional[int] = None) -> memoryview:
+        """直近 n 件(省略時は全件)を古い順に並べたビューを返す。コピーは発生しない。"""
+        count = self._count if n is None else max(0, min(n, self._count))
+        end = self._head + self.depth
+        return memoryview(self._buffer)[end - count:end]
+
+    def latest(self) -> Optional[float]:
+        """最新の値を返す。"""
+        if self._count == 0:
+            return None
+        return self._buffer[self._head + self.depth - 1]
+
+    def to_list(self):
+        return self.window().tolist()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.window())
+
+    def __getitem__(self, index):
+        return self.window()[index]
+
+
+class PriceHistoryMatrix:
+    """
+    全銘柄の株価履歴を (保持週数 x 銘柄数) のNumPy配列で保持するリングバッファ。
+    PriceHistory と同じ二重化方式で、1週分(全銘柄)の push は1回の代入、
+    銘柄ごと・市場全体の直近 n 週の取り出しはコピーなしのビューになる。
+    """
+    def __init__(self, depth: int = 52, capacity: int = 1):
+        if depth <= 0:
+            raise ValueError("depth must be positive.")
+        self.depth: int = depth
+        self.week: int = 0 # push された週数
+        self._buffer = np.zeros((2 * depth, max(1, capacity)), dtype=np.float64)
+        self._first_week = np.zeros(max(1, capacity), dtype=np.int64) # 各銘柄の履歴開始週
+
+    @property
+    def capacity(self) -> int:
+        return self._buffer.shape[1]
+
+    @property
+    def _slot(self) -> int:
+        return self.week % self.depth
+
+    def resize(self, capacity: int):
+        """銘柄数の容量を拡張する。"""
+        if capacity <= self.capacity:
+            return
+        buffer = np.zeros((2 * self.depth, capacity), dtype=np.float64)
+        buffer[:, :self.capacity] = self._buffer
+        first_week = np.zeros(capacity, dtype=np.int64)
+        first_week[:self.capacity] = self._first_week
+        self._buffer = buffer
+        self._first_week = first_week
+
+    def start_row(self, row: int, value: float):
+        """新規銘柄の履歴を、今週の値1件から開始する。"""
+        slot = self._slot
+        self._buffer[slot, row] = value
+        self._buffer[slot + self.depth, row] = value
+        self._first_week[row] = self.week
+
+    def start_rows(self, rows: slice, values: np.ndarray):
+        """複数の新規銘柄の履歴をまとめて開始する。"""
+        slot = self._slot
+        self._buffer[slot, rows] = values
+        self._buffer[slot + self.depth, rows] = values
+        self._first_week[rows] = self.week
+
+    def push(self, values: np.ndarray):
+        """1週分の全銘柄の値を追加する。"""
+        self.week += 1
+        slot = self._slot
+        n = len(values)
+        self._buffer[slot, :n] = values
+        self._buffer[slot + self.depth, :n] = values
+
+    def weeks_observed(self, size: int) -> np.ndarray:
+        """先頭 size 銘柄それぞれの、履歴開始からの週数(保持週数で打ち切らない)。"""
+        return self.week - self._first_week[:size] + 1
+
+    def row_length(self, row: int) -> int:
+        return min(self.depth, self.week - int(self._first_week[row]) + 1)
+
+    def window(self, row: int, n: Optional[int] = None) -> np.ndarray:
+        """指定銘柄の直近 n 週(省略時は保持している全期間)を古い順に並べたビューを返す。"""
+        count = self.row_length(row)
+        if n is not None:
+            count = max(0, min(n, count))
+        end = self._slot + self.depth + 1
+        return self._buffer[end - count:end, row]
+
+    def window_all(self, size: int, n: Optional[int] = None) -> np.ndarray:
+        """先頭 size 銘柄について、直近 n 週 x 銘柄数 のビューを返す。"""
+        count = min(self.depth, self.week + 1) if n is None else max(0, min(n, self.depth, self.week + 1))
+        end = self._slot + self.depth + 1
+        return self._buffer[end - count:end, :size]
@@ -5,6 +5,9 @@ import uuid
 import random
 from typing import List, Optional, Tuple
 
+from .price_history import PriceHistory
+import constants
+
 class Property:
     """
     不動産物件を表すクラス。
@@ -18,16 +21,23 @@ class Property:
         self.current_value: float = float(purchase_price)
         self.weekly_rent_income: int = weekly_rent_income
         self.weekly_maintenance_cost: int = weekly_maintenance_cost
-        self.historical_values: List[float] = [self.current_value]
+        self.historical_values: PriceHistory = PriceHistory(constants.PROPERTY_VALUE_HISTORY_WEEKS, initial_value=self.current_value)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # 物件価値の履歴をリストで持っていた頃のセーブデータは、直近の保持週数分だけ PriceHistory に移す
+        if isinstance(self.historical_values, list):
+            history = PriceHistory(constants.PROPERTY_VALUE_HISTORY_WEEKS)
+            for value in self.historical_values[-constants.PROPERTY_VALUE_HISTORY_WEEKS:]:
+                history.push(value)
+            self.historical_values = history
 
     def update_weekly_value(self, economic_impact: float):
         """週ごとに物件の現在価値を更新する。"""
         # 経済状況とランダムな変動要因で価値を更新
         change_rate = economic_impact + (random.uniform(-0.005, 0.006))
         self.current_value *= (1 + change_rate)
-        self.historical_values.append(self.current_value)
-        if len(self.historical_values) > 52: # 1年分のみ保持
-            self.historical_values.pop(0)
+        self.historical_values.push(self.current_value) # 保持週数を超えた分は古い順に上書きされる
 
     def get_gross_yield(self) -> float:
         """表面利回り(年間家賃収入 ÷ 物件価格)を計算する。"""
@@ -0,0 +1,70 @@
+# models/regional_demand.py
+import collections
+from typing import Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .business_unit import BusinessUnit
+
+class RegionalDemand:
+    """
+    店舗を所在地域(location_name)ごとに分け、地域単位で顧客を配分するクラス。
+    各地域の顧客プールは、その地域にある店舗の base_weekly_customer_pool の合計とする。
+    前週から店舗の顔ぶれ・集客力が変わっていない地域は再計算しない。
+    地域の集客力の合計が 0 の場合は、従来どおり各店舗の来客数を変えない。
+    """
+    def __init__(self):
+        # 地域名 -> 前回配分時の (店舗の並び, 集客力の並び)。店舗はオブジェクトそのものを持ち、is で比較する
+        self._signatures: Dict[str, Tuple[Tuple['BusinessUnit', ...], Tuple[float, ...]]] = {}
+        self.regions_recomputed: int = 0 # 直近の配分で再計算した地域数
+
+    def allocate(self, shops: Iterable['BusinessUnit']) -> int:
+        """全店舗の weekly_customers を更新し、再計算した地域数を返す。"""
+        regions: Dict[str, List['BusinessUnit']] = collections.defaultdict(list)
+        for shop in shops:
+            regions[shop.location_name].append(shop)
+
+        recomputed = 0
+        for region_name, region_shops in regions.items():
+            shops_in_region = tuple(region_shops)
+            attractiveness = tuple(shop.attractiveness for shop in region_shops)
+            previous = self._signatures.get(region_name)
+            if (previous is not None and previous[1] == attractiveness and len(previous[0]) == len(shops_in_region)
+                    and all(a is b for a, b in zip(previous[0], shops_in_region))):
+                continue
+            self._signatures[region_name] = (shops_in_region, attractiveness)
+            self._allocate_region(region_shops)
+            recomputed += 1
+
+        # 店舗がなくなった地域の記録を消す
+        for region_name in [r for r in self._signatures if r not in regions]:
+            del self._signatures[region_name]
+
+        self.regions_recomputed = recomputed
+        return recomputed
+
+    def invalidate(self, region_name: Optional[str] = None):
+        """指定地域(省略時は全地域)を次回の配分で必ず再計算させる。"""
+        if region_name is None:
+            self._signatures.clear()
+        else:
+            self._signatures.pop(region_name, None)
+
+    @staticmethod
+    def _allocate_region(region_shops: List['BusinessUnit']):
+        """1地域分の顧客を、集客力のシェアに応じて一括で配分する。"""
+        attractiveness = np.fromiter((shop.attractiveness for shop in region_shops), dtype=np.float64, count=len(region_shops))
+        pool = sum(getattr(shop, 'base_weekly_customer_pool', 500) for shop in region_shops)
+        total = attractiveness.sum()
+        if total <= 0:
+            return
+        customers = (pool * (attractiveness / total)).astype(np.int64)
+        for shop, count in zip(region_shops, customers.tolist()):
+            shop.weekly_customers = count
+
+    def __getstate__(self):
+        # 前回配分の記録は店舗への参照を持つため保存せず、ロード後は全地域を再計算させる
+        state = self.__dict__.copy()
+        state['_signatures'] = {}
+        return state
@@ -0,0 +1,123 @@
+# models/tax_lots.py
+from typing import Tuple
+
+import numpy as np
+
+import constants
+
+class LotQueue:
+    """
+    1銘柄・1種類(現物または信用)の取得ロットを、購入順に株数と単価の配列で保持するキュー。
+    売却は先頭から消化し、消化済みの位置は head を進めるだけで済ませる。
+    配列が埋まったときは、消化済みの領域が半分以上あれば詰め直し、そうでなければ容量を倍にする。
+    """
+    __slots__ = ('shares', 'prices', 'head', 'tail', 'total_shares', 'total_cost')
+
+    def __init__(self, capacity: int = 4):
+        self.shares = np.zeros(capacity, dtype=np.int64)
+        self.prices = np.zeros(capacity, dtype=np.float64)
+        self.head: int = 0
+        self.tail: int = 0
+        self.total_shares: int = 0
+        self.total_cost: float = 0.0
+
+    def __len__(self) -> int:
+        return self.tail - self.head
+
+    def append(self, num_shares: int, price: float):
+        if num_shares <= 0:
+            return
+        if self.tail == len(self.shares):
+            live = self.tail - self.head
+            if self.head * 2 >= len(self.shares):
+                self.shares[:live] = self.shares[self.head:self.tail]
+                self.prices[:live] = self.prices[self.head:self.tail]
+            else:
+                capacity = len(self.shares) * 2
+                self.shares = np.concatenate((self.shares[self.head:self.tail], np.zeros(capacity - live, dtype=np.int64)))
+                self.prices = np.concatenate((self.prices[self.head:self.tail], np.zeros(capacity - live, dtype=np.float64)))
+            self.head, self.tail = 0, live
+        self.shares[self.tail] = num_shares
+        self.prices[self.tail] = price
+        self.tail += 1
+        self.total_shares += num_shares
+        self.total_cost += num_shares * price
+
+    def peek_cost(self, num_shares: int, method: str) -> float:
+        """num_shares 株を売却した場合の取得原価を返す(キューは変更しない)。"""
+        num_shares = min(num_shares, self.total_shares)
+        if num_shares <= 0:
+            return 0.0
+        if method == constants.COST_BASIS_METHOD_AVERAGE or num_shares == self.total_shares:
+            return self.total_cost * num_shares / self.total_shares
+        cost = 0.0
+        i = self.head
+        while num_shares > 0:
+            taken = min(num_shares, int(self.shares[i]))
+            cost += taken * float(self.prices[i])
+            num_shares -= taken
+            i += 1
+        return cost
+
+    def consume(self, num_shares: int, method: str) -> float:
+        """先頭のロットから num_shares 株を取り崩し、その取得原価を返す。"""
+        num_shares = min(num_shares, self.total_shares)
+        if num_shares <= 0:
+            return 0.0
+        cost = self.peek_cost(num_shares, method)
+        remaining = num_shares
+        while remaining > 0:
+            lot = int(self.shares[self.head])
+            if lot <= remaining:
+                remaining -= lot
+                self.head += 1
+            else:
+                self.shares[self.head] = lot - remaining
+                remaining = 0
+        self.total_shares -= num_shares
+        if self.total_shares == 0:
+            self.head = self.tail = 0
+            self.total_cost = 0.0
+        else:
+            self.total_cost -= cost
+        return cost
+
+class PositionLots:
+    """
+    1銘柄の取得ロット台帳。信用買い分と現物分を別々のキューで持つ(売却は信用分から先に行う)。
+    取得原価は method に従い、先入先出法(fifo)ではロットごとの単価で、移動平均法(average)では平均単価で計算する。
+    信用買いの借入額は購入代金に比例するため、返済額は売却したロットの取得原価から求められ、平均単価の丸めによるずれが生じない。
+    """
+    __slots__ = ('method', 'margin', 'cash')
+
+    def __init__(self, method: str = constants.DEFAULT_COST_BASIS_METHOD):
+        self.method: str = method
+        self.margin: LotQueue = LotQueue()
+        self.cash: LotQueue = LotQueue()
+
+    @property
+    def total_shares(self) -> int:
+        return self.margin.total_shares + self.cash.total_shares
+
+    @property
+    def total_cost(self) -> float:
+        return self.margin.total_cost + self.cash.total_cost
+
+    def average_cost(self) -> float:
+        shares = self.total_shares
+        return self.total_cost / shares if shares > 0 else 0.0
+
+    def add(self, num_shares: int, price: float, is_margin: bool):
+        (self.margin if is_margin else self.cash).append(num_shares, price)
+
+    def preview_sale(self, num_shares: int) -> Tuple[float, float]:
+        """num_shares 株を売却した場合の (信用分の取得原価, 現物分の取得原価) を返す(台帳は変更しない)。"""
+        margin_sold = min(num_shares, self.margin.total_shares)
+        return (self.margin.peek_cost(margin_sold, self.method),
+                self.cash.peek_cost(num_shares - margin_sold, self.method))
+
+    def sell(self, num_shares: int) -> Tuple[float, float]:
+        """信用分、現物分の順に num_shares 株を取り崩し、(信用分の取得原価, 現物分の取得原価) を返す。"""
+        margin_sold = min(num_shares, self.margin.total_shares)
+        return (self.margin.consume(margin_sold, self.method),
+                self.cash.consume(num_shares - margin_sold, self.method))
@@ -0,0 +1,93 @@
+# models/ticker_allocator.py
+import collections
+import random
+from typing import Deque, Dict, Optional, Set
+
+class TickerAllocator:
+    """
+    ティッカーシンボルの払い出しを管理するクラス。
+    alphabet の文字を length 桁並べたコード空間を、遅延評価のフィッシャー–イェーツ法でシャッフルしながら順に払い出す。
+    並べ替えは入れ替えた位置だけを辞書に記録するため、コード空間が大きくてもメモリを使わず、払い出しは O(1) で済む。
+    上場廃止で返却されたコードは空き一覧に入り、新しいコードを使い切った後に再利用する。
+    """
+    def __init__(self, alphabet: str, length: int, rng: Optional[random.Random] = None):
+        if not alphabet or length <= 0:
+            raise ValueError("Ticker alphabet must not be empty and length must be positive.")
+        self.alphabet: str = alphabet
+        self.length: int = length
+        self.capacity: int = len(alphabet) ** length
+        self._rng = rng # None の場合はモジュールの random を使う(シード固定時の再現性のため)
+        self._remaining: int = self.capacity # まだ払い出していない並べ替え位置の数
+        self._swaps: Dict[int, int] = {} # 並べ替え位置 -> コード番号(入れ替えがあった位置のみ)
+        self._taken: Set[str] = set() # 使用中・予約中のコード
+        self._released: Deque[str] = collections.deque() # 返却されたコード
+
+    @staticmethod
+    def length_for(num_tickers: int, alphabet: str, min_length: int) -> int:
+        """num_tickers 件を余裕をもって払い出せる桁数を返す(コード空間が件数の2倍以上になる桁数)。"""
+        length = max(1, min_length)
+        while len(alphabet) ** length < num_tickers * 2:
+            length += 1
+        return length
+
+    def _encode(self, number: int) -> str:
+        if self.alphabet == "0123456789":
+            return str(number).zfill(self.length) # 数字のみの場合は文字列変換で済ませる
+        base = len(self.alphabet)
+        chars = []
+        for _ in range(self.length):
+            number, digit = divmod(number, base)
+            chars.append(self.alphabet[digit])
+        return "".join(reversed(chars))
+
+    def _draw(self) -> Optional[str]:
+        """シャッフル済みのコード空間から次のコードを1つ取り出す。使い切った場合は None。"""
+        if self._remaining <= 0:
+            return None
+        randrange = self._rng.randrange if self._rng is not None else random.randrange
+        position = randrange(self._remaining)
+        last = self._remaining - 1
+        number = self._swaps.get(position, position)
+        # 取り出した位置に末尾の値を移し、末尾を縮める
+        self._swaps[position] = self._swaps.pop(last, last)
+        if position == last:
+            self._swaps.pop(position, None)
+        self._remaining -= 1
+        return self._encode(number)
+
+    def allocate(self) -> str:
+        """未使用のティッカーを1つ払い出す。"""
+        while True:
+            ticker = self._draw()
+            if ticker is None:
+                break
+            if ticker not in self._taken: # claim 済みのコードは読み飛ばす
+                self._taken.add(ticker)
+                return ticker
+        while self._released:
+            ticker = self._released.popleft()
+            if ticker not in self._taken:
+                self._taken.add(ticker)
+                return ticker
+        raise ValueError(f"No ticker symbols left ({self.capacity:,} codes of length {self.length}).")
+
+    def reserve(self) -> str:
+        """上場前の銘柄(自社IPOなど)のためにティッカーを確保する。上場時の claim は同じコードでも問題ない。"""
+        return self.allocate()
+
+    def claim(self, ticker: str):
+        """既に使われているティッカーを使用中として登録する(セーブデータの読み込み時・手動指定時)。"""
+        self._taken.add(ticker)
+
+    def release(self, ticker: str):
+        """上場廃止などで不要になったティッカーを返却する。"""
+        if ticker in self._taken:
+            self._taken.discard(ticker)
+            self._released.append(ticker)
+
+    def is_taken(self, ticker: str) -> bool:
+        return ticker in self._taken
+
+    def available(self) -> int:
+        """まだ払い出せるコードのおおよその数(読み飛ばす claim 済みコードを含む)。"""
+        return self._remaining + len(self._released)
@@ -0,0 +1,182 @@
+# profiler.py
+# 週次処理の計測用モジュール。既定では無効で、無効時の section() は共有の空コンテキストを返すだけになる。
+import cProfile
+import collections
+import time
+import tracemalloc
+from typing import Deque, Dict, List, Optional
+
+# --- モジュールレベル変数 ---
+enabled: bool = False
+track_allocations: bool = False
+window_size: int = 520 # パーセンタイル計算に使う直近の週数
+
+_profile: Optional[cProfile.Profile] = None
+_current_tick: Dict[str, List[float]] = {} # 名前 -> [経過秒, 呼び出し回数, 最大一時確保バイト数, 残存バイト数]
+_history: Dict[str, Deque[List[float]]] = {}
+_totals: Dict[str, List[float]] = {}
+ticks_recorded: int = 0
+_open_sections: List['_Section'] = [] # メモリ確保量を計測中の区間(入れ子の外側から順)
+
+
+class _NullSection:
+    """計測無効時に返す何もしないコンテキスト。"""
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc, tb): return False
+
+_NULL_SECTION = _NullSection()
+
+
+class _Section:
+    """
+    1区間の経過時間・呼び出し回数・メモリ確保量を記録するコンテキスト。
+    メモリは区間開始時からの使用量の最大の増加(区間内で確保して解放した一時領域を含む)と、区間終了時に残った増減を記録する。
+    最大値は tracemalloc.reset_peak で区間ごとに測り直すため、リセット前のピークは外側の区間へ引き継ぐ。
+    """
+    __slots__ = ("name", "_start", "_start_bytes", "_peak_bytes")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        if track_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            if _open_sections:
+                outer = _open_sections[-1]
+                outer._peak_bytes = max(outer._peak_bytes, peak)
+            tracemalloc.reset_peak()
+            self._start_bytes = self._peak_bytes = current
+            _open_sections.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        peak_growth = retained = 0
+        if track_allocations and _open_sections and _open_sections[-1] is self:
+            current, peak = tracemalloc.get_traced_memory()
+            self._peak_bytes = max(self._peak_bytes, peak)
+            peak_growth = self._peak_bytes - self._start_bytes
+            retained = current - self._start_bytes
+            _open_sections.pop()
+            if _open_sections:
+                outer = _open_sections[-1]
+                outer._peak_bytes = max(outer._peak_bytes, self._peak_bytes)
+        stats = _current_tick.get(self.name)
+        if stats is None:
+            stats = _current_tick[self.name] = [0.0, 0, 0, 0]
+        stats[0] += elapsed
+        stats[1] += 1
+        stats[2] = max(stats[2], peak_growth)
+        stats[3] += retained
+        return False
+
+
+def section(name: str):
+    """計測区間を返す。with profiler.section("market"): のように使う。"""
+    if not enabled:
+        return _NULL_SECTION
+    return _Section(name)
+
+# --- 有効化・無効化 ---
+def enable(allocations: bool = False, use_cprofile: bool = False, window: int = 520):
+    """計測を有効にする。allocations で tracemalloc によるメモリ確保量、use_cprofile で cProfile を併用する。"""
+    global enabled, track_allocations, window_size, _profile
+    reset()
+    enabled = True
+    window_size = window
+    track_allocations = allocations
+    if allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if use_cprofile:
+        _profile = cProfile.Profile()
+        _profile.enable()
+
+def disable():
+    global enabled, track_allocations
+    if _profile is not None:
+        _profile.disable()
+    if track_allocations and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    enabled = False
+    track_allocations = False
+
+def reset():
+    global ticks_recorded, _profile
+    if _profile is not None:
+        _profile.disable()
+    _current_tick.clear()
+    _open_sections.clear()
+    _history.clear()
+    _totals.clear()
+    ticks_recorded = 0
+    _profile = None
+
+# --- 週単位の集計 ---
+def end_tick():
+    """1週分の計測値を確定し、直近履歴と累計に加える。tick_system から毎週呼ばれる。"""
+    global ticks_recorded
+    if not enabled:
+        return
+    for name, stats in _current_tick.items():
+        history = _history.get(name)
+        if history is None:
+            history = _history[name] = collections.deque(maxlen=window_size)
+        history.append(stats)
+        totals = _totals.setdefault(name, [0.0, 0, 0, 0])
+        totals[0] += stats[0]
+        totals[1] += stats[1]
+        totals[2] = max(totals[2], stats[2])
+        totals[3] += stats[3]
+    _current_tick.clear()
+    ticks_recorded += 1
+
+def _percentile(sorted_values: List[float], ratio: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(ratio * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def get_stats() -> Dict[str, Dict[str, float]]:
+    """
+    区間ごとの累計と、直近 window_size 週の1週あたり所要時間のパーセンタイルを返す。
+    peak_bytes は区間内で一時的に増えたメモリ使用量の最大値、retained_bytes は区間の前後で増えた(解放されずに残った)量の合計。
+    """
+    result = {}
+    for name, totals in _totals.items():
+        per_tick = sorted(stats[0] for stats in _history.get(name, ()))
+        result[name] = {
+            "total_seconds": totals[0],
+            "calls": totals[1],
+            "peak_bytes": totals[2],
+            "retained_bytes": totals[3],
+            "p50_ms": _percentile(per_tick, 0.50) * 1000,
+            "p90_ms": _percentile(per_tick, 0.90) * 1000,
+            "p99_ms": _percentile(per_tick, 0.99) * 1000,
+        }
+    return result
+
+def get_report() -> str:
+    lines = [f"--- 計測レポート ({ticks_recorded}週) ---"]
+    stats = get_stats()
+    for name in sorted(stats, key=lambda n: stats[n]["total_seconds"], reverse=True):
+        s = stats[name]
+        line = (f"  {name:<20} 合計 {s['total_seconds']:8.3f}秒 / {s['calls']:>7,}回"
+                f" | p50 {s['p50_ms']:7.3f}ms p90 {s['p90_ms']:7.3f}ms p99 {s['p99_ms']:7.3f}ms")
+        if track_allocations or s["peak_bytes"]:
+            line += f" | 一時確保の最大 {s['peak_bytes'] / 1024:,.0f}KB 残存 {s['retained_bytes'] / 1024:+,.0f}KB"
+        lines.append(line)
+    return "\n".join(lines)
+
+def dump_report(path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(get_report() + "\n")
+
+def dump_pstats(path: str) -> bool:
+    """cProfile の結果を pstats 形式で保存する。enable(use_cprofile=True) で計測した場合のみ有効。"""
+    if _profile is None:
+        return False
+    _profile.create_stats()
+    _profile.dump_stats(path)
+    return True
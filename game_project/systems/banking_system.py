@@ -1,4 +1,5 @@
 # systems/banking_system.py
+import math
 import random
 from typing import List, Dict, Any, Optional
 
@@ -10,8 +11,8 @@ import utils
 
 # --- 銀行機能 ---
 
-def show_loan_status(player: Player):
-    """現在のローンと社債の状況を詳細に表示する"""
+def show_loan_status(player: Player, game_time: GameTime):
+    """現在のローンと社債の状況を詳細に表示する。ローンは今後の返済予定も表示する"""
     print("\n--- 現在の負債状況 ---")
     
     # 銀行ローン
@@ -23,6 +24,14 @@ def show_loan_status(player: Player):
         for i, loan in enumerate(player.finance.active_loans):
             print(f"    {i+1}. ID: ...{loan.loan_id[-6:]} | {loan.lender_name}「{loan.product_name}」")
             print(f"        残高: ¥{loan.remaining_principal:,.0f}, 週利: {loan.weekly_rate:.4%}, 返済進捗: {loan.weeks_repaid}/{loan.total_weeks}週")
+            now = game_time.total_weeks_elapsed
+            schedule = loan.get_schedule(now)
+            print(f"        返済方式: {constants.LOAN_REPAYMENT_METHOD_LABELS[loan.repayment_method]}, 最終返済: {max(1, loan.maturity_week - now)}週後, "
+                  f"今後の支払総額: ¥{schedule['total_payment']:,.0f} (うち利息 ¥{schedule['total_interest']:,.0f})")
+            preview = min(constants.LOAN_SCHEDULE_PREVIEW_WEEKS, len(schedule["week"]))
+            for j in range(preview):
+                print(f"          {schedule['week'][j] - now}週後: 元本 ¥{schedule['principal'][j]:,.0f} + 利息 ¥{schedule['interest'][j]:,.0f}"
+                      f" (返済後残高 ¥{schedule['balance'][j]:,.0f})")
 
     # 社債
     if not player.finance.outstanding_bonds:
@@ -66,6 +75,7 @@ def take_out_loan(player: Player, game_time: GameTime):
         print(f"  {i+1}. {product['bank_name']} - {product['product_name']}")
         print(f"      あなたの条件 -> 最大融資額: ¥{product['customized_max_amount']:,.0f}, 週利: {product['customized_rate']*100:.3f}%")
         print(f"      (基本条件: 最大 ¥{product['max_amount']:,.0f}, 週利 {product['interest_rate_weekly']*100:.3f}%)")
+        print(f"      返済: {product['repayment_weeks']}週, {constants.LOAN_REPAYMENT_METHOD_LABELS[product['repayment_method']]}")
 
     product_choice = utils.get_integer_input(
         f"ローン商品を選択してください (1-{len(customized_loan_products)}, 0でキャンセル): ", 0, len(customized_loan_products)
@@ -91,7 +101,8 @@ def take_out_loan(player: Player, game_time: GameTime):
         lender_name=selected_product['bank_name'],
         product_name=selected_product['product_name'],
         repayment_weeks=selected_product['repayment_weeks'],
-        game_time=game_time 
+        game_time=game_time,
+        repayment_method=selected_product['repayment_method']
     )
 
 
@@ -170,6 +181,12 @@ def issue_bond_menu(player: Player, game_time: GameTime):
     year_choice = utils.get_integer_input("選択: ", 1, len(constants.BOND_MATURITY_YEARS_OPTIONS))
     if year_choice is None: return
     maturity_years = constants.BOND_MATURITY_YEARS_OPTIONS[year_choice - 1]
+
+    print(f"コール条項(発行{constants.BOND_CALL_PROTECTION_WEEKS}週後から額面の{constants.BOND_CALL_PRICE_RATIO:.0%}で期限前償還できる権利)を付けますか?")
+    print(f"  (付ける場合、年利が {constants.BOND_CALLABLE_COUPON_PREMIUM:.2%} 上乗せされます)")
+    is_callable = input("コール条項を付ける (y/n): ").strip().lower() == 'y'
+    if is_callable:
+        estimated_coupon_rate += constants.BOND_CALLABLE_COUPON_PREMIUM
     
     fee = principal * constants.BOND_ISSUANCE_FEE_RATE
     net_proceeds = principal - fee
@@ -178,18 +195,20 @@ def issue_bond_menu(player: Player, game_time: GameTime):
     print(f"  発行額 (額面): ¥{principal:,.0f}")
     print(f"  年数: {maturity_years}年")
     print(f"  年利 (クーポンレート): {estimated_coupon_rate:.2%}")
+    print(f"  コール条項: {'あり' if is_callable else 'なし'}")
     print(f"  発行手数料 ({constants.BOND_ISSUANCE_FEE_RATE:.1%}): ¥{fee:,.0f}")
     print(f"  手取額 (会社現金に加算): ¥{net_proceeds:,.0f}")
     
     confirm = input("この条件で社債を発行しますか? (y/n): ").lower()
     if confirm == 'y':
         if player.finance.get_cash() >= fee:
-            player.finance.finances['cash'] -= fee 
+            player.finance.record_expense(fee, 'bond_issuance_fee')
             player.issue_bond(
                 principal=float(principal),
                 annual_coupon_rate=estimated_coupon_rate,
                 maturity_years=maturity_years,
-                game_time=game_time
+                game_time=game_time,
+                is_callable=is_callable
             )
         else:
             print("発行手数料を支払うための現金が不足しています。")
@@ -197,34 +216,93 @@ def issue_bond_menu(player: Player, game_time: GameTime):
         print("社債の発行をキャンセルしました。")
 
 
+def format_credit_metric(name: str, value: float) -> str:
+    """格付けに使った財務比率を表示用の文字列にする"""
+    label = constants.CREDIT_METRIC_LABELS[name]
+    if math.isinf(value) or math.isnan(value):
+        return f"{label} -"
+    if name == "profitability":
+        return f"{label} {value:.1%}"
+    if name == "liquidity":
+        return f"{label} {value:.1f}四半期分"
+    return f"{label} {value:.2f}倍"
+
+
+def get_market_bond_yield(player: Player) -> float:
+    """プレイヤーの会社の社債の市場利回り(年率)。社債を発行できない格付けでは最も広いスプレッドを使う"""
+    spread = constants.BOND_CREDIT_SPREADS.get(player.credit_rating, max(constants.BOND_CREDIT_SPREADS.values()))
+    return constants.BOND_BASE_YIELD + spread
+
+
+def retire_bond_menu(player: Player, game_time: GameTime):
+    """発行済み社債の期限前償還(コール)・買入消却のメニュー"""
+    print("\n--- 社債の期限前償還・買入消却 ---")
+    bonds = player.finance.outstanding_bonds
+    if not bonds:
+        print("未償還の社債はありません。"); return
+
+    now = game_time.total_weeks_elapsed
+    market_yield = get_market_bond_yield(player)
+    print(f"  現在の市場利回り (あなたの格付け {player.credit_rating}): {market_yield:.2%}")
+    for i, bond in enumerate(bonds):
+        price_ratio = bond.price_ratio(now, market_yield)
+        call_text = ""
+        if bond.is_callable:
+            call_text = " / コール可能" if bond.can_call(now) else f" / コールは{bond.first_call_week - now}週後から"
+        print(f"  {i+1}. {bond}")
+        print(f"      市場価格: 額面の{price_ratio:.2%} (買入総額 ¥{bond.principal * price_ratio:,.0f}){call_text}")
+    print("  0. キャンセル")
+
+    bond_choice = utils.get_integer_input("選択: ", 0, len(bonds))
+    if bond_choice is None or bond_choice == 0:
+        return
+    bond = bonds[bond_choice - 1]
+
+    print("  1: 市場から買い入れて消却する (一部も可)")
+    if bond.can_call(now):
+        print(f"  2: コール条項で全額を期限前償還する (¥{bond.principal * bond.call_price_ratio:,.0f})")
+    action = utils.get_integer_input("選択: ", 1, 2 if bond.can_call(now) else 1)
+    if action is None:
+        return
+    if action == 2:
+        player.finance.call_bond(bond.bond_id, game_time)
+        return
+
+    price_ratio = bond.price_ratio(now, market_yield)
+    face_amount = utils.get_integer_input(f"買い入れる額面を入力してください (最大 ¥{bond.principal:,.0f}): ", 1, int(bond.principal))
+    if face_amount is None:
+        return
+    player.finance.buy_back_bond(bond.bond_id, float(face_amount), price_ratio)
+
+
 def show_banking_menu(player: Player, game_time: GameTime):
     """銀行システムのメインメニューを表示・処理する"""
     while True:
         print("\n--- 銀行・資金調達 ---")
         print(f"  あなたの会社の信用格付け: {player.credit_rating} (スコア: {player.credit_rating_score})")
-        show_loan_status(player) 
+        if player.credit_metrics:
+            print("  (直近の評価: " + ", ".join(format_credit_metric(name, value) for name, value in player.credit_metrics.items()) + ")")
+        show_loan_status(player, game_time)
         
         print("\n  1: ローンを組む (銀行融資)")
         print("  2: ローンを返済する")
         
-        next_option = 3
+        options = {1: take_out_loan, 2: repay_loan_action}
         if player.is_company_public:
-            print(f"  {next_option}: 社債を発行する (市場調達)")
+            options[len(options) + 1] = issue_bond_menu
+            print(f"  {len(options)}: 社債を発行する (市場調達)")
+        if player.finance.outstanding_bonds:
+            options[len(options) + 1] = retire_bond_menu
+            print(f"  {len(options)}: 社債を期限前償還・買入消却する")
         
         print("  0: 前のメニューに戻る")
 
-        max_choice = next_option if player.is_company_public else 2
-        choice = utils.get_integer_input("選択: ", 0, max_choice)
+        choice = utils.get_integer_input("選択: ", 0, len(options))
         if choice is None: continue
 
-        if choice == 1:
-            take_out_loan(player, game_time) 
-        elif choice == 2:
-            repay_loan_action(player, game_time)
-        elif choice == 3 and player.is_company_public:
-            issue_bond_menu(player, game_time)
-        elif choice == 0:
+        if choice == 0:
             break
+        options[choice](player, game_time)
 
 def get_customized_loan_products(player: Player) -> List[Dict[str, Any]]:
     """プレイヤーの信用格付けに応じてカスタマイズされたローン商品リストを返す"""
@@ -7,16 +7,19 @@ from models.game_time import GameTime
 from models.competitor_company import CompetitorCompany
 from models.listed_company import ListedCompany
 from models.portfolio import Portfolio
+from models.regional_demand import RegionalDemand
 import constants
 
 # --- モジュールレベル変数 ---
 competitor_companies: List[CompetitorCompany] = []
+regional_demand: RegionalDemand = RegionalDemand() # 地域ごとの顧客配分
 
 # --- 初期化 ---
 def initialize_competitors(num_competitors: int, difficulty_level: int, game_time: GameTime):
     """指定された数の競合他社を、指定された難易度で生成し、初期化する。"""
-    global competitor_companies
+    global competitor_companies, regional_demand
     competitor_companies = []
+    regional_demand = RegionalDemand()
     
     def _generate_random_competitor_name() -> str:
         """ランダムな競合名を作成する内部関数"""
@@ -59,7 +62,7 @@ def prepare_all_for_competition():
             biz_unit.prepare_for_weekly_competition(player=None)
 
 def run_market_simulation_and_allocate_sales(player: Player):
-    """市場シミュレーションを実行し、顧客を各店舗に割り振る。"""
+    """市場シミュレーションを実行し、地域ごとに顧客を各店舗に割り振る。"""
     from models.business_unit import BusinessUnit
     
     all_shops: List[BusinessUnit] = []
@@ -69,26 +72,28 @@ def run_market_simulation_and_allocate_sales(player: Player):
 
     if not all_shops: return
 
-    total_attractiveness = sum(shop.attractiveness for shop in all_shops)
-    if total_attractiveness == 0: return
-
-    # 地域ごとの顧客プールを考慮した方がよりリアルだが、まずは全体で計算
-    total_customer_pool = sum(getattr(shop, 'base_weekly_customer_pool', 500) for shop in all_shops)
-
-    for shop in all_shops:
-        market_share = shop.attractiveness / total_attractiveness if total_attractiveness > 0 else 0
-        customers = int(total_customer_pool * market_share)
-        shop.weekly_customers = customers
+    # 店舗や集客力に変化があった地域だけ再計算される
+    regional_demand.allocate(all_shops)
 
 def finalize_all_competitor_finances():
     """全競合企業の週次決算を処理する。"""
     if not competitor_companies: return
     for comp in competitor_companies:
+        comp_sales = 0
         comp_profit = 0
         for biz_unit in comp.businesses_owned:
             biz_unit.finalize_weekly_finances(player=None)
+            comp_sales += biz_unit.finances.get('weekly_sales', 0)
             comp_profit += biz_unit.finances.get('weekly_profit', 0)
         comp.cash += comp_profit
+        comp.record_weekly_results(comp_sales, comp_profit)
+
+def update_competitor_credit_ratings():
+    """全競合企業の信用格付けを更新する(四半期末)。"""
+    for comp in competitor_companies:
+        old_rating = comp.credit_rating
+        if comp.update_credit_rating():
+            print(f"  [格付け] {comp.name} の信用格付けが {old_rating} から {comp.credit_rating} に変更されました。")
 
 def process_weekly_competitor_actions(player: Player, game_time: GameTime, market_data: List[ListedCompany]):
     """競合他社の週次アクションを処理する。"""
@@ -1,112 +1,137 @@
 # systems/general_stock_market_system.py
 import random
-import string
 from typing import List, Dict, Any, Optional
 
+import numpy as np
+
 from models.player import Player
 from models.game_time import GameTime
 from models.listed_company import ListedCompany
+from models.market_engine import MarketEngine
+from models.market_registry import MarketRegistry, lookup_company
+from models.market_screener import MarketScreener
+from models.ticker_allocator import TickerAllocator
 import constants
-from systems import reporting_system
+from systems import reporting_system, risk_system
 import utils
 
 # --- モジュールレベル変数 ---
-listed_companies_on_market: List[ListedCompany] = []
+market_registry: MarketRegistry = MarketRegistry() # 上場企業の一覧とティッカー索引
+market_engine: Optional[MarketEngine] = None # 全銘柄の株価データを一括管理するエンジン
+_market_screener: Optional[MarketScreener] = None # 銘柄の絞り込み・並べ替え(market_registry に対応)
 
 # --- 市場の初期化・更新 ---
 def initialize_general_stock_market(num_companies: int, start_year: int):
-    """一般株式市場を初期化し、企業詳細情報を含む上場企業を生成する"""
-    global listed_companies_on_market
-    listed_companies_on_market = []
-    
-    def _generate_random_ticker_symbol(length: int = constants.TICKER_SYMBOL_LENGTH) -> str:
-        return "".join(random.choices(string.digits, k=length))
+    """
+    一般株式市場を初期化し、上場企業を生成する。
+    株価・時価総額などの数値は NumPy でまとめて生成し、社名や企業概要などの説明用の属性は
+    企業ごとのシード(metadata_seed)から初回参照時に生成する。
+    """
+    global market_registry, market_engine
+    market_engine = MarketEngine(capacity=num_companies)
+    ticker_length = TickerAllocator.length_for(num_companies, constants.TICKER_SYMBOL_ALPHABET, constants.TICKER_SYMBOL_LENGTH)
+    ticker_allocator = TickerAllocator(constants.TICKER_SYMBOL_ALPHABET, ticker_length)
+    market_registry = MarketRegistry(engine=market_engine, ticker_allocator=ticker_allocator)
+    if num_companies <= 0:
+        return
 
-    def _generate_random_company_name() -> str:
-        parts = []
-        if random.random() < 0.7: parts.append(random.choice(constants.COMPANY_NAME_ELEMENTS_PREFIX))
-        parts.append(random.choice(constants.COMPANY_NAME_ELEMENTS_MIDDLE))
-        if random.random() < 0.8: parts.append(random.choice(constants.COMPANY_NAME_ELEMENTS_SUFFIX))
-        return "".join(parts)
+    # 乱数は random モジュールのシードから派生させ、ゲーム全体の再現性を保つ
+    rng = np.random.RandomState(random.getrandbits(32))
 
-    used_tickers = set() 
     tiers = list(constants.MARKET_CAP_TIERS.keys())
-    weights = [constants.MARKET_CAP_TIER_WEIGHTS[t] for t in tiers]
+    weights = np.array([constants.MARKET_CAP_TIER_WEIGHTS[t] for t in tiers], dtype=np.float64)
+    tier_index = rng.choice(len(tiers), size=num_companies, p=weights / weights.sum())
+    tier_min = np.array([constants.MARKET_CAP_TIERS[t]["min"] for t in tiers])[tier_index]
+    tier_max = np.array([constants.MARKET_CAP_TIERS[t]["max"] for t in tiers])[tier_index]
+    market_cap = np.round(rng.uniform(tier_min, tier_max) / 1_000_000) * 1_000_000
+
+    price_min, price_max = constants.INITIAL_STOCK_PRICE_RANGE
+    initial_price = np.maximum(1.0, np.round(rng.uniform(price_min, price_max, num_companies)))
+
+    shares_outstanding = np.maximum(1, np.round(market_cap / initial_price)).astype(np.int64)
+    market_cap = initial_price * shares_outstanding
 
+    pbr_min, pbr_max = constants.INITIAL_PBR_MULTIPLIER_RANGE
+    initial_pbr = rng.uniform(pbr_min, pbr_max, num_companies)
+    net_assets = np.where(initial_pbr > 0, market_cap / initial_pbr, market_cap)
+
+    founded_years = (start_year - rng.randint(5, 81, num_companies)).tolist()
+    next_earnings_weeks = rng.randint(1, 14, num_companies).tolist()
+    metadata_seeds = rng.randint(0, 2**31 - 1, num_companies).tolist()
+
+    first_row = market_engine.add_rows(initial_price, shares_outstanding, net_assets)
     for i in range(num_companies):
-        while True: 
-            ticker = _generate_random_ticker_symbol()
-            if ticker not in used_tickers:
-                used_tickers.add(ticker)
-                break
-        
-        name = _generate_random_company_name()
-        sector = random.choice(constants.STOCK_SECTORS)
-        founded_year = start_year - random.randint(5, 80)
-        
-        description = random.choice(constants.COMPANY_DESCRIPTION_TEMPLATES).format(
-            sector=sector, founded_year=founded_year
-        )
-        
-        num_shareholders = random.randint(3, 5)
-        shareholders = random.sample(constants.MAJOR_SHAREHOLDER_NAMES, num_shareholders)
-        major_shareholders = []
-        remaining_stake = 25.0 + random.uniform(-5.0, 5.0)
-        for j, sh_name in enumerate(shareholders):
-            if j == len(shareholders) - 1:
-                stake = remaining_stake
-            else:
-                stake = random.uniform(3.0, 7.0)
-            
-            if remaining_stake - stake < 0:
-                stake = remaining_stake
-            
-            major_shareholders.append({"name": sh_name, "stake": round(stake, 2)})
-            remaining_stake -= stake
-        
-        earnings_forecast = {
-            "sales_growth": round(random.uniform(-0.02, 0.10), 3),
-            "profit_growth": round(random.uniform(-0.05, 0.15), 3)
-        }
-        
-        chosen_tier_name = random.choices(tiers, weights=weights, k=1)[0]
-        tier_range = constants.MARKET_CAP_TIERS[chosen_tier_name]
-        market_cap = random.uniform(tier_range["min"], tier_range["max"])
-        market_cap = round(market_cap / 1_000_000) * 1_000_000
-
-        initial_price = random.uniform(constants.INITIAL_STOCK_PRICE_RANGE[0], constants.INITIAL_STOCK_PRICE_RANGE[1])
-        initial_price = max(1.0, round(initial_price))
-
-        shares_outstanding = max(1, int(round(market_cap / initial_price))) if initial_price > 0 else 0
-        market_cap = initial_price * shares_outstanding 
-
-        initial_pbr = random.uniform(constants.INITIAL_PBR_MULTIPLIER_RANGE[0], constants.INITIAL_PBR_MULTIPLIER_RANGE[1])
-
-        company = ListedCompany(
-            ticker_symbol=ticker, company_name=name, sector=sector,
-            initial_market_cap=market_cap, initial_price=initial_price,
-            shares_outstanding=shares_outstanding, founded_year=founded_year,
-            initial_pbr_multiplier=initial_pbr,
-            description=description,
-            major_shareholders=major_shareholders,
-            earnings_forecast=earnings_forecast
+        company = ListedCompany.from_engine_row(
+            ticker_symbol=ticker_allocator.allocate(), engine=market_engine, row=first_row + i,
+            founded_year=founded_years[i], metadata_seed=metadata_seeds[i],
+            next_earnings_announcement_week=next_earnings_weeks[i]
         )
-        listed_companies_on_market.append(company)
+        market_registry.add(company)
     
     print(f"{num_companies}社の一般上場企業が市場に生成されました。")
 
+def get_market_screener() -> MarketScreener:
+    """現在の市場に対応するスクリーナーを返す。市場が作り直された(ロードなど)場合は作り直す。"""
+    global _market_screener
+    if _market_screener is None or _market_screener.registry is not market_registry:
+        _market_screener = MarketScreener(market_registry)
+    return _market_screener
+
+def _register_dividend_accounts(player: Player) -> Dict[str, Any]:
+    """
+    プレイヤーの会社・個人ポートフォリオと競合他社のポートフォリオを配当の支払先として登録し(登録済みなら何もしない)、
+    ポートフォリオ -> 配当の受取先 の対応を返す。競合他社は名前が重複しうるため、ポートフォリオ自体で口座を区別する。
+    """
+    holders = market_registry.holders
+    payees = {player.company_portfolio: player.receive_company_dividend_income,
+              player.personal_portfolio: player.personal_assets.receive_dividend_income}
+
+    from systems import competitor_ai_system
+    for comp in competitor_ai_system.competitor_companies:
+        portfolio = getattr(comp, 'portfolio', None)
+        if portfolio is None:
+            continue
+        payees[portfolio] = comp.receive_dividend_income
+    for portfolio in payees:
+        if not holders.is_registered(portfolio):
+            holders.register(portfolio)
+    return payees
+
 def update_all_stock_prices_and_events(game_time: GameTime, player: Player):
     """市場に上場している全企業の株価とイベントを更新する。"""
-    if not listed_companies_on_market: return
+    if not market_registry: return
     
     current_economic_phase = game_time.current_economic_phase
-    for company in listed_companies_on_market:
+    
+    # 株価は子会社化された銘柄(自社株を除く)以外を一括で更新する
+    active_mask = ~market_engine.is_subsidiary
+    own_company = market_registry.get(player.ipo.company_ticker_symbol)
+    if own_company is not None:
+        active_mask[own_company.engine_row] = True
+    market_engine.advance_week(current_economic_phase, active_mask)
+    
+    # 決算・配当は予定表から今週期日を迎えた銘柄だけを取り出し、上場順に処理する
+    dividend_payees = _register_dividend_accounts(player)
+    dividend_payouts: List[tuple] = []
+    due_events: Dict[str, set] = {}
+    due_companies: Dict[str, ListedCompany] = {}
+    for kind, ticker, company in market_registry.calendar.pop_due(game_time.total_weeks_elapsed):
+        due_events.setdefault(ticker, set()).add(kind)
+        due_companies[ticker] = company
+    for company in sorted(due_companies.values(), key=lambda c: c.engine_row):
         if company.is_subsidiary and company.ticker_symbol != player.ipo.company_ticker_symbol:
             continue
-        
-        company.update_stock_price(current_economic_phase)
+
         company.process_earnings_announcement(game_time)
-        company.process_dividend_payment(player, game_time)
+        dividend_per_share = company.process_dividend_payment(game_time)
+        if dividend_per_share:
+            dividend_payouts.append((company.ticker_symbol, dividend_per_share))
+        if constants.EVENT_EARNINGS in due_events[company.ticker_symbol]:
+            company.schedule_events(market_registry.calendar)
+
+    # 配当は保有者索引を使い、実際に株を持っている口座だけにまとめて支払う
+    if dividend_payouts:
+        market_registry.holders.distribute_dividends(dividend_payouts, dividend_payees)
 
     from systems import competitor_ai_system
     if competitor_ai_system and competitor_ai_system.competitor_companies:
@@ -115,15 +140,72 @@ def update_all_stock_prices_and_events(game_time: GameTime, player: Player):
                 comp.update_stock_price(current_economic_phase)
                 comp.process_earnings_announcement(game_time)
 
+def format_screener_value(field: str, value: float) -> str:
+    if field in ("dividend_yield", "momentum", "volatility"):
+        return f"{value:.2%}"
+    if field in ("per", "pbr"):
+        return f"{value:.2f}倍"
+    if field == "rsi":
+        return f"{value:.1f}"
+    return f"¥{value:,.0f}"
+
 def show_market_overview():
-    """一般株式市場の概況(銘柄一覧など)を表示する"""
-    if not listed_companies_on_market:
+    """一般株式市場の概況(銘柄一覧)を、スクリーナーで絞り込み・並べ替えながらページ単位で表示する"""
+    if not market_registry:
         print("現在、市場に上場している企業はありません。")
         return
 
-    print("\n--- 一般株式市場 銘柄一覧 ---")
-    for i, company in enumerate(listed_companies_on_market):
-        print(f"  {i+1:<2}. {company.company_name} ({company.ticker_symbol}) - 株価: ¥{company.current_price:,.2f}")
+    screener = get_market_screener()
+    fields = list(constants.SCREENER_FIELD_LABELS)
+    page_size = constants.SCREENER_PAGE_SIZE
+    sort_by, descending, sector, ranges, page = "market_cap", True, None, {}, 0
+    while True:
+        companies, total = screener.query(sector=sector, ranges=ranges, sort_by=sort_by, descending=descending,
+                                          offset=page * page_size, limit=page_size)
+        num_pages = max(1, -(-total // page_size))
+        order_label = "降順" if descending else "昇順"
+        print(f"\n--- 一般株式市場 銘柄一覧 ({constants.SCREENER_FIELD_LABELS[sort_by]}{order_label} / "
+              f"{sector or '全セクター'} / {total:,}銘柄 / {page + 1}/{num_pages}ページ) ---")
+        for i, company in enumerate(companies):
+            value = format_screener_value(sort_by, screener.get_value(company, sort_by))
+            print(f"  {page * page_size + i + 1:>5}. {company.company_name} ({company.ticker_symbol}) "
+                  f"- 株価: ¥{company.current_price:,.2f} | {constants.SCREENER_FIELD_LABELS[sort_by]}: {value}")
+
+        command = input("n: 次へ / p: 前へ / s: 並べ替え / f: 絞り込み / Enter: 終了 > ").strip().lower()
+        if not command:
+            return
+        if command == "n" and page + 1 < num_pages:
+            page += 1
+        elif command == "p" and page > 0:
+            page -= 1
+        elif command == "s":
+            for i, field in enumerate(fields):
+                print(f"  {i+1}: {constants.SCREENER_FIELD_LABELS[field]}")
+            choice = utils.get_integer_input("並べ替える項目: ", 1, len(fields))
+            if choice:
+                sort_by = fields[choice - 1]
+                descending = input("降順で並べますか? (y/n): ").strip().lower() != "n"
+                page = 0
+        elif command == "f":
+            sectors = screener.get_sectors()
+            print("  0: 全セクター")
+            for i, (name, count) in enumerate(sectors):
+                print(f"  {i+1}: {name} ({count}銘柄)")
+            choice = utils.get_integer_input("セクター: ", 0, len(sectors))
+            if choice is not None:
+                sector = sectors[choice - 1][0] if choice > 0 else None
+            ranges = {}
+            for i, field in enumerate(fields):
+                print(f"  {i+1}: {constants.SCREENER_FIELD_LABELS[field]}")
+            choice = utils.get_integer_input("範囲で絞り込む項目 (0で指定なし): ", 0, len(fields))
+            if choice:
+                field = fields[choice - 1]
+                if field in ("dividend_yield", "momentum", "volatility"):
+                    print("  (割合で入力してください。例: 0.03 = 3%)")
+                low = utils.get_float_input("下限 (Enterで指定なし): ")
+                high = utils.get_float_input("上限 (Enterで指定なし): ")
+                ranges = {field: (low, high)}
+            page = 0
 
 def display_detailed_stock_info(company: ListedCompany):
     """企業の詳細情報を表示する"""
@@ -146,6 +228,14 @@ def display_detailed_stock_info(company: ListedCompany):
     print(f"  PBR (株価純資産倍率): {company.get_pbr_ratio():.2f}倍")
     print(f"  配当利回り (年率): {company.get_current_annual_dividend_yield_estimate()*100:.2f}%")
 
+    print("\n【テクニカル指標】")
+    ind = company.get_indicators()
+    short_weeks, long_weeks = company.engine.indicators.sma_windows
+    print(f"  移動平均: {short_weeks}週 ¥{ind['sma_short']:,.2f} / {long_weeks}週 ¥{ind['sma_long']:,.2f} | EMA ¥{ind['ema']:,.2f}")
+    print(f"  52週高値: ¥{ind['high']:,.2f} | 52週安値: ¥{ind['low']:,.2f}")
+    print(f"  ボラティリティ (年率): {ind['volatility']:.2%} | RSI: {ind['rsi']:.1f}")
+    print(f"  高値からの下落率: {ind['drawdown']:.2%} (最大 {ind['max_drawdown']:.2%})")
+
     print("\n【業績推移 (四半期)】")
     if not company.quarterly_results_history:
         print("  業績データがありません。")
@@ -237,7 +327,7 @@ def trade_stocks_menu(player: Player, game_time: GameTime):
     ticker_to_find = input("取引したい銘柄のティッカーシンボルを入力 (0で戻る): ").strip().upper()
     if not ticker_to_find or ticker_to_find == '0': return
     
-    selected_company = next((c for c in listed_companies_on_market if c.ticker_symbol == ticker_to_find), None)
+    selected_company = market_registry.get(ticker_to_find)
     if not selected_company:
         print("銘柄が見つかりません。"); return
         
@@ -289,10 +379,10 @@ def manage_margin_account(player: Player):
 
 def view_player_portfolio(player: Player):
     """プレイヤーの保有ポートフォリオを表示する"""
-    market_data = listed_companies_on_market
+    market_data = market_registry
     print(reporting_system.get_portfolio_summary(player, market_data))
 
-def handle_margin_call(player: Player, owner_type: str, shortfall: float, market_data: List[ListedCompany], game_time: GameTime):
+def handle_margin_call(player: Player, owner_type: str, shortfall: float, market_data: MarketRegistry, game_time: GameTime):
     """追証の処理を行う"""
     print("\n" + "!"*50)
     print(f"!!! 【緊急警告】追証が発生しました ({owner_type.capitalize()}) !!!")
@@ -325,48 +415,29 @@ def handle_margin_call(player: Player, owner_type: str, shortfall: float, market
         elif choice == 2:
             print("\n--- 強制決済を開始します ---")
             portfolio = player.company_portfolio if owner_type == "company" else player.personal_portfolio
-            
-            positions_to_liquidate = []
-            for ticker, holding in portfolio.general_stock_portfolio.items():
-                # 信用取引分と現物分を合わせて売却対象とする
-                total_shares = holding.get('cash_shares', 0) + holding.get('margin_shares', 0)
-                if total_shares > 0:
-                    company = next((c for c in market_data if c.ticker_symbol == ticker), None)
-                    if company:
-                        current_value = total_shares * company.current_price
-                        positions_to_liquidate.append({
-                            "ticker": ticker,
-                            "value": current_value,
-                            "shares": total_shares
-                        })
-            
-            positions_to_liquidate.sort(key=lambda x: x['value'], reverse=True)
+            cash_balance = player.finance.get_cash() if owner_type == "company" else float(player.personal_assets.money)
 
-            if not positions_to_liquidate:
+            # 不足額を解消できる最小限の一部売却・一部買い戻しを一度に計算し、まとめて決済する
+            plan = risk_system.plan_liquidation(portfolio, market_data, cash_balance, shortfall)
+            if not plan:
                 print("決済できるポジションがありません。破産のリスクがあります。")
                 break
 
-            for position in positions_to_liquidate:
-                ticker = position["ticker"]
-                shares_to_sell = position["shares"]
-                
-                company = next((c for c in market_data if c.ticker_symbol == ticker), None)
-                if not company: continue
-
-                print(f"  ポジション「{company.company_name}」({shares_to_sell}株)を強制的に売却します...")
-                player.sell_stock(owner_type, ticker, shares_to_sell, company.current_price)
-                
-                is_still_margin_call, new_shortfall = player.check_margin_call(owner_type, market_data)
-                if not is_still_margin_call:
-                    print("...追証は解消されました。")
-                    shortfall = 0 
-                    break
-                else:
-                    shortfall = new_shortfall
-                    print(f"  ...まだ不足しています。不足額: ¥{shortfall:,.0f}")
-            
-            if shortfall > 0:
-                print("全てのポジションを売却しましたが、追証を解消できませんでした。")
+            for order in plan:
+                company = lookup_company(market_data, order["ticker"])
+                name = company.company_name if company else order["ticker"]
+                action_label = "売却" if order["action"] == "sell" else "買い戻し"
+                print(f"  ポジション「{name}」を {order['shares']:,}株 強制的に{action_label}します (¥{order['price']:,.0f})")
+            risk_system.execute_liquidation_plan(
+                plan,
+                lambda ticker, shares, price: player.sell_stock(owner_type, ticker, shares, price),
+                lambda ticker, shares, price: player.buy_to_cover_short(owner_type, ticker, shares, price))
+
+            is_still_margin_call, shortfall = player.check_margin_call(owner_type, market_data)
+            if is_still_margin_call:
+                print(f"全ての決済を行いましたが、追証を解消できませんでした。不足額: ¥{shortfall:,.0f}")
+            else:
+                print("...追証は解消されました。")
             break
             
         is_still_margin_call, new_shortfall = player.check_margin_call(owner_type, market_data)
@@ -393,7 +464,7 @@ def show_general_stock_market_menu(player: Player, game_time: GameTime):
             show_market_overview()
             ticker = input("詳細を見たい銘柄のティッカーシンボルを入力 (Enterのみで戻る): ").strip().upper()
             if ticker:
-                company = next((c for c in listed_companies_on_market if c.ticker_symbol == ticker), None)
+                company = market_registry.get(ticker)
                 if company:
                     display_detailed_stock_info(company)
                 else:
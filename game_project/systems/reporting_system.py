@@ -168,8 +168,8 @@ def generate_company_financial_report(player: Player, market_data: Optional[List
     
     # --- 損益計算書 (P/L) ---
     report.append("\n" + "--- 損益計算書 (P/L) (累積) ".ljust(width-1) + "-")
-    sales = player.finance.finances.get('total_sales', 0)
-    costs = player.finance.finances.get('total_costs', 0)
+    sales = player.finance.get_total_sales()
+    costs = player.finance.get_total_costs()
     net_profit = sales - costs
     report.append(f"  総売上高:".ljust(25) + f"¥{sales:15,.0f}")
     report.append(f"  総費用:".ljust(25) + f"¥{costs:15,.0f}")
@@ -0,0 +1,240 @@
+# systems/risk_system.py
+# 全ての信用取引口座(プレイヤーの会社・個人、全競合他社)の維持率を、毎週まとめて評価するシステム。
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.player import Player
+from models.game_time import GameTime
+from models.portfolio import Portfolio
+from models.market_registry import MarketRegistry
+import constants
+
+# (口座名, 口座の種類, ポートフォリオ, 現金残高, 口座の持ち主)
+# 競合他社は名前が重複しうるため、持ち主はオブジェクトそのものを持つ
+MarginAccount = Tuple[str, str, Portfolio, float, Any]
+
+# --- モジュールレベル変数 ---
+last_account_risks: List[Dict[str, Any]] = [] # 直近の評価結果(信用取引口座ごと)
+margin_call_events: List[Dict[str, Any]] = [] # 直近の週に発生した追証
+
+# --- 口座の収集 ---
+def collect_margin_accounts(player: Player) -> List[MarginAccount]:
+    """信用取引の建玉(信用買い・空売り)がある口座を全て集める。"""
+    from systems import competitor_ai_system
+    accounts: List[MarginAccount] = [
+        ("company", "company", player.company_portfolio, player.finance.get_cash(), player),
+        ("personal", "personal", player.personal_portfolio, float(player.personal_assets.money), player),
+    ]
+    for comp in competitor_ai_system.competitor_companies:
+        portfolio = getattr(comp, 'portfolio', None)
+        if portfolio is not None:
+            accounts.append((comp.name, "competitor", portfolio, comp.cash, comp))
+    return [a for a in accounts if a[2].margin_loan > 0 or a[2].short_positions]
+
+# --- 一括評価 ---
+def evaluate_margin_accounts(accounts: List[MarginAccount], registry: MarketRegistry,
+                             shocks: Tuple[float, ...] = constants.RISK_STRESS_SHOCKS) -> List[Dict[str, Any]]:
+    """
+    全口座の建玉を1本の配列に連結し、株価配列から評価額・純資産・必要維持額・不足額を一度に計算する。
+    shocks に指定した一律の株価変動(例: -10%, -30%)を与えたときの純資産と不足額も同じ計算で求める。
+    計算式は Portfolio.check_margin_call と同じ。
+    """
+    if not accounts:
+        return []
+    n = len(accounts)
+    long_index, long_rows, long_shares = [], [], []
+    short_index, short_rows, short_shares = [], [], []
+    cash = np.empty(n, dtype=np.float64)
+    margin_loan = np.empty(n, dtype=np.float64)
+    short_proceeds = np.empty(n, dtype=np.float64)
+    for i, (_, _, portfolio, cash_balance, _) in enumerate(accounts):
+        l_rows, l_shares, s_rows, s_shares, proceeds = portfolio.get_margin_position_arrays(registry)
+        long_index.append(np.full(len(l_rows), i, dtype=np.int64))
+        long_rows.append(l_rows)
+        long_shares.append(l_shares)
+        short_index.append(np.full(len(s_rows), i, dtype=np.int64))
+        short_rows.append(s_rows)
+        short_shares.append(s_shares)
+        cash[i] = cash_balance
+        margin_loan[i] = portfolio.margin_loan
+        short_proceeds[i] = proceeds
+
+    price = registry.engine.price
+    long_value = np.bincount(np.concatenate(long_index),
+                             weights=np.concatenate(long_shares) * price[np.concatenate(long_rows)], minlength=n)
+    short_value = np.bincount(np.concatenate(short_index),
+                              weights=np.concatenate(short_shares) * price[np.concatenate(short_rows)], minlength=n)
+
+    ratio = constants.MAINTENANCE_MARGIN_REQUIREMENT_RATIO
+    def _equity_and_shortfall(scale: float):
+        equity = cash + long_value * scale + short_proceeds - margin_loan - short_value * scale
+        required = (long_value + short_value) * scale * ratio
+        return equity, required, np.maximum(0.0, required - equity)
+
+    equity, required, shortfall = _equity_and_shortfall(1.0)
+    stressed = {shock: _equity_and_shortfall(1.0 + shock) for shock in shocks}
+
+    results = []
+    for i, (owner, owner_type, portfolio, _, holder) in enumerate(accounts):
+        results.append({
+            "owner": owner,
+            "owner_type": owner_type,
+            "holder": holder,
+            "portfolio": portfolio,
+            "equity": float(equity[i]),
+            "maintenance_required": float(required[i]),
+            "shortfall": float(shortfall[i]),
+            "is_margin_call": bool(equity[i] < required[i]),
+            "stress": {shock: {"equity": float(s_equity[i]), "shortfall": float(s_shortfall[i])}
+                       for shock, (s_equity, _, s_shortfall) in stressed.items()},
+        })
+    return results
+
+# --- 週次処理 ---
+def run_weekly_risk_check(player: Player, game_time: GameTime, registry: MarketRegistry) -> List[Dict[str, Any]]:
+    """全信用取引口座を評価し、追証が発生した口座のイベントを返す。tick_system から毎週呼ばれる。"""
+    margin_call_events.clear()
+    if not isinstance(registry, MarketRegistry) or registry.engine is None:
+        last_account_risks[:] = []
+        return margin_call_events
+    last_account_risks[:] = evaluate_margin_accounts(collect_margin_accounts(player), registry)
+    for risk in last_account_risks:
+        if not risk["is_margin_call"]:
+            continue
+        event = {"week": game_time.total_weeks_elapsed, "owner": risk["owner"],
+                 "owner_type": risk["owner_type"], "shortfall": risk["shortfall"]}
+        margin_call_events.append(event)
+        print(f"  [追証] {risk['owner']} の信用取引口座で追証が発生しました。不足金額: ¥{risk['shortfall']:,.0f}")
+        if risk["owner_type"] == "competitor":
+            _liquidate_competitor(risk, registry)
+    return margin_call_events
+
+def _liquidate_competitor(risk: Dict[str, Any], registry: MarketRegistry):
+    """競合他社の追証は、決済計画に従ってその場で強制決済する。"""
+    comp = risk["holder"]
+    plan = plan_liquidation(comp.portfolio, registry, comp.cash, risk["shortfall"])
+    executed = execute_liquidation_plan(plan, comp.sell_stock, comp.buy_to_cover_short)
+    if executed:
+        print(f"  [AI] {comp.name} が追証のため {executed} 件のポジションを強制決済しました。")
+
+def get_player_margin_calls() -> List[Dict[str, Any]]:
+    """直近の週に発生した、プレイヤー(会社・個人)の追証を返す。"""
+    return [e for e in margin_call_events if e["owner_type"] in ("company", "personal")]
+
+def get_account_risk(owner: str) -> Optional[Dict[str, Any]]:
+    return next((r for r in last_account_risks if r["owner"] == owner), None)
+
+# --- 強制決済の計画 ---
+def plan_liquidation(portfolio: Portfolio, registry: MarketRegistry, cash_balance: float,
+                     shortfall: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    追証の不足額を解消するのに必要な最小限の決済(一部売却・一部買い戻し)を一度の計算で求める。
+    1株あたりの改善額(純資産 - 必要維持額 の増加分)を評価額で割った効率の高い順に決済する。
+      - 信用買い株の売却: 借入の返済分 + 必要維持額の減少分 (Portfolio.sell_stock は信用分から先に売る)
+      - 現物株の売却: 売却代金がそのまま純資産に加わる
+      - 空売りの買い戻し: 必要維持額の減少分 - 売建代金 (改善する場合のみ対象)
+    戻り値は {"action": "sell" / "cover", "ticker", "shares", "price"} のリスト。
+    """
+    ratio = constants.MAINTENANCE_MARGIN_REQUIREMENT_RATIO
+    if shortfall is None:
+        shortfall = portfolio.check_margin_call(registry, cash_balance)[1]
+    if shortfall <= 0:
+        return []
+
+    # 決済単位: [効率, 1株あたり改善額, 1株あたり評価額, 銘柄, 株数, 種類, 株価, 同じ銘柄の前の単位]
+    segments = []
+    for ticker, data in portfolio.general_stock_portfolio.items():
+        company = registry.get(ticker)
+        if company is None or company.current_price <= 0:
+            continue
+        price = company.current_price
+        parts = []
+        margin_shares = data.get('margin_shares', 0)
+        if margin_shares > 0:
+            repayment = portfolio.preview_margin_repayment(ticker, margin_shares) / margin_shares
+            gain = repayment + ratio * price
+            parts.append([gain, price, margin_shares])
+        cash_shares = data.get('cash_shares', 0)
+        if cash_shares > 0:
+            parts.append([price, price, cash_shares])
+        # 信用分を売り切らないと現物分は売れないため、後ろの方が効率が良ければ1つの単位にまとめる
+        if len(parts) == 2 and parts[1][0] / parts[1][1] > parts[0][0] / parts[0][1]:
+            total_shares = parts[0][2] + parts[1][2]
+            gain = (parts[0][0] * parts[0][2] + parts[1][0] * parts[1][2]) / total_shares
+            parts = [[gain, price, total_shares]]
+        for gain, value, shares in parts:
+            segments.append((gain / value, gain, value, ticker, shares, "sell", price))
+    for ticker, data in portfolio.short_positions.items():
+        company = registry.get(ticker)
+        if company is None:
+            continue
+        price = company.current_price
+        gain = ratio * price - data['sell_price']
+        if gain > 0 and price > 0:
+            segments.append((gain / price, gain, price, ticker, data['shares'], "cover", price))
+    segments.sort(key=lambda s: s[0], reverse=True)
+
+    plan: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    used = [0] * len(segments)
+    index = 0
+    remaining = shortfall
+    while remaining > 0 and index < len(segments):
+        # 見積もりで必要株数を決め、最後に実際の計算式で確かめる(借入残高の上限や端数で足りなければ続きを決済する)
+        while remaining > 0 and index < len(segments):
+            _, gain, _, ticker, shares, action, price = segments[index]
+            take = min(shares - used[index], max(1, int(np.ceil(remaining / gain))))
+            used[index] += take
+            order = plan.setdefault((action, ticker), {"action": action, "ticker": ticker, "shares": 0, "price": price})
+            order["shares"] += take
+            remaining -= gain * take
+            if used[index] >= shares:
+                index += 1
+        remaining = _shortfall_after(portfolio, registry, cash_balance, list(plan.values()))
+    return list(plan.values())
+
+def _shortfall_after(portfolio: Portfolio, registry: MarketRegistry, cash_balance: float,
+                     orders: List[Dict[str, Any]]) -> float:
+    """orders を実行した後の不足額を、Portfolio.check_margin_call と同じ式で計算する(実際には決済しない)。"""
+    cash = cash_balance
+    loan = portfolio.margin_loan
+    sold = {o["ticker"]: o["shares"] for o in orders if o["action"] == "sell"}
+    covered = {o["ticker"]: o["shares"] for o in orders if o["action"] == "cover"}
+
+    margin_long_value = 0.0
+    for ticker, data in portfolio.general_stock_portfolio.items():
+        company = registry.get(ticker)
+        margin_shares = data.get('margin_shares', 0)
+        shares_sold = sold.get(ticker, 0)
+        if shares_sold and company is not None:
+            margin_sold = min(shares_sold, margin_shares)
+            loan -= min(loan, portfolio.preview_margin_repayment(ticker, margin_sold))
+            cash += shares_sold * company.current_price
+            margin_shares -= margin_sold
+        if margin_shares > 0 and company is not None:
+            margin_long_value += margin_shares * company.current_price
+
+    short_value = 0.0
+    short_proceeds = 0.0
+    for ticker, data in portfolio.short_positions.items():
+        company = registry.get(ticker)
+        shares = data['shares'] - covered.get(ticker, 0)
+        if covered.get(ticker) and company is not None:
+            cash -= covered[ticker] * company.current_price
+        if company is not None:
+            short_value += shares * company.current_price
+        short_proceeds += shares * data['sell_price']
+
+    equity = cash + margin_long_value + short_proceeds - loan - short_value
+    required = (margin_long_value + short_value) * constants.MAINTENANCE_MARGIN_REQUIREMENT_RATIO
+    return max(0.0, required - equity)
+
+def execute_liquidation_plan(plan: List[Dict[str, Any]], sell: Callable[[str, int, float], bool],
+                             cover: Callable[[str, int, float], bool]) -> int:
+    """決済計画をまとめて実行する(売却を先に行い、得た現金で買い戻す)。実行できた注文数を返す。"""
+    executed = 0
+    for order in sorted(plan, key=lambda o: o["action"] != "sell"):
+        handler = sell if order["action"] == "sell" else cover
+        if handler(order["ticker"], order["shares"], order["price"]):
+            executed += 1
+    return executed
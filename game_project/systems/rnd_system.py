@@ -56,7 +56,7 @@ def start_new_project(player: Player, project_data: Dict[str, Any]):
         "points_accrued": 0,
         "is_permanent": False,
     }
-    player.effects.active_rnd_bonuses[project_id] = in_progress_data
+    player.effects.start_rnd_project(project_id, in_progress_data)
 
     console.hud_alert(f"R&Dプロジェクト「{project_data['name']}」を開始しました。", 'success', 2)
 
@@ -138,8 +138,6 @@ def allocate_funding_to_project_from_ui(player: Player, project_id: str, funding
     
     if project['points_accrued'] >= project.get('research_points_needed', float('inf')):
         console.hud_alert(f"🎉 プロジェクト「{project['name']}」の研究が完了しました!", 'success', 2.5)
-        player.effects.add_completed_rnd_project(project_id, project.get("bonus_effects", []))
-        if project_id in player.effects.active_rnd_bonuses:
-            del player.effects.active_rnd_bonuses[project_id]
+        player.effects.complete_rnd_project(project_id, project.get("bonus_effects", []))
             
     return True
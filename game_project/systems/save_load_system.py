@@ -1,37 +1,276 @@
 # systems/save_load_system.py
 # 省略なしの完全なコードです。
+#
+# セーブファイルの形式 (バージョン2以降):
+#   [マジック 8バイト][バージョン uint16][ヘッダ長 uint32][ヘッダ(JSON)][セクション本体...]
+# ヘッダには保存時の日付などのメタ情報と、セクションごとの名前・圧縮方式・位置・長さを記録する。
+# 各セクションは1つの Pickler で順に書き出すため、セクションをまたいだ同一オブジェクトの参照は保たれる。
+# その代わり各セクションは単独では展開できないため、読み込み時は全セクションを先頭から順に展開する。
+# (ヘッダのメタ情報・セクションの大きさは本体を展開せずに読める)
+# マジックが無いファイルはバージョン1(辞書をそのまま pickle した旧形式)として読み込み、移行処理を通す。
 
-import pickle
+import collections.abc
+import io
+import json
 import os
-from typing import Dict, Any
+import pickle
+import random
+import struct
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import zstandard # 任意。インストールされていれば zstd で圧縮する
+except ImportError:
+    zstandard = None
 
 # --- グローバル変数 ---
 SAVE_FILE_NAME = "savegame.dat"
+SAVE_FORMAT_VERSION = 2
+SAVE_MAGIC = b"RAMENSAV"
+_HEADER_STRUCT = struct.Struct("<HI") # バージョン, ヘッダ長
+
+CODEC_NONE = "none"
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+
+# 保存するセクションの順番(ヘッダの目次の順)。一覧にないセクションはこの後ろに続ける
+SAVE_SECTIONS: List[str] = [
+    'game_time', 'rng_state', 'listed_companies', 'competitors', 'real_estate_market',
+    'venture_deals', 'game_regions', 'cxo_market', 'private_ma_market', 'player',
+]
+
+# --- 圧縮 ---
+def _default_codec() -> str:
+    return CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, 6)
+    return data
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("このセーブデータの読み込みには zstandard モジュールが必要です。")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    return data
+
+# --- 書き込み ---
+def write_save_file(path: str, game_state: Dict[str, Any], meta: Optional[Dict[str, Any]] = None,
+                    codec: Optional[str] = None):
+    """game_state をセクションごとに圧縮してファイルへ書き出す。"""
+    codec = codec or _default_codec()
+    names = [name for name in SAVE_SECTIONS if name in game_state]
+    names += [name for name in game_state if name not in SAVE_SECTIONS]
+
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+    sections = []
+    bodies = []
+    offset = 0
+    for name in names:
+        pickler.dump(game_state[name]) # 同じ Pickler を使い続け、メモ(参照の共有)を保つ
+        raw = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        body = _compress(raw, codec)
+        sections.append({"name": name, "codec": codec, "offset": offset, "length": len(body), "raw_length": len(raw)})
+        bodies.append(body)
+        offset += len(body)
+
+    header = json.dumps({"version": SAVE_FORMAT_VERSION, "meta": meta or {}, "sections": sections},
+                        ensure_ascii=False).encode('utf-8')
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(SAVE_MAGIC)
+        f.write(_HEADER_STRUCT.pack(SAVE_FORMAT_VERSION, len(header)))
+        f.write(header)
+        for body in bodies:
+            f.write(body)
+    os.replace(tmp_path, path) # 書き込み途中で失敗しても既存のセーブを壊さない
+
+# --- 読み込み ---
+class SaveGame(collections.abc.Mapping):
+    """
+    バージョン2形式のセーブファイル。辞書と同じように ['player'] や .get() で各セクションを取り出せる。
+    開いた時点ではヘッダだけを読み、いずれかのセクションが最初に参照されたときに全セクションをまとめて展開する。
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(SAVE_MAGIC)) != SAVE_MAGIC:
+                raise ValueError(f"'{path}' はバージョン2以降のセーブファイルではありません。")
+            self.version, header_length = _HEADER_STRUCT.unpack(f.read(_HEADER_STRUCT.size))
+            header = json.loads(f.read(header_length).decode('utf-8'))
+            self._body_start = f.tell()
+        if self.version > SAVE_FORMAT_VERSION:
+            raise ValueError(f"新しいバージョン({self.version})のセーブデータは読み込めません。")
+        self.meta: Dict[str, Any] = header.get("meta", {})
+        self._sections: List[Dict[str, Any]] = header["sections"]
+        self._index: Dict[str, int] = {s["name"]: i for i, s in enumerate(self._sections)}
+        self._values: Optional[Dict[str, Any]] = None
+
+    def _load_all(self):
+        """全セクションを展開する。セクション間で参照を共有しているため、書き出しと同じく1つの Unpickler で順に読む。"""
+        stream = io.BytesIO()
+        with open(self.path, 'rb') as f:
+            for section in self._sections:
+                f.seek(self._body_start + section["offset"])
+                stream.write(_decompress(f.read(section["length"]), section["codec"]))
+        stream.seek(0)
+        unpickler = pickle.Unpickler(stream)
+        self._values = {section["name"]: unpickler.load() for section in self._sections}
 
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._index:
+            raise KeyError(key)
+        if self._values is None:
+            self._load_all()
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    def section_sizes(self) -> Dict[str, int]:
+        """セクションごとの圧縮後のバイト数を返す。"""
+        return {s["name"]: s["length"] for s in self._sections}
+
+
+# --- 旧形式からの移行 ---
+def _migrate_v1_to_v2(game_state: Dict[str, Any]) -> Dict[str, Any]:
+    """player と game_time だけの旧形式に、不足しているセクションの既定値を補う。"""
+    from models.market_registry import MarketRegistry
+    state = dict(game_state)
+    listed_companies = state.get('listed_companies', [])
+    if not isinstance(listed_companies, MarketRegistry):
+        state['listed_companies'] = MarketRegistry(listed_companies)
+    state.setdefault('competitors', [])
+    state.setdefault('real_estate_market', [])
+    state.setdefault('venture_deals', [])
+    state.setdefault('game_regions', [])
+    return state
+
+# バージョン -> 次のバージョンへ移行する関数
+MIGRATIONS: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    1: _migrate_v1_to_v2,
+}
+
+def migrate_game_state(game_state: Dict[str, Any], from_version: int) -> Dict[str, Any]:
+    version = from_version
+    while version < SAVE_FORMAT_VERSION:
+        game_state = MIGRATIONS[version](game_state)
+        version += 1
+    return game_state
+
+def read_save_file(path: str) -> collections.abc.Mapping:
+    """セーブファイルを開く。旧形式の場合は読み込んで最新形式へ移行した辞書を返す。"""
+    with open(path, 'rb') as f:
+        magic = f.read(len(SAVE_MAGIC))
+    if magic == SAVE_MAGIC:
+        return SaveGame(path)
+    with open(path, 'rb') as f:
+        game_state = pickle.load(f)
+    return migrate_game_state(game_state, 1)
+
+# --- ゲーム全体の状態の収集と復元 ---
+def build_game_state(player, game_time) -> Dict[str, Any]:
+    """プレイヤーと各システムのモジュール変数から、保存するゲーム状態をまとめる。"""
+    from systems import (
+        general_stock_market_system, competitor_ai_system, real_estate_system, venture_system,
+        map_system, hr_system, acquisition_system
+    )
+    return {
+        'game_time': game_time,
+        'rng_state': random.getstate(),
+        'listed_companies': general_stock_market_system.market_registry,
+        'competitors': competitor_ai_system.competitor_companies,
+        'real_estate_market': real_estate_system.properties_on_market,
+        'venture_deals': {
+            'deals': venture_system.available_venture_deals,
+            'last_refresh_week': venture_system.last_venture_market_refresh_week,
+        },
+        'game_regions': map_system.game_regions,
+        'cxo_market': {
+            'candidates': hr_system.available_cxo_candidates,
+            'last_refresh_week': hr_system.last_cxo_market_refresh_week,
+        },
+        'private_ma_market': {
+            'companies': acquisition_system.private_companies_for_sale,
+            'last_refresh_week': acquisition_system.last_private_ma_market_refresh_week,
+        },
+        'player': player,
+    }
+
+def restore_game_state(game_state: collections.abc.Mapping):
+    """ロードしたゲーム状態を各システムのモジュール変数に戻し、(player, game_time) を返す。"""
+    from systems import (
+        general_stock_market_system, competitor_ai_system, real_estate_system, venture_system,
+        map_system, hr_system, acquisition_system
+    )
+    player = game_state.get('player')
+    game_time = game_state.get('game_time')
+
+    registry = game_state.get('listed_companies')
+    general_stock_market_system.market_registry = registry
+    general_stock_market_system.market_engine = registry.engine
+    competitor_ai_system.competitor_companies = game_state.get('competitors', [])
+    real_estate_system.properties_on_market = game_state.get('real_estate_market', [])
+    map_system.game_regions = game_state.get('game_regions', [])
+
+    venture_deals = game_state.get('venture_deals', [])
+    if isinstance(venture_deals, dict):
+        venture_system.available_venture_deals = venture_deals.get('deals', [])
+        venture_system.last_venture_market_refresh_week = venture_deals.get('last_refresh_week', venture_system.last_venture_market_refresh_week)
+    else:
+        venture_system.available_venture_deals = venture_deals
+    cxo_market = game_state.get('cxo_market')
+    if cxo_market:
+        hr_system.available_cxo_candidates = cxo_market.get('candidates', [])
+        hr_system.last_cxo_market_refresh_week = cxo_market.get('last_refresh_week', hr_system.last_cxo_market_refresh_week)
+    ma_market = game_state.get('private_ma_market')
+    if ma_market:
+        acquisition_system.private_companies_for_sale = ma_market.get('companies', [])
+        acquisition_system.last_private_ma_market_refresh_week = ma_market.get('last_refresh_week', acquisition_system.last_private_ma_market_refresh_week)
+    rng_state = game_state.get('rng_state')
+    if rng_state is not None:
+        random.setstate(rng_state)
+    return player, game_time
+
+# --- 保存・読み込み ---
 def save_game(game_state: Dict[str, Any]):
     """
     現在のゲーム状態をファイルに保存する。
     """
     try:
-        with open(SAVE_FILE_NAME, 'wb') as f: # 'wb'はバイナリ書き込みモード
-            pickle.dump(game_state, f)
+        game_time = game_state.get('game_time')
+        meta = {}
+        if game_time is not None:
+            meta = {"week": game_time.total_weeks_elapsed, "date": game_time.get_date_string()}
+        write_save_file(SAVE_FILE_NAME, game_state, meta)
         print(f"\n[システム] ゲームの状態を '{SAVE_FILE_NAME}' に保存しました。")
         return True
     except Exception as e:
         print(f"\n[エラー] ゲームの保存に失敗しました: {e}")
         return False
 
-def load_game() -> Dict[str, Any] | None:
+def load_game() -> collections.abc.Mapping | None:
     """
-    ファイルからゲーム状態を読み込む。
+    ファイルからゲーム状態を読み込む。セクションは最初に参照されたときにまとめて展開される。
     """
     if not os.path.exists(SAVE_FILE_NAME):
         print(f"\n[システム] セーブファイル '{SAVE_FILE_NAME}' が見つかりません。")
         return None
-        
+
     try:
-        with open(SAVE_FILE_NAME, 'rb') as f: # 'rb'はバイナリ読み込みモード
-            game_state = pickle.load(f)
+        game_state = read_save_file(SAVE_FILE_NAME)
         print(f"\n[システム] '{SAVE_FILE_NAME}' からゲームの状態を読み込みました。")
         return game_state
     except Exception as e:
@@ -1,7 +1,6 @@
 # systems/shop_system.py (修正版)
 import random
 from typing import Optional
-import console
 
 from models.player import Player
 from models.game_time import GameTime
@@ -183,6 +182,7 @@ def manage_menu(player: Player):
                 
 def open_new_shop_from_ui(player: Player, region: Region, point: MapPoint, shop_name: str, initial_capital: int) -> Optional['BusinessUnit']:
     """UIからの情報に基づいて新規店舗を開店する"""
+    import console # Pythonista専用モジュールのため、UIから呼ばれた時にのみ読み込む
     
     try:
         selected_location = next(loc for loc in constants.map_master_data.REGIONS_MASTER if loc['name'] == region.name)
@@ -0,0 +1,110 @@
+# systems/simulation_system.py
+import contextlib
+import random
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from models.player import Player
+from models.game_time import GameTime
+import constants
+import profiler
+from systems import (
+    general_stock_market_system, competitor_ai_system, hr_system, map_system, tick_system
+)
+
+# print の出力を1行ずつ受け取るコールバック
+EventSink = Callable[[str], None]
+
+class _EventSinkWriter:
+    """sys.stdout の代わりに使うライター。改行ごとに event_sink へ渡し、sink が無ければ捨てる。"""
+    def __init__(self, event_sink: Optional[EventSink]):
+        self.event_sink = event_sink
+        self._pending: str = ""
+
+    def write(self, text: str) -> int:
+        if self.event_sink is not None:
+            self._pending += text
+            while "\n" in self._pending:
+                line, self._pending = self._pending.split("\n", 1)
+                if line:
+                    self.event_sink(line)
+        return len(text)
+
+    def flush(self):
+        if self.event_sink is not None and self._pending:
+            self.event_sink(self._pending)
+        self._pending = ""
+
+
+# --- ワールドの構築 ---
+def build_world(config: Optional[Dict[str, Any]] = None) -> Tuple[Player, GameTime]:
+    """
+    input() や console を使わずに、プレイヤー・時間・株式市場・競合・マップを初期化する。
+    main.initialize_game の対話部分を config の値で置き換えたもの。
+    """
+    settings = dict(constants.SIMULATION_DEFAULT_CONFIG)
+    if config:
+        settings.update(config)
+
+    player = Player(settings["company_name"], constants.INITIAL_PERSONAL_MONEY, constants.INITIAL_COMPANY_MONEY)
+    game_time = GameTime(*settings["start_date"])
+
+    general_stock_market_system.initialize_general_stock_market(settings["num_listed_companies"], game_time.current_year)
+    competitor_ai_system.initialize_competitors(settings["num_competitors"], settings["difficulty"], game_time)
+    hr_system.refresh_cxo_candidate_market(game_time)
+    map_system.initialize_map()
+    return player, game_time
+
+# --- 週次処理 ---
+def advance_week(player: Player, game_time: GameTime) -> Optional[str]:
+    """1週分の処理を行う。ゲームオーバー時に'GAME_OVER'を返す。"""
+    result = tick_system.run_weekly_tick(player, game_time)
+    if result == 'GAME_OVER':
+        print(f"[ゲームオーバー] 会社の現金が ¥{player.finance.get_cash():,.0f} となり、倒産しました。")
+    return result
+
+def simulate(weeks: int, seed: Optional[int] = None, config: Optional[Dict[str, Any]] = None,
+             event_sink: Optional[EventSink] = None) -> Dict[str, Any]:
+    """
+    ヘッドレスで N 週分のシミュレーションを実行する。
+    バランス調整・回帰確認・処理速度の計測に使う。print の出力は event_sink に渡される(省略時は破棄)。
+    """
+    if seed is not None:
+        random.seed(seed)
+    settings = dict(constants.SIMULATION_DEFAULT_CONFIG)
+    if config:
+        settings.update(config)
+
+    writer = _EventSinkWriter(event_sink)
+    weeks_simulated = 0
+    game_over = False
+    if settings["profile"]:
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(writer):
+            player, game_time = build_world(settings)
+            for _ in range(weeks):
+                result = advance_week(player, game_time)
+                weeks_simulated += 1
+                if result == 'GAME_OVER':
+                    game_over = True
+                    if settings["stop_on_game_over"]:
+                        break
+            writer.flush()
+    finally:
+        # 途中で例外が起きても計測(cProfile・tracemalloc)を有効なまま残さない
+        if settings["profile"]:
+            profiler.disable()
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "player": player,
+        "game_time": game_time,
+        "weeks_simulated": weeks_simulated,
+        "game_over": game_over,
+        "elapsed_seconds": elapsed,
+    }
+    if settings["profile"]:
+        result["profile_report"] = profiler.get_report()
+    return result
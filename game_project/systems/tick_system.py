@@ -0,0 +1,134 @@
+# systems/tick_system.py
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models.player import Player
+from models.game_time import GameTime
+from systems import general_stock_market_system, competitor_ai_system, risk_system
+import profiler
+
+# 週次処理の1フェーズ。'GAME_OVER' などを返すと、その週の残りのフェーズを打ち切る
+TickPhase = Callable[[Player, GameTime], Optional[str]]
+
+# --- モジュールレベル変数 ---
+weekly_phases: List[Tuple[str, TickPhase]] = [] # 実行順に並んだ (フェーズ名, 処理)
+last_phase_timings: Dict[str, float] = {} # 直近の週の各フェーズの所要時間(秒)
+total_phase_timings: Dict[str, float] = {} # 累積の所要時間(秒)
+ticks_run: int = 0
+
+# --- フェーズの登録 ---
+def register_phase(name: str, phase: TickPhase, before: Optional[str] = None, after: Optional[str] = None):
+    """週次処理にフェーズを登録する。before / after で既存フェーズとの前後関係を指定できる。"""
+    if any(n == name for n, _ in weekly_phases):
+        raise ValueError(f"Tick phase '{name}' is already registered.")
+    names = [n for n, _ in weekly_phases]
+    if before is not None:
+        index = names.index(before)
+    elif after is not None:
+        index = names.index(after) + 1
+    else:
+        index = len(weekly_phases)
+    weekly_phases.insert(index, (name, phase))
+
+def unregister_phase(name: str):
+    weekly_phases[:] = [(n, p) for n, p in weekly_phases if n != name]
+
+def get_phase_names() -> List[str]:
+    return [n for n, _ in weekly_phases]
+
+# --- 週次処理の実行 ---
+def run_weekly_tick(player: Player, game_time: GameTime) -> Optional[str]:
+    """
+    時間を1週進め、登録された全フェーズを順に実行する。CUI・UI・ヘッドレス実行の共通入口。
+    会社の現金がマイナスになった場合は 'GAME_OVER' を返す。
+    """
+    global ticks_run
+    game_time.advance_week()
+    player.finance.begin_week(game_time.total_weeks_elapsed)
+    last_phase_timings.clear()
+
+    result = None
+    for name, phase in weekly_phases:
+        start = time.perf_counter()
+        with profiler.section(name):
+            result = phase(player, game_time)
+        elapsed = time.perf_counter() - start
+        last_phase_timings[name] = elapsed
+        total_phase_timings[name] = total_phase_timings.get(name, 0.0) + elapsed
+        if result is not None:
+            break
+    ticks_run += 1
+    profiler.end_tick()
+
+    if result is None and player.finance.get_cash() < 0:
+        result = 'GAME_OVER'
+    return result
+
+def reset_phase_timings():
+    global ticks_run
+    last_phase_timings.clear()
+    total_phase_timings.clear()
+    ticks_run = 0
+
+def get_timing_report() -> str:
+    """フェーズごとの累積・平均所要時間を文字列で返す。"""
+    lines = [f"--- 週次処理のフェーズ別所要時間 ({ticks_run}週) ---"]
+    total = sum(total_phase_timings.values())
+    for name in get_phase_names():
+        elapsed = total_phase_timings.get(name, 0.0)
+        share = elapsed / total if total > 0 else 0.0
+        average_ms = elapsed / ticks_run * 1000 if ticks_run > 0 else 0.0
+        lines.append(f"  {name:<12} 合計 {elapsed:8.3f}秒 / 平均 {average_ms:7.3f}ms ({share:.1%})")
+    return "\n".join(lines)
+
+# --- 標準フェーズ ---
+def _market_phase(player: Player, game_time: GameTime) -> Optional[str]:
+    """一般市場の株価・決算・配当を更新する。"""
+    general_stock_market_system.update_all_stock_prices_and_events(game_time, player)
+    return None
+
+def _competition_phase(player: Player, game_time: GameTime) -> Optional[str]:
+    """全店舗の集客力を計算して顧客を配分し、競合他社の決算と行動を処理する。"""
+    with profiler.section("customer_allocation"):
+        player.ops.prepare_all_for_competition(player)
+        competitor_ai_system.prepare_all_for_competition()
+        competitor_ai_system.run_market_simulation_and_allocate_sales(player)
+    with profiler.section("competitors"):
+        competitor_ai_system.finalize_all_competitor_finances()
+        competitor_ai_system.process_weekly_competitor_actions(player, game_time, general_stock_market_system.market_registry)
+    return None
+
+def _finance_phase(player: Player, game_time: GameTime) -> Optional[str]:
+    """プレイヤーの店舗決算・キャッシュフロー・個人資産・社債償還などを処理する。"""
+    player.process_weekly_finances(game_time, general_stock_market_system.market_registry)
+    return None
+
+def _effects_phase(player: Player, game_time: GameTime) -> Optional[str]:
+    """R&Dボーナス・M&Aシナジーを適用し、期限切れの効果を削除する。"""
+    player.process_weekly_effects()
+    return None
+
+def _risk_phase(player: Player, game_time: GameTime) -> Optional[str]:
+    """全ての信用取引口座の維持率をまとめて評価し、追証を検出する。"""
+    risk_system.run_weekly_risk_check(player, game_time, general_stock_market_system.market_registry)
+    return None
+
+def _kpi_phase(player: Player, game_time: GameTime) -> Optional[str]:
+    """会社の財務KPIを週次の履歴に記録し、直近1年の推定売上・利益を更新する。"""
+    player.finance.record_financial_snapshot(game_time, player)
+    return None
+
+def _quarterly_phase(player: Player, game_time: GameTime) -> Optional[str]:
+    """四半期末であればプレイヤーと競合他社の格付けを更新する。"""
+    if game_time.is_quarter_end():
+        player.process_quarterly_updates(game_time, general_stock_market_system.market_registry)
+        competitor_ai_system.update_competitor_credit_ratings()
+    return None
+
+register_phase("market", _market_phase)
+register_phase("competition", _competition_phase)
+register_phase("finance", _finance_phase)
+register_phase("effects", _effects_phase)
+register_phase("risk", _risk_phase)
+register_phase("kpi", _kpi_phase)
+register_phase("quarterly", _quarterly_phase)
@@ -23,3 +23,14 @@ def get_integer_input(prompt: str, min_val: Optional[int] = None, max_val: Optio
                 return value
         except ValueError:
             print("有効な数値を入力してください。")
+
+def get_float_input(prompt: str) -> Optional[float]:
+    """プレイヤーから数値(小数を含む)の入力を受け付ける共通関数。Enterのみの場合は None を返す"""
+    while True:
+        try:
+            value_str = input(prompt).strip()
+            if not value_str:
+                return None
+            return float(value_str)
+        except ValueError:
+            print("有効な数値を入力してください。")
@@ -25,7 +25,7 @@ class AssetsView(ui.View):
         self.add_subview(tv_container)
 
         portfolio = self.game_controller.player.personal_portfolio
-        market_data = general_stock_market_system.listed_companies_on_market
+        market_data = general_stock_market_system.market_registry
         
         tv = ui.TableView(frame=tv_container.bounds, flex='WH')
         tv.row_height = 60
@@ -1,6 +1,7 @@
 # views/invest_view.py (ポートフォリオ表示機能を追加した完全版)
 import ui
 from systems import general_stock_market_system
+from models.market_registry import lookup_company
 
 class CombinedPortfolioDataSource:
     """株式とベンチャー投資の両方を表示するためのデータソース"""
@@ -50,7 +51,7 @@ class CombinedPortfolioDataSource:
         
         section_title = self.sections[section]
         ticker, holding = self.data[section_title][row]
-        market_stock = next((s for s in self.market_data if s.ticker_symbol == ticker), None)
+        market_stock = lookup_company(self.market_data, ticker)
         
         if not market_stock: return cell
 
@@ -141,7 +142,7 @@ class InvestView(ui.View):
             
             # --- ここから修正 ---
             # 新しいデータソースを使用
-            market_data = general_stock_market_system.listed_companies_on_market
+            market_data = general_stock_market_system.market_registry
             data_source = CombinedPortfolioDataSource(self.game_controller.player, market_data, self.investment_handler)
             tv.data_source = data_source
             # tv.delegate = data_source # タップアクションが必要になったら追加
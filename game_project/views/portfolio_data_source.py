@@ -1,6 +1,7 @@
 # views/portfolio_data_source.py
 import ui
 from systems import general_stock_market_system
+from models.market_registry import lookup_company
 
 class PortfolioDataSource:
     """保有株式リスト用のデータソース(共通)"""
@@ -17,7 +18,7 @@ class PortfolioDataSource:
         cell.background_color = '#1C1C1E'
         ticker = self.tickers[row]
         holding = self.portfolio_data.general_stock_portfolio[ticker]
-        market_stock = next((s for s in self.market_data if s.ticker_symbol == ticker), None)
+        market_stock = lookup_company(self.market_data, ticker)
 
         if not market_stock: return cell
 
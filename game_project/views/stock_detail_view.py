@@ -26,13 +26,19 @@ class StockDetailView(ui.View):
         title_label.center = (self.width / 2, 40)
         self.add_subview(title_label)
         
-        # --- 主要な財務指標 ---
+        # --- 主要な財務指標・テクニカル指標 ---
         y_pos = 80
+        ind = self.stock.get_indicators()
+        short_weeks, long_weeks = self.stock.engine.indicators.sma_windows
         stats = [
             (f"株価: ¥{self.stock.current_price:,.2f}", '#FFFFFF'),
             (f"時価総額: ¥{self.stock.market_cap:,.0f}", '#AEAEB2'),
             (f"PER: {self.stock.p_e_ratio:.2f}倍", '#AEAEB2'),
-            (f"PBR: {self.stock.get_pbr_ratio():.2f}倍", '#AEAEB2')
+            (f"PBR: {self.stock.get_pbr_ratio():.2f}倍", '#AEAEB2'),
+            (f"移動平均({short_weeks}週/{long_weeks}週): ¥{ind['sma_short']:,.2f} / ¥{ind['sma_long']:,.2f}", '#AEAEB2'),
+            (f"52週高値/安値: ¥{ind['high']:,.2f} / ¥{ind['low']:,.2f}", '#AEAEB2'),
+            (f"ボラティリティ: {ind['volatility']:.1%}  RSI: {ind['rsi']:.1f}", '#AEAEB2'),
+            (f"高値からの下落率: {ind['drawdown']:.1%}", '#FF3B30' if ind['drawdown'] < -0.2 else '#AEAEB2')
         ]
         for i, (text, color) in enumerate(stats):
             label = ui.Label(text=text, font=('<system-bold>', 16 if i==0 else 14), text_color=color)
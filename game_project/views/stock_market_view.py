@@ -1,44 +1,41 @@
 # views/stock_market_view.py (リファクタリング対応版)
 import ui
-from collections import defaultdict
+import constants
 from systems import general_stock_market_system
 
+# 画面上部で切り替えられる並べ替え項目
+SORT_FIELDS = ["market_cap", "per", "pbr", "dividend_yield", "momentum"]
+SORT_TITLES = ["時価総額", "PER", "PBR", "配当", "乖離率"]
+
 class StockListDataSource:
-    """セクション分けされた株式リスト用のデータソース"""
-    def __init__(self, section_data, section_titles, action):
-        self.section_data = section_data
-        self.section_titles = section_titles
+    """スクリーナーの1ページ分の株式リスト用のデータソース"""
+    def __init__(self, stocks, value_texts, action):
+        self.stocks = stocks
+        self.value_texts = value_texts
         self.action = action
 
     def tableview_number_of_sections(self, tableview):
-        return len(self.section_titles)
+        return 1
 
-    def tableview_title_for_header(self, tableview, section):
-        return self.section_titles[section]
-        
     def tableview_number_of_rows(self, tableview, section):
-        section_title = self.section_titles[section]
-        return len(self.section_data.get(section_title, []))
+        return len(self.stocks)
 
     def tableview_cell_for_row(self, tableview, section, row):
-        cell = ui.TableViewCell('value1')
-        section_title = self.section_titles[section]
-        stock = self.section_data[section_title][row]
+        cell = ui.TableViewCell('subtitle')
+        stock = self.stocks[row]
         
         cell.text_label.text = f"{stock.company_name} ({stock.ticker_symbol})"
         cell.text_label.font = ('<system-bold>', 16)
-        cell.detail_text_label.text = f"¥{stock.current_price:,.2f}"
+        cell.detail_text_label.text = f"¥{stock.current_price:,.2f}  {self.value_texts[row]}"
         cell.accessory_type = 'disclosure_indicator'
         return cell
 
     def tableview_did_select(self, tableview, section, row):
         if self.action:
-            section_title = self.section_titles[section]
-            selected_stock = self.section_data[section_title][row]
-            self.action(selected_stock.ticker_symbol)
+            self.action(self.stocks[row].ticker_symbol)
 
 class StockMarketView(ui.View):
-    """上場企業一覧を表示する画面"""
+    """上場企業一覧を表示する画面 (スクリーナーで並べ替え・セクター絞り込みし、ページ単位で表示)"""
     def __init__(self, investment_handler, **kwargs):
         super().__init__(**kwargs)
         # --- 重要な修正箇所 ---
@@ -48,8 +45,13 @@ class StockMarketView(ui.View):
         self.game_controller = investment_handler.gc
         # --- ここまで ---
         
+        self.screener = general_stock_market_system.get_market_screener()
+        self.sectors = [None] + [name for name, _ in self.screener.get_sectors()]
+        self.sector_index = 0
+        self.page = 0
         self.background_color = '#0d0d0d'
         self.setup_ui()
+        self.reload_page()
 
     def setup_ui(self):
         back_button = ui.Button(title='< 投資トップへ戻る', frame=(15, 15, 150, 30), tint_color='white', content_horizontal_alignment='left')
@@ -62,25 +64,62 @@ class StockMarketView(ui.View):
         title_label.center = (self.width / 2, 40)
         self.add_subview(title_label)
 
-        # データを業種別にグループ化
-        grouped_stocks = defaultdict(list)
-        for stock in general_stock_market_system.listed_companies_on_market:
-            grouped_stocks[stock.sector].append(stock)
-        
-        for sector in grouped_stocks:
-            grouped_stocks[sector].sort(key=lambda s: s.ticker_symbol)
-            
-        sorted_sectors = sorted(grouped_stocks.keys())
-        
-        # TableViewの作成
-        tv = ui.TableView(frame=(0, 70, self.width, self.height - 70), flex='WH')
-        tv.row_height = 50
-        tv.separator_color = '#333'
-        
+        self.sort_control = ui.SegmentedControl(frame=(15, 70, self.width - 30, 30), segments=SORT_TITLES, flex='W')
+        self.sort_control.selected_index = 0
+        self.sort_control.action = self.sort_changed
+        self.add_subview(self.sort_control)
+
+        self.sector_button = ui.Button(frame=(15, 108, self.width - 30, 30), tint_color='white', flex='W')
+        self.sector_button.action = self.next_sector
+        self.add_subview(self.sector_button)
+
+        # TableViewの作成 (ページ送りの行を下部に確保する)
+        self.tv = ui.TableView(frame=(0, 146, self.width, self.height - 196), flex='WH')
+        self.tv.row_height = 50
+        self.tv.separator_color = '#333'
+        self.add_subview(self.tv)
+
+        self.prev_button = ui.Button(title='< 前へ', frame=(15, self.height - 45, 80, 36), tint_color='white', flex='T')
+        self.prev_button.action = lambda sender: self.change_page(-1)
+        self.add_subview(self.prev_button)
+        self.page_label = ui.Label(frame=(100, self.height - 45, self.width - 200, 36), text_color='#AEAEB2', alignment=ui.ALIGN_CENTER, flex='WT')
+        self.add_subview(self.page_label)
+        self.next_button = ui.Button(title='次へ >', frame=(self.width - 95, self.height - 45, 80, 36), tint_color='white', flex='LT')
+        self.next_button.action = lambda sender: self.change_page(1)
+        self.add_subview(self.next_button)
+
+    def reload_page(self):
+        """現在の条件で1ページ分だけ問い合わせ、一覧を差し替える"""
+        sort_by = SORT_FIELDS[self.sort_control.selected_index]
+        sector = self.sectors[self.sector_index]
+        page_size = constants.SCREENER_PAGE_SIZE
+        # PER・PBR は低い順、それ以外は高い順に並べる
+        descending = sort_by not in ("per", "pbr")
+        stocks, total = self.screener.query(sector=sector, sort_by=sort_by, descending=descending,
+                                            offset=self.page * page_size, limit=page_size)
+        self.num_pages = max(1, -(-total // page_size))
+        value_texts = [general_stock_market_system.format_screener_value(sort_by, self.screener.get_value(s, sort_by)) for s in stocks]
+
+        self.sector_button.title = f"セクター: {sector or '全セクター'} ({total:,}銘柄)"
+        self.page_label.text = f"{self.page + 1} / {self.num_pages}"
+        self.prev_button.enabled = self.page > 0
+        self.next_button.enabled = self.page + 1 < self.num_pages
+
         # 詳細画面への遷移なので、game_controller のメソッドを渡す
-        data_source = StockListDataSource(grouped_stocks, sorted_sectors, self.game_controller.show_stock_detail_view)
-        tv.data_source = data_source
-        tv.delegate = data_source 
-        
-        self.add_subview(tv)
+        data_source = StockListDataSource(stocks, value_texts, self.game_controller.show_stock_detail_view)
+        self.tv.data_source = data_source
+        self.tv.delegate = data_source
+        self.tv.reload_data()
+
+    def sort_changed(self, sender):
+        self.page = 0
+        self.reload_page()
+
+    def next_sector(self, sender):
+        self.sector_index = (self.sector_index + 1) % len(self.sectors)
+        self.page = 0
+        self.reload_page()
 
+    def change_page(self, step):
+        self.page = min(max(0, self.page + step), self.num_pages - 1)
+        self.reload_page()
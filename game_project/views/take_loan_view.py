@@ -1,6 +1,7 @@
 # views/take_loan_view.py
 import ui
 import console
+import constants
 
 class TakeLoanView(ui.View):
     """融資申込の専用モーダルビュー"""
@@ -29,7 +30,7 @@ class TakeLoanView(ui.View):
             f"銀行名: {self.loan_product['bank_name']}",
             f"最大融資額: ¥{self.loan_product['customized_max_amount']:,.0f}",
             f"週利: {self.loan_product['customized_rate']*100:.4f}%",
-            f"返済期間: {self.loan_product['repayment_weeks']}週"
+            f"返済期間: {self.loan_product['repayment_weeks']}週 ({constants.LOAN_REPAYMENT_METHOD_LABELS[self.loan_product['repayment_method']]})"
         ]
         y_pos = 60
         for text in details: